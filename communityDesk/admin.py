@@ -1,12 +1,12 @@
 from django.contrib import admin
-from .models import Post, Comment, Poll, Vote, Follow, Like
+from .models import Post, Comment, Poll, PollOption, Vote, Follow, Like
 
 # Custom Admin Classes
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user', 'text', 'created_at', 'updated_at', 'share_count')
+    list_display = ('id', 'user', 'text', 'created_at', 'updated_at', 'like_count', 'comment_count', 'share_count')
     search_fields = ('text', 'user__username')
     list_filter = ('created_at', 'user')
-    readonly_fields = ('id', 'user', 'text', 'created_at', 'updated_at', 'share_count', 'commenting_enabled', 'hashtags')
+    readonly_fields = ('id', 'user', 'text', 'created_at', 'updated_at', 'like_count', 'comment_count', 'share_count', 'commenting_enabled', 'hashtags')
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'post', 'user', 'parent', 'text', 'created_at')
@@ -14,11 +14,18 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ('created_at', 'user')
     readonly_fields = ('id', 'post', 'user', 'parent', 'text', 'created_at')
 
+class PollOptionInline(admin.TabularInline):
+    model = PollOption
+    extra = 0
+    can_delete = False
+    readonly_fields = ('key', 'vote_count')
+
 class PollAdmin(admin.ModelAdmin):
-    list_display = ('id', 'post', 'question', 'created_at')
+    list_display = ('id', 'post', 'question', 'live', 'created_at')
     search_fields = ('question', 'post__id')
     list_filter = ('created_at',)
     readonly_fields = ('id', 'post', 'question', 'created_at', 'options', 'votes')
+    inlines = [PollOptionInline]
 
 class VoteAdmin(admin.ModelAdmin):
     list_display = ('id', 'poll', 'user', 'option_id', 'created_at')
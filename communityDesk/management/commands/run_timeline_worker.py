@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from communityDesk.timeline import _redis, process_next
+
+
+class Command(BaseCommand):
+    help = "Fan queued community posts out to follower timelines in Redis."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running as a worker')
+        parser.add_argument('--timeout', type=float, default=5.0, help='Seconds to block waiting for a job with --loop (default 5)')
+
+    def handle(self, *args, **options):
+        if _redis() is None:
+            raise CommandError("The timeline worker needs a Redis cache backend.")
+        if not options['loop']:
+            processed = 0
+            while process_next():
+                processed += 1
+            self.stdout.write(f"Fanned out {processed} posts.")
+            return
+        while True:
+            process_next(timeout=options['timeout'])
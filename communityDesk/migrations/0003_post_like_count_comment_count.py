@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_post_counters(apps, schema_editor):
+    Post = apps.get_model('communityDesk', 'Post')
+    Like = apps.get_model('communityDesk', 'Like')
+    Comment = apps.get_model('communityDesk', 'Comment')
+
+    def count_of(model):
+        rows = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('id')).values('n')
+        return Coalesce(Subquery(rows), 0)
+
+    Post.objects.update(like_count=count_of(Like), comment_count=count_of(Comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communityDesk', '0002_comment_parent_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_post_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communityDesk', '0003_post_like_count_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id'], name='communityDe_created_65b575_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='communityDe_user_id_90ae65_idx'),
+        ),
+    ]
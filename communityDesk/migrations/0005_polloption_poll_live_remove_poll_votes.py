@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_poll_options(apps, schema_editor):
+    # Counts come from the Vote rows (one per user): the JSON tallies lost concurrent updates
+    Poll = apps.get_model('communityDesk', 'Poll')
+    PollOption = apps.get_model('communityDesk', 'PollOption')
+    Vote = apps.get_model('communityDesk', 'Vote')
+
+    for poll in Poll.objects.only('id', 'options').iterator():
+        counts = dict(
+            Vote.objects.filter(poll_id=poll.id).values_list('option_id').annotate(n=Count('id')).order_by()
+        )
+        PollOption.objects.bulk_create([
+            PollOption(poll_id=poll.id, key=str(key), vote_count=counts.get(str(key), 0))
+            for key in (poll.options or {})
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communityDesk', '0004_post_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PollOption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=10)),
+                ('vote_count', models.IntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='poll_options', to='communityDesk.poll')),
+            ],
+            options={
+                'ordering': ['id'],
+                'unique_together': {('poll', 'key')},
+            },
+        ),
+        migrations.AddField(
+            model_name='poll',
+            name='live',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_poll_options, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='poll',
+            name='votes',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 11:20
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    app_label, model_name = settings.AUTH_USER_MODEL.split('.')
+    User = apps.get_model(app_label, model_name)
+    Follow = apps.get_model('communityDesk', 'Follow')
+
+    def count_by(field):
+        rows = Follow.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(n=Count('id')).values('n')
+        return Coalesce(Subquery(rows), 0)
+
+    User.objects.update(follower_count=count_by('following'), following_count=count_by('follower'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communityDesk', '0005_polloption_poll_live_remove_poll_votes'),
+        ('profileDesk', '0011_customuser_follow_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:02
+
+from django.db import migrations, models
+
+FULLTEXT_INDEX = 'communityDesk_post_text_ft'
+
+
+def backfill_hashtag_text(apps, schema_editor):
+    Post = apps.get_model('communityDesk', 'Post')
+    for post in Post.objects.exclude(hashtags=[]).only('id', 'hashtags').iterator():
+        text = ' '.join(str(tag) for tag in post.hashtags or [])
+        Post.objects.filter(pk=post.pk).update(hashtag_text=text)
+
+
+def add_fulltext_index(apps, schema_editor):
+    # MySQL only (InnoDB FULLTEXT, ngram parser: CJK/Indic text and partial words);
+    # other backends fall back to LIKE scans in communityDesk.search
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name(apps.get_model('communityDesk', 'Post')._meta.db_table)
+    schema_editor.execute(
+        f"ALTER TABLE {table} ADD FULLTEXT INDEX {FULLTEXT_INDEX} (text, hashtag_text) WITH PARSER ngram"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name(apps.get_model('communityDesk', 'Post')._meta.db_table)
+    schema_editor.execute(f"ALTER TABLE {table} DROP INDEX {FULLTEXT_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communityDesk', '0006_backfill_user_follow_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hashtag_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_hashtag_text, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
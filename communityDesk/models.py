@@ -7,14 +7,33 @@ class Post(models.Model):
     text = models.TextField(max_length=512)
     image_url = models.ImageField(upload_to='posts/', null=True, blank=True)
     hashtags = models.JSONField(default=list)  # Array of hashtags
+    # Space-joined copy of hashtags for the FULLTEXT index (see search.py); set in save()
+    hashtag_text = models.TextField(blank=True, default='', editable=False)
     commenting_enabled = models.BooleanField(default=True)
     share_count = models.IntegerField(default=0)  # Track shares
+    # Denormalized from Like / Comment rows; written only by F() updates in signals.py
+    like_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)  # Includes replies
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pages of the feed and of one user's posts
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['user', '-created_at', '-id']),
+        ]
+
     def __str__(self):
         return f"Post by {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        self.hashtag_text = ' '.join(str(tag) for tag in self.hashtags or [])
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'hashtags' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'hashtag_text'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
@@ -38,12 +57,36 @@ class Poll(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     question = models.CharField(max_length=255)
     options = models.JSONField(default=dict)  # e.g., {"1": "Option 1", "2": "Option 2"}
-    votes = models.JSONField(default=dict)    # e.g., {"1": 5, "2": 3"}
+    # Hot polls: buffer vote counts in Redis (counterDesk) instead of one UPDATE per vote
+    live = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Poll for Post {self.post.id}"
 
+    @property
+    def votes(self):
+        """{option key: vote count} from the PollOption rows (prefetch 'poll_options')."""
+        return {option.key: option.vote_count for option in self.poll_options.all()}
+
+
+class PollOption(models.Model):
+    """
+    Vote counter of one poll option, one row per Poll.options key. Counts move with
+    F() updates in the transaction that writes the Vote (see services.cast_vote), so
+    concurrent voters never overwrite each other and the Poll row is never rewritten.
+    """
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='poll_options')
+    key = models.CharField(max_length=10)  # Matches Poll.options key / Vote.option_id
+    vote_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('poll', 'key')
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Option {self.key} of Poll {self.poll_id}"
+
 
 class Vote(models.Model):
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE)
@@ -0,0 +1,90 @@
+from rest_framework.pagination import BasePagination, PageNumberPagination
+
+from pratilipiPc.pagination import KeysetPagination
+
+from . import timeline
+from .models import Post
+
+
+class LegacyPageNumberPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PostCursorPagination(KeysetPagination):
+    # Served by the (-created_at, -id) and (user, -created_at, -id) indexes on Post
+    ordering = ('-created_at', '-id')
+    page_size = 10
+    max_page_size = 100
+
+
+class CommentCursorPagination(KeysetPagination):
+    # Newest first; served by the (post, parent, -created_at) index (InnoDB appends the pk)
+    ordering = ('-created_at', '-id')
+    page_size = 10
+    max_page_size = 100
+
+
+class FollowCursorPagination(KeysetPagination):
+    # Newest follows first; served by the follower / following FK indexes (InnoDB appends the pk)
+    ordering = ('-id',)
+    page_size = 20
+    max_page_size = 100
+
+
+class PageNumberOrKeysetPagination(BasePagination):
+    """
+    Page-number pages (?page=&page_size=, with "count") unless the request carries
+    ?cursor=, which switches to keyset pages: pass it empty for the first page, then the
+    returned next_cursor. Keyset pages cost the same at any depth (no COUNT, no OFFSET);
+    page-number mode stays for clients that predate cursors.
+    """
+    page_number_class = LegacyPageNumberPagination
+    keyset_class = None
+
+    def __init__(self):
+        self.page_number = self.page_number_class()
+        self.keyset = self.keyset_class()
+        self.active = self.page_number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset.cursor_query_param in request.query_params:
+            self.active = self.keyset
+        else:
+            self.active = self.page_number
+        return self.active.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+
+class PostPagination(PageNumberOrKeysetPagination):
+    keyset_class = PostCursorPagination
+
+
+class CommentPagination(PageNumberOrKeysetPagination):
+    keyset_class = CommentCursorPagination
+
+
+class TimelinePagination(KeysetPagination):
+    """
+    Keyset pages over home timeline post ids (see timeline.py); the cursor carries the
+    last post id served. Posts are hydrated per page in one batch.
+    """
+    ordering = ('-id',)
+    page_size = 10
+    max_page_size = 50
+
+    def paginate_timeline(self, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, Post, self.ordering)
+
+        ids = timeline.post_ids(request.user, position[0] if position else None, self.page_size + 1)
+        self.has_next = len(ids) > self.page_size
+        ids = ids[:self.page_size]
+        # From the last id, not the last post: a deleted post must not end the scroll
+        self.next_cursor = self.encode_cursor(Post(id=ids[-1]), self.ordering) if self.has_next else None
+        self.page = timeline.hydrate(ids, request.user)
+        return self.page
@@ -0,0 +1,81 @@
+# communityDesk/search.py
+"""
+Community search over post text/hashtags and user names.
+
+MySQL: InnoDB FULLTEXT indexes with the ngram parser (communityDesk 0007, profileDesk 0012),
+queried in natural language mode and ranked by relevance, newest first on ties. Other
+backends (local runs) fall back to LIKE scans, newest first.
+
+The ranked id lists are shared by every user: each normalised query is resolved once per
+SEARCH_CACHE_TTL, capped at SEARCH_MAX_RESULTS ids per kind. Pages are sliced from the
+cached lists and hydrated per request, so per-user state (is_liked, my_vote, follow state)
+is applied after the cache and never leaks between users. New posts and renames show up
+once the cached entry expires.
+
+Queries shorter than SEARCH_MIN_QUERY_LENGTH (the ngram token size) match nothing.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from profileDesk.models import CustomUser
+
+from .models import Post
+from .services import feed_queryset
+
+SEARCH_CACHE_TTL = 300  # seconds
+SEARCH_MAX_RESULTS = 200
+SEARCH_MIN_QUERY_LENGTH = 2  # MySQL ngram_token_size
+
+
+def normalize(query) -> str:
+    return ' '.join((query or '').split()).lower()
+
+
+def _ranked_ids(queryset, columns, like_filter, query) -> list:
+    if connection.vendor == 'mysql':
+        score = RawSQL(f"MATCH ({', '.join(columns)}) AGAINST (%s IN NATURAL LANGUAGE MODE)", [query])
+        queryset = queryset.annotate(score=score).filter(score__gt=0).order_by('-score', '-id')
+    else:
+        queryset = queryset.filter(like_filter).order_by('-id')
+    return list(queryset.values_list('id', flat=True)[:SEARCH_MAX_RESULTS])
+
+
+def _post_ids(query) -> list:
+    return _ranked_ids(
+        Post.objects.all(), ['text', 'hashtag_text'],
+        Q(text__icontains=query) | Q(hashtag_text__icontains=query), query,
+    )
+
+
+def _user_ids(query) -> list:
+    return _ranked_ids(
+        CustomUser.objects.filter(is_active=True), ['username', 'full_name'],
+        Q(username__icontains=query) | Q(full_name__icontains=query), query,
+    )
+
+
+def results(query) -> dict:
+    """{'posts': [post id...], 'users': [user id...]} for a normalised query, best first."""
+    if len(query) < SEARCH_MIN_QUERY_LENGTH:
+        return {'posts': [], 'users': []}
+    key = f"search:community:{hashlib.md5(query.encode()).hexdigest()}"
+    found = cache.get(key)
+    if found is None:
+        found = {'posts': _post_ids(query), 'users': _user_ids(query)}
+        cache.set(key, found, SEARCH_CACHE_TTL)
+    return found
+
+
+def hydrate_posts(ids, user) -> list:
+    """Posts for `ids` in that order, with the caller's like/poll state (one batch)."""
+    posts = {post.id: post for post in feed_queryset(Post.objects.filter(id__in=ids), user)}
+    return [posts[i] for i in ids if i in posts]
+
+
+def hydrate_users(ids) -> list:
+    users = CustomUser.objects.in_bulk(ids)
+    return [users[i] for i in ids if i in users]
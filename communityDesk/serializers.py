@@ -4,15 +4,19 @@ from rest_framework import serializers
 from django.core.exceptions import ValidationError
 import re
 
-from profileDesk.serializers import ShortUserSerializer
+from counterDesk import services as counters
+from counterDesk.serializers import BufferedCountersListSerializer, BufferedCountersMixin
+from profileDesk.serializers import FollowStateListSerializer, ShortUserSerializer
 from .models import Post, Comment, Poll, Vote, Follow, Like
 from profileDesk.models import CustomUser
 
 
-class PostSerializer(serializers.ModelSerializer):  # Allow user to be set automatically
+class PostListSerializer(BufferedCountersListSerializer, FollowStateListSerializer):
+    """A page of posts: buffered share counts and the authors' follow state, batched."""
+
+
+class PostSerializer(BufferedCountersMixin, serializers.ModelSerializer):  # Allow user to be set automatically
     user = ShortUserSerializer(read_only=True)
-    like_count = serializers.SerializerMethodField()
-    comment_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     poll = serializers.SerializerMethodField()  # Show only first poll, if exists
 
@@ -23,6 +27,11 @@ class PostSerializer(serializers.ModelSerializer):  # Allow user to be set autom
             'like_count', 'comment_count', 'is_liked', 'share_count', 'poll',
             'created_at', 'updated_at'
         ]
+        read_only_fields = ['like_count', 'comment_count']
+        # Authors' follow state for a whole page in one query (ShortUserSerializer.my_follow_id)
+        list_serializer_class = PostListSerializer
+        follow_state_source = 'user_id'
+        buffered_counters = ['share_count']
         extra_kwargs = {
             'image_url': {'required': False},
             'hashtags': {'required': False},
@@ -40,26 +49,43 @@ class PostSerializer(serializers.ModelSerializer):  # Allow user to be set autom
             raise ValidationError("Hashtags must start with # and contain only letters, numbers, or underscores.")
         return hashtags
 
-    def get_like_count(self, obj):
-        return Like.objects.filter(post=obj).count()
+    def _current_user(self):
+        request = self.context.get('request')
+        if request and hasattr(request, 'user') and request.user.is_authenticated:
+            return request.user
+        return None
 
-    def get_comment_count(self, obj):
-        return Comment.objects.filter(post=obj).count()
+    def update(self, instance, validated_data):
+        # Write only the edited columns: a full-row save would put back the counter values
+        # loaded with the instance and drop likes/comments counted in the meantime
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
 
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and hasattr(request, 'user') and request.user.is_authenticated:
-            return Like.objects.filter(post=obj, user=request.user).exists()
+        # Annotated by services.feed_queryset; single posts (create/update) fall back to a query
+        if hasattr(obj, 'is_liked'):
+            return bool(obj.is_liked)
+        user = self._current_user()
+        if user is not None:
+            return Like.objects.filter(post=obj, user=user).exists()
         return False
 
     def get_poll(self, obj):
-        poll = Poll.objects.filter(post=obj).first()
+        user = self._current_user()
+        if hasattr(obj, 'polls'):
+            poll = obj.polls[0] if obj.polls else None
+        else:
+            poll = Poll.objects.filter(post=obj).first()
         if poll:
             # Show my_vote also if user is authenticated
             poll_data = PollSerializer(poll).data
-            request = self.context.get('request')
-            if request and hasattr(request, 'user') and request.user.is_authenticated:
-                vote = Vote.objects.filter(poll=poll, user=request.user).first()
+            if user is not None:
+                if hasattr(poll, 'my_votes'):
+                    vote = poll.my_votes[0] if poll.my_votes else None
+                else:
+                    vote = Vote.objects.filter(poll=poll, user=user).first()
                 poll_data['my_vote'] = vote.option_id if vote else None
             else:
                 poll_data['my_vote'] = None
@@ -84,6 +110,8 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'post', 'user', 'text', 'created_at']
+        list_serializer_class = FollowStateListSerializer
+        follow_state_source = 'user_id'
 
     def validate_text(self, value):
         if not value.strip():
@@ -95,6 +123,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
 class PollSerializer(serializers.ModelSerializer):
     post = serializers.PrimaryKeyRelatedField(queryset=Post.objects.all(), required=False)  # Allow post to be set automatically
+    votes = serializers.SerializerMethodField()  # Derived from PollOption counters
 
     class Meta:
         model = Poll
@@ -103,12 +132,16 @@ class PollSerializer(serializers.ModelSerializer):
     def validate_options(self, value):
         if not isinstance(value, dict) or len(value) < 2 or len(value) > 6:
             raise ValidationError("Options must be a dictionary with 2 to 6 entries.")
+        if any(len(str(key)) > 10 for key in value):
+            raise ValidationError("Option keys must not exceed 10 characters.")
         return value
 
-    def validate(self, data):
-        if 'options' in data and 'votes' in data and set(data['votes'].keys()) != set(data['options'].keys()):
-            raise ValidationError("Votes keys must match options keys.")
-        return data
+    def get_votes(self, obj):
+        options = list(obj.poll_options.all())
+        if obj.live:
+            # Add deltas still buffered in Redis (one HMGET)
+            counters.overlay(options, 'vote_count')
+        return {option.key: option.vote_count for option in options}
 
 
 class VoteSerializer(serializers.ModelSerializer):
@@ -0,0 +1,135 @@
+# communityDesk/services.py
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Greatest
+
+from counterDesk import services as counters
+
+from .models import Follow, Like, Poll, PollOption, Vote
+
+
+def feed_queryset(queryset, user):
+    """
+    Load everything PostSerializer shows for a page of posts in a fixed number of queries:
+    the author (join), is_liked / my_like_id (subqueries) for an authenticated `user`,
+    and each post's polls with their option counters and the user's votes on them
+    (three prefetch queries per page, only run when the page has polls).
+
+    PostSerializer reads:
+      post.polls          polls ordered by id (the first one is shown)
+      poll.poll_options   vote counters (Poll.votes)
+      poll.my_votes       the caller's vote on the poll, at most one row
+    """
+    queryset = queryset.select_related('user')
+    polls = Poll.objects.order_by('id').prefetch_related('poll_options')
+    if user is not None and user.is_authenticated:
+        likes_qs = Like.objects.filter(post=OuterRef('pk'), user=user)
+        queryset = queryset.annotate(
+            is_liked=Exists(likes_qs),
+            my_like_id=Subquery(likes_qs.values('id')[:1]),
+        )
+        polls = polls.prefetch_related(
+            Prefetch('vote_set', queryset=Vote.objects.filter(user=user), to_attr='my_votes')
+        )
+    return queryset.prefetch_related(Prefetch('poll_set', queryset=polls, to_attr='polls'))
+
+
+def follow_ids(user, user_ids) -> dict:
+    """
+    {user id: Follow id} for those of `user_ids` that `user` follows, in one query over the
+    unique (follower, following) index. Empty for anonymous users.
+    """
+    user_ids = {int(i) for i in user_ids}
+    if user is None or not user.is_authenticated or not user_ids:
+        return {}
+    return dict(
+        Follow.objects.filter(follower=user, following_id__in=user_ids).values_list('following_id', 'id')
+    )
+
+
+class FollowState:
+    """
+    The caller's follow state for the users of one response, loaded in batches:
+    resolve(ids) fetches every id not seen yet with one follow_ids() query, and
+    follow_id(user_id) answers from what was loaded (a miss resolves that id alone).
+    Serializers share one instance through context['follow_state'].
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._follow_ids = {}
+        self._resolved = set()
+
+    def resolve(self, user_ids) -> None:
+        pending = {int(i) for i in user_ids if i is not None} - self._resolved
+        if pending:
+            self._follow_ids.update(follow_ids(self.user, pending))
+            self._resolved |= pending
+
+    def follow_id(self, user_id):
+        self.resolve([user_id])
+        return self._follow_ids.get(int(user_id))
+
+    def is_following(self, user_id) -> bool:
+        return self.follow_id(user_id) is not None
+
+
+# -----------------------------
+# Polls
+# -----------------------------
+
+def sync_poll_options(poll: Poll) -> None:
+    """One PollOption row per key of poll.options (new keys start at 0, dropped keys go)."""
+    keys = [str(key) for key in poll.options or {}]
+    PollOption.objects.bulk_create(
+        [PollOption(poll=poll, key=key) for key in keys], ignore_conflicts=True
+    )
+    PollOption.objects.filter(poll=poll).exclude(key__in=keys).delete()
+
+
+def apply_vote_deltas(poll: Poll, deltas: dict) -> None:
+    """
+    Move option counters by {key: delta}. Regular polls: F() UPDATEs inside the caller's
+    transaction. Live polls: buffered in Redis once the transaction commits and applied in
+    batches by `manage.py flush_counters` (counterDesk); read back with counters.overlay.
+    """
+    if not poll.live:
+        for key, delta in deltas.items():
+            PollOption.objects.filter(poll=poll, key=key).update(vote_count=Greatest(F('vote_count') + delta, 0))
+        return
+
+    options = list(PollOption.objects.filter(poll=poll, key__in=deltas))
+
+    def _buffer():
+        for option in options:
+            counters.increment(option, 'vote_count', deltas[option.key])
+
+    transaction.on_commit(_buffer)
+
+
+def cast_vote(poll: Poll, user, option_id: str):
+    """
+    Record `user`'s vote for `option_id` and move the counters in the same transaction.
+    Returns (vote, created); vote is None when the user already voted for this option.
+    Only the voter's own Vote row is locked, never the Poll.
+    """
+    with transaction.atomic():
+        vote = Vote.objects.select_for_update().filter(poll=poll, user=user).first()
+        if vote is None:
+            try:
+                with transaction.atomic():
+                    vote = Vote.objects.create(poll=poll, user=user, option_id=option_id)
+            except IntegrityError:
+                # The same user's concurrent first vote won; treat this one as a change
+                vote = Vote.objects.select_for_update().get(poll=poll, user=user)
+            else:
+                apply_vote_deltas(poll, {option_id: 1})
+                return vote, True
+
+        if vote.option_id == option_id:
+            return None, False
+        previous = vote.option_id
+        vote.option_id = option_id
+        vote.save(update_fields=['option_id'])
+        apply_vote_deltas(poll, {previous: -1, option_id: 1})
+        return vote, False
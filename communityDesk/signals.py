@@ -0,0 +1,76 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from profileDesk.models import CustomUser
+
+from . import timeline
+from .models import Post, Comment, Follow, Like, Poll, PollOption, Vote
+from .services import sync_poll_options
+
+
+# The only writers of Post.like_count / Post.comment_count (besides migration 0003's backfill).
+# Deltas are applied in SQL, so concurrent likes and comments never overwrite each other.
+@receiver(post_save, sender=Like)
+def incr_post_like_count_on_create(sender, instance: Like, created, **kwargs):
+    if created:
+        Post.objects.filter(id=instance.post_id).update(like_count=F('like_count') + 1)
+
+
+@receiver(post_delete, sender=Like)
+def decr_post_like_count_on_delete(sender, instance: Like, **kwargs):
+    Post.objects.filter(id=instance.post_id).update(like_count=Greatest(F('like_count') - 1, 0))
+
+
+@receiver(post_save, sender=Comment)
+def incr_post_comment_count_on_create(sender, instance: Comment, created, **kwargs):
+    # Replies count too (matches the old per-request COUNT over every comment of the post)
+    if created:
+        Post.objects.filter(id=instance.post_id).update(comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decr_post_comment_count_on_delete(sender, instance: Comment, **kwargs):
+    # Cascaded replies send their own post_delete, so each one is subtracted once
+    Post.objects.filter(id=instance.post_id).update(comment_count=Greatest(F('comment_count') - 1, 0))
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post_on_create(sender, instance: Post, created, **kwargs):
+    if created:
+        timeline.enqueue_fanout(instance)
+
+
+# The only writers of CustomUser.follower_count / following_count (besides migration 0006)
+@receiver(post_save, sender=Follow)
+def incr_follow_counts_on_create(sender, instance: Follow, created, **kwargs):
+    if created:
+        CustomUser.objects.filter(id=instance.follower_id).update(following_count=F('following_count') + 1)
+        CustomUser.objects.filter(id=instance.following_id).update(follower_count=F('follower_count') + 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decr_follow_counts_on_delete(sender, instance: Follow, **kwargs):
+    CustomUser.objects.filter(id=instance.follower_id).update(following_count=Greatest(F('following_count') - 1, 0))
+    CustomUser.objects.filter(id=instance.following_id).update(follower_count=Greatest(F('follower_count') - 1, 0))
+
+
+@receiver([post_save, post_delete], sender=Follow)
+def invalidate_timeline_on_follow_change(sender, instance: Follow, **kwargs):
+    # The follower's timeline gains or loses a whole account: reload it on next read
+    if kwargs.get('created', True):
+        timeline.invalidate(instance.follower_id)
+
+
+@receiver(post_save, sender=Poll)
+def sync_poll_options_on_save(sender, instance: Poll, **kwargs):
+    sync_poll_options(instance)
+
+
+@receiver(post_delete, sender=Vote)
+def decr_poll_option_on_vote_delete(sender, instance: Vote, **kwargs):
+    # Direct UPDATE even for live polls: the buffered deltas stay valid on top of it
+    PollOption.objects.filter(poll_id=instance.poll_id, key=instance.option_id).update(
+        vote_count=Greatest(F('vote_count') - 1, 0)
+    )
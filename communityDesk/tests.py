@@ -1,3 +1,135 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import fakeredis
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from profileDesk.models import CustomUser
+from . import timeline
+from .models import Follow, Post
+
+# Plain in-process cache; the timeline gets its own Redis stand-in (timeline._redis)
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TIMELINE_MAX_ENTRIES=800, TIMELINE_CELEBRITY_FOLLOWERS=10000)
+class TimelineTests(TestCase):
+    URL = '/api/community/timeline/'
+
+    def setUp(self):
+        cache.clear()
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(timeline, '_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.reader = self._user('reader', 1)
+        self.author = self._user('author', 2)
+        self._follow(self.reader, self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def _user(self, name, n):
+        return CustomUser.objects.create_user(
+            name, f'{name}@example.com', 'pass', full_name=name.title(), mobile_number=f'90000001{n:02d}'
+        )
+
+    def _follow(self, follower, following):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Follow.objects.create(follower=follower, following=following)
+
+    def _post(self, user, text='post'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(user=user, text=text)
+
+    def _posts(self, user, count):
+        posts = [self._post(user, f'post {n}') for n in range(count)]
+        while timeline.process_next():
+            pass
+        return posts
+
+    def _warm(self):
+        # First read of a cold timeline loads it from the DB and marks it warm
+        self.assertEqual(self.client.get(self.URL).status_code, 200)
+        self.assertIsNotNone(self.redis.zscore(timeline._key(self.reader.pk), timeline.WARM_MARKER))
+
+    def _timeline_ids(self, page_size):
+        ids, url = [], f'{self.URL}?page_size={page_size}'
+        while url:
+            body = self.client.get(url).json()
+            self.assertLessEqual(len(body['results']), page_size)
+            ids += [post['id'] for post in body['results']]
+            url = body['next']
+        return ids
+
+    def _stored_ids(self, user):
+        return timeline._ids(self.redis.zrange(timeline._key(user.pk), 0, -1))
+
+    def test_fan_out_pages_without_gaps_or_duplicates(self):
+        self._warm()
+        posts = self._posts(self.author, 12) + self._posts(self.reader, 1)
+        expected = sorted((p.id for p in posts), reverse=True)
+
+        # Fanned out to the follower and to the authors themselves
+        self.assertEqual(sorted(self._stored_ids(self.reader), reverse=True), expected)
+        self.assertEqual(len(self._stored_ids(self.author)), 12)
+
+        with mock.patch.object(timeline, '_load', wraps=timeline._load) as load:
+            self.assertEqual(self._timeline_ids(page_size=5), expected)
+        load.assert_not_called()  # every page came from the warm timeline
+
+    def test_cold_timeline_is_loaded_from_db(self):
+        # Posts written without running the fan-out worker
+        posts = [Post.objects.create(user=self.author, text=f'post {n}') for n in range(3)]
+        self.assertEqual(self._timeline_ids(page_size=2), sorted((p.id for p in posts), reverse=True))
+        self.assertIsNotNone(self.redis.zscore(timeline._key(self.reader.pk), timeline.WARM_MARKER))
+        self.assertEqual(len(self._stored_ids(self.reader)), 3)
+
+    @override_settings(TIMELINE_MAX_ENTRIES=5)
+    def test_reads_past_the_cap_fall_back_to_db(self):
+        self._warm()
+        posts = self._posts(self.author, 12)
+        # Only the newest TIMELINE_MAX_ENTRIES ids are kept
+        self.assertEqual(len(self._stored_ids(self.reader)), 5)
+        with mock.patch.object(timeline, '_load', wraps=timeline._load) as load:
+            self.assertEqual(self._timeline_ids(page_size=4), sorted((p.id for p in posts), reverse=True))
+        load.assert_called()  # pages past the newest 5 ids
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=1)
+    def test_high_follower_author_is_merged_at_read_time(self):
+        self._warm()
+        own = self._posts(self.reader, 1)
+        celebrity_posts = self._posts(self.author, 2)
+
+        self.assertTrue(self.redis.sismember(timeline.CELEBRITIES_KEY, self.author.pk))
+        # Not fanned out to the follower...
+        self.assertEqual(self._stored_ids(self.reader), [own[0].id])
+        # ...but merged into the page
+        expected = sorted((p.id for p in own + celebrity_posts), reverse=True)
+        self.assertEqual(self._timeline_ids(page_size=10), expected)
+
+    def test_deleted_post_is_skipped_and_forgotten(self):
+        self._warm()
+        posts = self._posts(self.author, 3)
+        deleted_id = posts[1].id
+        posts[1].delete()
+
+        ids = self._timeline_ids(page_size=10)
+        self.assertEqual(ids, [posts[2].id, posts[0].id])
+        self.assertIsNone(self.redis.zscore(timeline._key(self.reader.pk), deleted_id))
+
+    def test_follow_and_unfollow_drop_the_timeline(self):
+        other = self._user('other', 3)
+        other_post = Post.objects.create(user=other, text='before the follow')
+        self._warm()
+        key = timeline._key(self.reader.pk)
+
+        follow = self._follow(self.reader, other)
+        self.assertFalse(self.redis.exists(key))
+        self.assertIn(other_post.id, self._timeline_ids(page_size=10))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+        self.assertFalse(self.redis.exists(key))
+        self.assertNotIn(other_post.id, self._timeline_ids(page_size=10))
@@ -0,0 +1,250 @@
+# communityDesk/timeline.py
+"""
+Home timeline: the newest posts of the accounts a user follows, plus their own.
+
+Fan-out on write. A new post is queued after commit; the timeline worker
+(`manage.py run_timeline_worker`) adds its id to the timeline of the author and of every
+follower, reading Follow in keyset chunks of FANOUT_CHUNK_SIZE. Each timeline is capped at
+TIMELINE_MAX_ENTRIES ids. Authors with TIMELINE_CELEBRITY_FOLLOWERS or more followers are
+not fanned out: their posts are merged into the page at read time instead.
+
+Key layout:
+  timeline:<user_id>      sorted set  post id (score = post id), plus WARM_MARKER at +inf
+  timeline:fanout         list of pending fan-out jobs (JSON)
+  timeline:celebrities    set of author ids merged at read time
+
+Post ids grow with created_at, so scoring by id orders a timeline newest first. As with
+the entitlement index, a timeline is only trusted once it carries WARM_MARKER, i.e. after
+it was loaded from the DB; fan-out writes to a cold one are merged by that load. Follow and
+unfollow drop the follower's timeline. Deleted posts are skipped (and forgotten) when a
+page is hydrated. Without a Redis cache backend every page is read from the DB.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from profileDesk.models import CustomUser
+
+from .models import Follow, Post
+from .services import feed_queryset
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'timeline:fanout'
+CELEBRITIES_KEY = 'timeline:celebrities'
+WARM_MARKER = '*'
+TIMELINE_TTL = 60 * 60 * 24 * 7  # seconds; timelines of inactive readers age out
+FANOUT_CHUNK_SIZE = 1000
+
+
+def _redis():
+    """Raw redis-py client behind the default cache, or None if the cache is not Redis."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except Exception:
+        return None
+
+
+def _max_entries() -> int:
+    return getattr(settings, 'TIMELINE_MAX_ENTRIES', 800)
+
+
+def _celebrity_followers() -> int:
+    return getattr(settings, 'TIMELINE_CELEBRITY_FOLLOWERS', 10000)
+
+
+def _key(user_id) -> str:
+    return f"timeline:{user_id}"
+
+
+def _ids(members) -> list:
+    return [int(m) for m in members if (m.decode() if isinstance(m, bytes) else m) != WARM_MARKER]
+
+
+def _load(user_id, before=None, limit=None) -> list:
+    """Newest post ids of `user_id` and everyone they follow, from the DB."""
+    following = Follow.objects.filter(follower_id=user_id).values('following_id')
+    posts = Post.objects.filter(Q(user_id__in=following) | Q(user_id=user_id))
+    if before is not None:
+        posts = posts.filter(id__lt=before)
+    return list(posts.order_by('-id').values_list('id', flat=True)[:limit or _max_entries()])
+
+
+def _push(r, user_ids, post_id) -> None:
+    max_entries = _max_entries()
+    pipe = r.pipeline(transaction=False)
+    for user_id in user_ids:
+        key = _key(user_id)
+        # A cold timeline stays cold (no marker); the next read loads it in full
+        pipe.zadd(key, {post_id: post_id})
+        pipe.zremrangebyrank(key, 0, -(max_entries + 2))  # keep the marker plus max_entries
+        pipe.expire(key, TIMELINE_TTL)
+    pipe.execute()
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+
+def enqueue_fanout(post: Post) -> None:
+    """Queue the fan-out of a new post once the surrounding transaction commits."""
+    job = json.dumps({'post': post.pk, 'author': post.user_id})
+
+    def _rpush():
+        r = _redis()
+        if r is None:
+            return
+        try:
+            r.rpush(QUEUE_KEY, job)
+        except Exception:
+            logger.warning("Timeline fan-out not queued for post %s", post.pk, exc_info=True)
+
+    transaction.on_commit(_rpush)
+
+
+def fan_out(post_id, author_id) -> int:
+    """Add a post to its author's and followers' timelines. Returns the number written."""
+    r = _redis()
+    if r is None:
+        return 0
+    _push(r, [author_id], post_id)
+
+    follower_count = CustomUser.objects.filter(pk=author_id).values_list('follower_count', flat=True).first() or 0
+    if follower_count >= _celebrity_followers():
+        r.sadd(CELEBRITIES_KEY, author_id)
+        return 1
+    r.srem(CELEBRITIES_KEY, author_id)
+
+    followers = Follow.objects.filter(following_id=author_id)
+    written, last_id = 1, 0
+    while True:
+        # Keyset walk over the (following, id) index: every chunk is a range scan
+        rows = list(
+            followers.filter(id__gt=last_id).order_by('id').values_list('id', 'follower_id')[:FANOUT_CHUNK_SIZE]
+        )
+        if not rows:
+            return written
+        last_id = rows[-1][0]
+        _push(r, [follower_id for _, follower_id in rows], post_id)
+        written += len(rows)
+
+
+def process_next(timeout=None) -> bool:
+    """
+    Run one queued fan-out job; block up to `timeout` seconds for one if given.
+    Returns False when the queue is empty (or there is no Redis).
+    """
+    r = _redis()
+    if r is None:
+        return False
+    if timeout:
+        item = r.blpop([QUEUE_KEY], timeout=timeout)
+        raw = item[1] if item else None
+    else:
+        raw = r.lpop(QUEUE_KEY)
+    if raw is None:
+        return False
+    job = json.loads(raw)
+    try:
+        fan_out(job['post'], job['author'])
+    except Exception:
+        # Warm timelines miss this post until they are reloaded
+        logger.exception("Timeline fan-out failed for post %s", job.get('post'))
+    return True
+
+
+def invalidate(user_id) -> None:
+    """Drop a user's timeline once the surrounding transaction commits (reloaded on read)."""
+    key = _key(user_id)
+
+    def _delete():
+        r = _redis()
+        if r is None:
+            return
+        try:
+            r.delete(key)
+        except Exception:
+            logger.warning("Timeline invalidation failed for %s", key, exc_info=True)
+
+    transaction.on_commit(_delete)
+
+
+def forget(user_id, post_ids) -> None:
+    """Remove ids of deleted posts from a user's timeline."""
+    r = _redis()
+    if r is None or not post_ids:
+        return
+    try:
+        r.zrem(_key(user_id), *post_ids)
+    except Exception:
+        logger.warning("Timeline cleanup failed for user %s", user_id, exc_info=True)
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+
+def post_ids(user, before=None, limit=10) -> list:
+    """Up to `limit` timeline post ids older than `before` (a post id), newest first."""
+    r = _redis()
+    if r is None:
+        return _load(user.pk, before, limit)
+
+    key = _key(user.pk)
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.zscore(key, WARM_MARKER)
+        pipe.zrevrangebyscore(key, f"({before}" if before is not None else '(+inf', '-inf', start=0, num=limit)
+        pipe.zcard(key)
+        pipe.smembers(CELEBRITIES_KEY)
+        warm, members, size, celebrities = pipe.execute()
+    except Exception:
+        logger.warning("Timeline read failed for %s", key, exc_info=True)
+        return _load(user.pk, before, limit)
+
+    if warm is None:
+        ids = _load(user.pk)
+        try:
+            pipe = r.pipeline()
+            pipe.zadd(key, {WARM_MARKER: float('inf'), **{i: i for i in ids}})
+            pipe.zremrangebyrank(key, 0, -(_max_entries() + 2))
+            pipe.expire(key, TIMELINE_TTL)
+            pipe.execute()
+        except Exception:
+            logger.warning("Timeline warm failed for %s", key, exc_info=True)
+        # _load covers every followed account (celebrities included): nothing to merge
+        page = [i for i in ids if before is None or i < before][:limit]
+        if len(page) < limit and len(ids) >= _max_entries():
+            page += _load(user.pk, page[-1] if page else before, limit - len(page))
+        return page
+
+    ids = _ids(members)
+    if len(ids) < limit and size > _max_entries():
+        # Scrolled past the capped timeline: older pages come from the DB
+        oldest = ids[-1] if ids else before
+        ids += _load(user.pk, oldest, limit - len(ids))
+
+    if celebrities:
+        followed = list(
+            Follow.objects.filter(follower=user, following_id__in=_ids(celebrities))
+            .values_list('following_id', flat=True)
+        )
+        if followed:
+            posts = Post.objects.filter(user_id__in=followed)
+            if before is not None:
+                posts = posts.filter(id__lt=before)
+            ids = sorted(set(ids).union(posts.order_by('-id').values_list('id', flat=True)[:limit]), reverse=True)
+    return ids[:limit]
+
+
+def hydrate(ids, user) -> list:
+    """Posts for `ids` in that order, loaded in one batch through feed_queryset."""
+    posts = {post.id: post for post in feed_queryset(Post.objects.filter(id__in=ids), user)}
+    missing = [i for i in ids if i not in posts]
+    if missing:
+        forget(user.pk, missing)
+    return [posts[i] for i in ids if i in posts]
@@ -9,6 +9,7 @@ from .views import (
     LikeViewSet,
     SearchViewSet,
     UserPostsView,
+    TimelineView,
 )
 
 router = DefaultRouter()
@@ -28,10 +29,14 @@ urlpatterns = router.urls + [
     path('users/<int:user_pk>/follow-status/', FollowViewSet.as_view({'get': 'follow_status'}), name='follow-status'),
     path('users/<int:user_pk>/followers/', FollowViewSet.as_view({'get': 'followers'}), name='followers'),
     path('users/<int:user_pk>/following/', FollowViewSet.as_view({'get': 'following'}), name='following'),
+    path('follow-state/', FollowViewSet.as_view({'get': 'follow_state'}), name='follow-state'),
 
     # Unfollow (DELETE) without needing follow-id
     path('users/<int:user_pk>/follow/remove/', FollowViewSet.as_view({'delete': 'remove'}), name='follow-remove'),
 
     # User posts (paginated)
     path('users/<int:user_id>/posts/', UserPostsView.as_view(), name='user-posts'),
+
+    # Home timeline (followed accounts, cursor paginated)
+    path('timeline/', TimelineView.as_view(), name='timeline'),
 ]
\ No newline at end of file
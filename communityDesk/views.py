@@ -7,32 +7,23 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 
 from authDesk import serializers
+from counterDesk import services as counters
+from . import search
+from .pagination import CommentPagination, FollowCursorPagination, PostPagination, TimelinePagination
+from .services import FollowState, cast_vote, feed_queryset, follow_ids
 from .models import Post, Comment, Poll, Vote, Follow, Like
 from profileDesk.models import CustomUser
 from .serializers import PostSerializer, CommentSerializer, PollSerializer, VoteSerializer, FollowSerializer, LikeSerializer
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Exists, OuterRef, Subquery
-from rest_framework.pagination import PageNumberPagination
-from django.views.decorators.cache import cache_page
-from django.views.decorators import cache
-from django.utils.decorators import method_decorator
 from rest_framework.generics import ListAPIView
-from profileDesk.serializers import SearchUserSerializer
+from profileDesk.serializers import SearchUserSerializer, ShortUserSerializer
 
 
 logger = logging.getLogger(__name__)
 
-
-class PostPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
-class CommentPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+MAX_FOLLOW_STATE_IDS = 100
+SEARCH_PAGE_SIZE = 20
 
 
 class PostViewSet(viewsets.ModelViewSet):
@@ -42,15 +33,7 @@ class PostViewSet(viewsets.ModelViewSet):
     pagination_class = PostPagination  # Add pagination
 
     def get_queryset(self):
-        qs = super().get_queryset().select_related('user')
-        user = getattr(self.request, 'user', None)
-        if user and user.is_authenticated:
-            likes_qs = Like.objects.filter(post=OuterRef('pk'), user=user)
-            qs = qs.annotate(
-                is_liked=Exists(likes_qs),
-                my_like_id=Subquery(likes_qs.values('id')[:1]),
-            )
-        return qs
+        return feed_queryset(super().get_queryset(), getattr(self.request, 'user', None))
 
     def perform_create(self, serializer):
         # Use validated hashtags from serializer
@@ -76,9 +59,8 @@ class PostViewSet(viewsets.ModelViewSet):
 
     def share(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.share_count += 1
-        instance.save()
-        return Response({"message": "Post shared successfully", "share_count": instance.share_count}, status=status.HTTP_200_OK)
+        share_count = counters.increment(instance, 'share_count')
+        return Response({"message": "Post shared successfully", "share_count": share_count}, status=status.HTTP_200_OK)
 
     def copy_link(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -96,7 +78,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         post_id = self.kwargs['post_pk']
         parent_id = self.request.query_params.get('parent_id')
-        qs = Comment.objects.filter(post_id=post_id).order_by('-created_at')
+        qs = Comment.objects.filter(post_id=post_id).select_related('user').order_by('-created_at')
         if parent_id is not None and parent_id != '':
             return qs.filter(parent_id=parent_id)
         # Top-level only by default
@@ -145,45 +127,18 @@ class VoteViewSet(viewsets.ModelViewSet):
         return Vote.objects.filter(poll_id=self.kwargs['poll_pk'])
 
     def create(self, request, *args, **kwargs):
-        from rest_framework import serializers as drf_serializers
-
         poll = get_object_or_404(Poll, pk=self.kwargs['poll_pk'])
-        user = request.user
-
-        # Prepare data with poll and user
-        data = request.data.copy()
-        data['poll'] = poll.id
-        data['user'] = user.id
+        option_id = request.data.get('option_id')
+        if option_id is None or str(option_id) not in poll.options:
+            return Response({"error": "Invalid option ID."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check and update existing vote
-        existing_vote = Vote.objects.filter(poll=poll, user=user).first()
-        if existing_vote:
-            old_option_id = existing_vote.option_id
-            if old_option_id == request.data.get('option_id'):
-                return Response({"error": "You have already voted for this option."}, status=status.HTTP_400_BAD_REQUEST)
-            poll.votes[old_option_id] = max(0, poll.votes.get(old_option_id, 0) - 1)  # Avoid negative votes
-            existing_vote.option_id = request.data.get('option_id')
-            existing_vote.save()
-            poll.votes[request.data.get('option_id')] = poll.votes.get(request.data.get('option_id'), 0) + 1
-            poll.save()
-            return Response(
-                {
-                    "id": existing_vote.id,
-                    "poll": poll.id,
-                    "user": user.id,
-                    "option_id": existing_vote.option_id,
-                    "created_at": existing_vote.created_at
-                },
-                status=status.HTTP_200_OK
-            )
-
-        # Create new vote
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        vote = serializer.save(user=user, poll=poll)
-        poll.votes[request.data.get('option_id')] = poll.votes.get(request.data.get('option_id'), 0) + 1
-        poll.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        vote, created = cast_vote(poll, request.user, str(option_id))
+        if vote is None:
+            return Response({"error": "You have already voted for this option."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            VoteSerializer(vote).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
 
 
 class FollowViewSet(viewsets.ModelViewSet):
@@ -231,15 +186,48 @@ class FollowViewSet(viewsets.ModelViewSet):
         )
 
     def followers(self, request, user_pk=None):
+        """
+        Usernames of everyone following the user. With ?page_size=<n> or
+        ?cursor=<next_cursor>: keyset pages of ShortUserSerializer rows, newest follows first.
+        """
         target_user = get_object_or_404(CustomUser, pk=user_pk)
-        followers = Follow.objects.filter(following=target_user).values_list('follower__username', flat=True)
+        rows = Follow.objects.filter(following=target_user)
+        if FollowCursorPagination().is_requested(request):
+            return self._user_page(request, rows.select_related('follower'), 'follower')
+        followers = rows.values_list('follower__username', flat=True)
         return Response({"followers": list(followers)}, status=status.HTTP_200_OK)
 
     def following(self, request, user_pk=None):
+        """Usernames the user follows; paged like `followers` with ?page_size= / ?cursor=."""
         target_user = get_object_or_404(CustomUser, pk=user_pk)
-        following = Follow.objects.filter(follower=target_user).values_list('following__username', flat=True)
+        rows = Follow.objects.filter(follower=target_user)
+        if FollowCursorPagination().is_requested(request):
+            return self._user_page(request, rows.select_related('following'), 'following')
+        following = rows.values_list('following__username', flat=True)
         return Response({"following": list(following)}, status=status.HTTP_200_OK)
 
+    def _user_page(self, request, rows, side):
+        paginator = FollowCursorPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        users = [getattr(follow, side) for follow in page]
+        return paginator.get_paginated_response(
+            ShortUserSerializer(users, many=True, context=self.get_serializer_context()).data
+        )
+
+    def follow_state(self, request):
+        """
+        Which of ?ids=1,2,3 (at most MAX_FOLLOW_STATE_IDS) the caller follows, in one query.
+        Response: { "follow_ids": { "<user id>": <follow id>|null, ... } }
+        """
+        try:
+            ids = [int(i) for i in request.query_params.get('ids', '').split(',') if i.strip()]
+        except ValueError:
+            return Response({"error": "ids must be a comma-separated list of user ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_FOLLOW_STATE_IDS:
+            return Response({"error": f"At most {MAX_FOLLOW_STATE_IDS} ids per request."}, status=status.HTTP_400_BAD_REQUEST)
+        followed = follow_ids(request.user, ids)
+        return Response({"follow_ids": {str(i): followed.get(i) for i in ids}}, status=status.HTTP_200_OK)
+
 
 class LikeViewSet(viewsets.ModelViewSet):
     queryset = Like.objects.all()
@@ -269,31 +257,57 @@ class LikeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-@method_decorator(cache_page(60*15), name='list')  # Cache for 15 minutes
 class SearchViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
     def list(self, request):
-        query = request.query_params.get('q', '')
-        posts = Post.objects.filter(
-            Q(text__icontains=query) | Q(hashtags__icontains=query)
-        )
-        users = CustomUser.objects.filter(
-            Q(username__icontains=query) | Q(full_name__icontains=query)
-        )
+        """
+        Ranked posts and users matching ?q= (see search.py), ?page_size=<n> (default
+        SEARCH_PAGE_SIZE) of each per page; ?page=<next_page> for more.
+        Response: { "posts": [...], "users": [...], "next_page": <int>|null }
+        """
+        query = search.normalize(request.query_params.get('q', ''))
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', SEARCH_PAGE_SIZE)), 1), 50)
+        except ValueError:
+            return Response({"error": "page and page_size must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = search.results(query)
+        start, end = (page - 1) * page_size, page * page_size
+        posts = search.hydrate_posts(found['posts'][start:end], request.user)
+        users = search.hydrate_users(found['users'][start:end])
+        has_more = len(found['posts']) > end or len(found['users']) > end
+
+        # Use proper serializers with context for 'is_liked' and 'is_following';
+        # one FollowState, so each user id's follow state is looked up at most once
+        context = {'request': request, 'follow_state': FollowState(request.user)}
+        posts_serialized = PostSerializer(posts, many=True, context=context).data
+        users_serialized = SearchUserSerializer(users, many=True, context=context).data
 
-        # Use proper serializers with context for 'is_liked' and 'is_following'
-        posts_serialized = PostSerializer(posts, many=True, context={'request': request}).data
-        users_serialized = SearchUserSerializer(users, many=True, context={'request': request}).data
-
-        return Response({"posts": posts_serialized, "users": users_serialized}, status=status.HTTP_200_OK)
+        return Response(
+            {"posts": posts_serialized, "users": users_serialized, "next_page": page + 1 if has_more else None},
+            status=status.HTTP_200_OK
+        )
 
 
 class UserPostsView(ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PostPagination  # Already defined
+    pagination_class = PostPagination
 
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
-        return Post.objects.filter(user__id=user_id).order_by('-created_at')
\ No newline at end of file
+        return feed_queryset(Post.objects.filter(user__id=user_id).order_by('-created_at'), self.request.user)
+
+
+class TimelineView(ListAPIView):
+    """Home timeline: posts of the accounts the caller follows, plus their own (see timeline.py)."""
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TimelinePagination
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginator.paginate_timeline(request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from counterDesk.services import flush
+
+
+class Command(BaseCommand):
+    help = "Flush buffered engagement counters from Redis into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running as a worker')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between flushes with --loop (default 5)')
+
+    def handle(self, *args, **options):
+        while True:
+            applied = flush()
+            if applied or not options['loop']:
+                self.stdout.write(f"Flushed {applied} counters.")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,96 @@
+# counterDesk/ratings.py
+"""
+Incremental star-rating aggregates.
+
+A rated model carries integer aggregate columns, all maintained with F() deltas:
+  rating_sum, rating_count        -> average = rating_sum / rating_count (exact, no drift)
+  rating_1 ... rating_5           -> star histogram for breakdown widgets
+  rating                          -> DecimalField(3,1) copy of the average, kept only for
+                                     ORDER BY / indexes; recomputed in SQL from the integers
+
+Per-user rows (one rating per user and object) are owned by the calling app; this module only
+folds a user's change (new, changed or removed rating) into the aggregates.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Round
+
+STARS = range(1, 6)
+
+
+def star_field(stars: int) -> str:
+    return f"rating_{stars}"
+
+
+def to_stars(value) -> int | None:
+    """Parse a client rating into whole stars (1-5), rounding halves up; None if invalid."""
+    try:
+        stars = int(Decimal(str(value)).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    except Exception:
+        return None
+    return stars if stars in STARS else None
+
+
+def apply_rating(model, pk, new: int | None, old: int | None = None) -> None:
+    """
+    Fold one user's rating change into the aggregates of model(pk):
+      old=None, new=n  -> first rating
+      old=m,    new=n  -> changed rating
+      old=m,    new=None -> rating removed
+    """
+    if old == new:
+        return
+    updates = {}
+    if old is None:
+        updates['rating_count'] = F('rating_count') + 1
+    if new is None:
+        updates['rating_count'] = F('rating_count') - 1
+    updates['rating_sum'] = F('rating_sum') + ((new or 0) - (old or 0))
+    if old is not None:
+        updates[star_field(old)] = F(star_field(old)) - 1
+    if new is not None:
+        updates[star_field(new)] = F(star_field(new)) + 1
+
+    with transaction.atomic():
+        model.objects.filter(pk=pk).update(**updates)
+        # Second statement sees the row as updated above (same transaction, row already locked)
+        model.objects.filter(pk=pk).update(rating=Case(
+            When(rating_count=0, then=Value(0)),
+            default=Round(Cast('rating_sum', FloatField()) / F('rating_count'), 1),
+            output_field=models.DecimalField(max_digits=3, decimal_places=1),
+        ))
+
+
+def record(rating_model, target, user, stars: int, target_field: str = 'comic') -> int | None:
+    """
+    Upsert `user`'s rating row for `target` (rating_model has user, <target_field>, stars)
+    and fold the change into target's aggregates. Returns the previous stars, if any.
+    """
+    with transaction.atomic():
+        row, created = rating_model.objects.select_for_update().get_or_create(
+            user=user, **{target_field: target}, defaults={'stars': stars}
+        )
+        old = None if created else row.stars
+        if old is not None and old != stars:
+            row.stars = stars
+            row.save(update_fields=['stars', 'updated_at'])
+        apply_rating(type(target), target.pk, stars, old)
+    return old
+
+
+AGGREGATE_FIELDS = ['rating', 'rating_count', 'rating_sum'] + [star_field(s) for s in STARS]
+
+
+def average(obj) -> float:
+    """Display average derived from the integer aggregates."""
+    if not obj.rating_count:
+        return 0.0
+    return float((Decimal(obj.rating_sum) / obj.rating_count).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP))
+
+
+def breakdown(obj) -> dict:
+    """Star histogram as {"1": n, ..., "5": n}."""
+    return {str(s): getattr(obj, star_field(s)) for s in STARS}
+
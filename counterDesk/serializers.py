@@ -0,0 +1,51 @@
+# counterDesk/serializers.py
+"""
+Read side of the write-behind counters (counterDesk.services).
+
+Between flushes the DB columns lag behind the buffered HINCRBY deltas, so a serializer that
+renders a buffered column adds the pending delta first (read-your-write: a listing never
+shows less than what increment() already returned).
+
+A ModelSerializer lists the buffered columns in Meta.buffered_counters, mixes in
+BufferedCountersMixin, and sets Meta.list_serializer_class = BufferedCountersListSerializer
+(or a subclass), so many=True overlays the whole batch with one HMGET per field. Overlaid
+instances are marked, so nested or repeated serialization never adds a delta twice.
+"""
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+from . import services as counters
+
+_OVERLAID = '_buffered_counters_overlaid'
+
+
+def buffered_fields(serializer) -> list:
+    """Meta.buffered_counters still rendered by `serializer` (?fields= may have dropped some)."""
+    return [name for name in getattr(serializer.Meta, 'buffered_counters', ()) if name in serializer.fields]
+
+
+def overlay_once(objs, fields) -> None:
+    """counters.overlay() for the instances of `objs` that were not overlaid yet."""
+    if not fields:
+        return
+    fresh = [obj for obj in objs if not getattr(obj, _OVERLAID, False)]
+    counters.overlay(fresh, *fields)
+    for obj in fresh:
+        setattr(obj, _OVERLAID, True)
+
+
+class BufferedCountersListSerializer(serializers.ListSerializer):
+    """many=True serializer that overlays the buffered counters of the whole batch at once."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        overlay_once(items, buffered_fields(self.child))
+        return super().to_representation(items)
+
+
+class BufferedCountersMixin:
+    """ModelSerializer mixin: overlay a single instance (no-op for rows of an overlaid batch)."""
+
+    def to_representation(self, instance):
+        overlay_once([instance], buffered_fields(self))
+        return super().to_representation(instance)
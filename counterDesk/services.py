@@ -0,0 +1,146 @@
+# counterDesk/services.py
+"""
+Write-behind engagement counters (views, likes, shares, favourites, comment likes,
+live poll votes).
+
+Hot-path increments are buffered in one Redis hash with HINCRBY: atomic, no DB row lock.
+`flush()` (run by `manage.py flush_counters`) moves the aggregated deltas into the DB with
+F() expressions, one UPDATE per (model, field, delta) group. Without a Redis cache backend
+(e.g., local runs on LocMemCache) increments fall back to a direct F() update.
+Responses render DB value + pending delta: `overlay()`, wired into serializers through
+counterDesk.serializers.
+
+Buffer layout:
+  counters:pending              hash  "<app_label.model>:<pk>:<field>" -> pending delta
+  counters:flushing:<token>     same hash, renamed away while a flush applies it
+"""
+import logging
+import uuid
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'counters:pending'
+FLUSHING_PREFIX = 'counters:flushing:'
+FLUSH_LOCK_KEY = 'counters:flush-lock'
+FLUSH_LOCK_TIMEOUT = 60  # seconds
+
+
+def _redis():
+    """Raw redis-py client behind the default cache, or None if the cache is not Redis."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except Exception:
+        return None
+
+
+def _member(model, pk, field: str) -> str:
+    return f"{model._meta.label_lower}:{pk}:{field}"
+
+
+def _parse_member(member) -> tuple[str, str, str]:
+    if isinstance(member, bytes):
+        member = member.decode()
+    label, pk, field = member.split(':')
+    return label, pk, field
+
+
+def increment(obj, field: str, amount: int = 1) -> int:
+    """
+    Add `amount` to `obj.<field>` and return the value the caller should display
+    (read-your-write: the loaded DB value plus whatever is still buffered).
+    """
+    model = type(obj)
+    r = _redis()
+    if r is not None:
+        try:
+            pending_delta = r.hincrby(PENDING_KEY, _member(model, obj.pk, field), amount)
+            return (getattr(obj, field) or 0) + int(pending_delta)
+        except Exception:
+            logger.warning("Counter buffer unavailable; writing %s.%s directly", model._meta.label, field, exc_info=True)
+
+    model.objects.filter(pk=obj.pk).update(**{field: F(field) + amount})
+    obj.refresh_from_db(fields=[field])
+    return getattr(obj, field)
+
+
+def pending(model, pks, field: str) -> dict:
+    """Buffered (not yet flushed) deltas for many rows in one round-trip: {pk: delta}."""
+    pks = list(pks)
+    r = _redis()
+    if r is None or not pks:
+        return {}
+    try:
+        values = r.hmget(PENDING_KEY, [_member(model, pk, field) for pk in pks])
+    except Exception:
+        return {}
+    return {pk: int(v) for pk, v in zip(pks, values) if v is not None}
+
+
+def overlay(objs, *fields) -> None:
+    """Add buffered deltas onto already-loaded instances in place (one HMGET per field)."""
+    objs = list(objs)
+    if not objs:
+        return
+    model = type(objs[0])
+    for field in fields:
+        deltas = pending(model, [o.pk for o in objs], field)
+        for o in objs:
+            if o.pk in deltas:
+                setattr(o, field, (getattr(o, field) or 0) + deltas[o.pk])
+
+
+def flush() -> int:
+    """
+    Apply buffered deltas to the DB. Returns the number of counters applied.
+    Safe to run from several workers: a Redis lock serialises flushes, and hashes left
+    behind by a crashed flush are picked up by the next one.
+    """
+    r = _redis()
+    if r is None:
+        return 0
+
+    lock = r.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return 0
+    try:
+        keys = list(r.scan_iter(match=f"{FLUSHING_PREFIX}*"))
+        if r.exists(PENDING_KEY):
+            # RENAME is atomic: new increments immediately start a fresh pending hash
+            token = f"{FLUSHING_PREFIX}{uuid.uuid4().hex}"
+            r.rename(PENDING_KEY, token)
+            keys.append(token)
+
+        applied = 0
+        for key in keys:
+            applied += _apply(r.hgetall(key))
+            r.delete(key)
+        return applied
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            # Lock expired mid-flush; nothing left to release
+            pass
+
+
+def _apply(deltas: dict) -> int:
+    # Group rows sharing (model, field, delta) so each group is a single UPDATE ... WHERE pk IN (...)
+    groups = defaultdict(list)
+    for member, value in deltas.items():
+        delta = int(value)
+        if delta == 0:
+            continue
+        label, pk, field = _parse_member(member)
+        groups[(label, field, delta)].append(pk)
+
+    with transaction.atomic():
+        for (label, field, delta), pks in groups.items():
+            model = apps.get_model(label)
+            model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+    return sum(len(pks) for pks in groups.values())
@@ -6,7 +6,7 @@ from rest_framework.decorators import action
 from pratilipiPc import settings
 from .models import SubmissionStartSerializer, TermsAndConditions, Submissions, CreatorComics
 from .serializers import TermsAndConditionsSerializer, SubmissionSerializer, CreatorComicSerializer
-from premiumDesk.models import SubscriptionModel
+from premiumDesk.entitlements import is_user_premium
 from notificationDesk.models import NotificationModel
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -20,6 +20,7 @@ import os
 import boto3
 from botocore.exceptions import ClientError
 from digitalcomicDesk.models import ComicModel, EpisodeModel
+from counterDesk import services as counters
 import json
 
 logger = logging.getLogger(__name__)
@@ -31,7 +32,7 @@ class CreatorDeskViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def verify_premium(self, request):
         user = request.user
-        is_premium = SubscriptionModel.objects.filter(user=user, end_date__gt=timezone.now()).exists()
+        is_premium = is_user_premium(user)
         redirect_url = "/api/premium/subscribe/" if not is_premium else None
         return Response({"is_premium": is_premium, "redirect_url": redirect_url}, status=status.HTTP_200_OK)
 
@@ -173,7 +174,8 @@ class CreatorDeskViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     @method_decorator(cache_page(60 * 60))  # Cache for 1 hour
     def home_creators_comics(self, request):
-        comics = ComicModel.objects.filter(is_creator_comic=True)
+        comics = list(ComicModel.objects.filter(is_creator_comic=True))
+        counters.overlay(comics, 'view_count')
         data = [{"comic_id": c.id, "title": c.title, "cover_url": c.cover_image.url if c.cover_image else None, "stars": float(c.rating), "views": c.view_count} for c in comics]
         # Update HomeTabConfig
         from homeDesk.models import HomeTabConfig
@@ -10,12 +10,13 @@ from .models import (
     EpisodeModel,
     CommentModel,
     SliceModel,
+    SliceDerivativeModel,
     EpisodeAccess,
 )
 from .forms import EpisodeZipUploadForm
     # Expects a single FileField named 'zip_file'
 from .services import import_episode_slices_zip
-    # Expects import_episode_slices_zip(episode, zip_file) -> report with .errors, .created_slices, .replaced_existing, .accepted_images, .total_in_zip
+    # Expects import_episode_slices_zip(episode, zip_file) -> report with .errors, .created_slices, .replaced_existing, .accepted_images, .total_in_zip, .timings
 
 
 @admin.register(ComicModel)
@@ -34,15 +35,6 @@ class SliceInline(admin.TabularInline):
     show_change_link = True
 
 
-class CommentInline(admin.TabularInline):
-    model = CommentModel
-    extra = 0
-    fields = ('user', 'parent', 'comment_text', 'likes_count', 'timestamp')
-    readonly_fields = ('timestamp',)
-    ordering = ('-timestamp',)
-    show_change_link = True
-
-
 @admin.register(EpisodeModel)
 class EpisodeAdmin(admin.ModelAdmin):
     list_display = (
@@ -58,8 +50,9 @@ class EpisodeAdmin(admin.ModelAdmin):
     list_filter = ('is_free', 'is_locked', 'comic')
     search_fields = ('comic__title',)
     ordering = ('comic', 'episode_number')
-    inlines = [SliceInline, CommentInline]
-    readonly_fields = ('upload_zip_action',)
+    # Comments are reached through a filtered changelist link: inlining them renders every row
+    inlines = [SliceInline]
+    readonly_fields = ('upload_zip_action', 'comments_link')
     fields = (
         'comic',
         'episode_number',
@@ -72,6 +65,7 @@ class EpisodeAdmin(admin.ModelAdmin):
         'likes_count',
         'shares_count',
         'comments_count',
+        'comments_link',
         'upload_zip_action',
     )
 
@@ -102,6 +96,13 @@ class EpisodeAdmin(admin.ModelAdmin):
         )
     upload_zip_action.short_description = "Slices Import"
 
+    def comments_link(self, obj):
+        if not obj or not obj.pk:
+            return "-"
+        url = reverse('admin:digitalcomicDesk_commentmodel_changelist')
+        return format_html('<a href="{}?episode__id__exact={}">View comments ({})</a>', url, obj.pk, obj.comments_count)
+    comments_link.short_description = "Comments"
+
     def upload_zip_view(self, request, object_id, *args, **kwargs):
         """
         Custom admin view to upload a ZIP of slices for a given Episode.
@@ -117,16 +118,25 @@ class EpisodeAdmin(admin.ModelAdmin):
                 if getattr(report, 'errors', None):
                     for err in report.errors:
                         messages.error(request, err)
+                for warning in getattr(report, 'warnings', None) or []:
+                    messages.warning(request, warning)
 
                 created = getattr(report, 'created_slices', 0)
                 replaced = getattr(report, 'replaced_existing', 0)
                 accepted = getattr(report, 'accepted_images', 0)
                 total = getattr(report, 'total_in_zip', 0)
 
+                timings = getattr(report, 'timings', None) or {}
+                timing_text = ", ".join(f"{phase}={secs:.2f}s" for phase, secs in timings.items())
+
+                derivatives = getattr(report, 'created_derivatives', 0)
+
                 messages.info(
                     request,
                     f"ZIP processed: total={total}, accepted_images={accepted}, "
-                    f"replaced_existing={replaced}, created_slices={created}"
+                    f"replaced_existing={replaced}, created_slices={created}, "
+                    f"created_derivatives={derivatives}"
+                    + (f" ({timing_text})" if timing_text else "")
                 )
 
                 change_url = reverse('admin:digitalcomicDesk_episodemodel_change', args=[episode.pk])
@@ -158,6 +168,17 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = ('comment_text', 'user__username', 'episode__comic__title')
     ordering = ('-timestamp',)
     readonly_fields = ()
+    list_select_related = ('episode__comic', 'user')
+    raw_id_fields = ('episode', 'user', 'parent')
+
+
+class SliceDerivativeInline(admin.TabularInline):
+    model = SliceDerivativeModel
+    extra = 0
+    fields = ('width', 'height', 'format', 'file', 'size_bytes')
+    readonly_fields = ('width', 'height', 'format', 'file', 'size_bytes')
+    ordering = ('width', 'format')
+    can_delete = True
 
 
 @admin.register(SliceModel)
@@ -166,6 +187,16 @@ class SliceAdmin(admin.ModelAdmin):
     list_filter = ('episode',)
     search_fields = ('episode__comic__title',)
     ordering = ('episode', 'order')
+    inlines = [SliceDerivativeInline]
+
+
+@admin.register(SliceDerivativeModel)
+class SliceDerivativeAdmin(admin.ModelAdmin):
+    list_display = ('slice', 'width', 'height', 'format', 'size_bytes')
+    list_select_related = ('slice', 'slice__episode', 'slice__episode__comic')
+    list_filter = ('format', 'width')
+    search_fields = ('slice__episode__comic__title',)
+    ordering = ('slice', 'width', 'format')
 
 
 @admin.register(EpisodeAccess)
@@ -2,18 +2,16 @@
 
 from dataclasses import dataclass
 from typing import Tuple
-from django.db import transaction
+from premiumDesk import wallet
+from premiumDesk.entitlements import EpisodeEntitlementIndex, is_user_premium  # noqa: F401 (re-exported)
 from profileDesk.models import CustomUser
 
-# In future, replace with premiumDesk services/models
+from .models import EpisodeAccess
 
-def is_user_premium(user: CustomUser) -> bool:
-    """
-    Stub premium check. Replace with premiumDesk integration:
-    - e.g., Subscription.objects.filter(user=user, active=True).exists()
-    """
-    # TODO: integrate premiumDesk here
-    return getattr(user, "is_premium", False) or False
+# Premium status comes from premiumDesk.entitlements (cached, memoised per request)
+
+# Per-user unlocked episode ids per comic (Redis-backed); EpisodeAccess stays the source of truth
+episode_entitlements = EpisodeEntitlementIndex(EpisodeAccess, namespace='digital')
 
 
 @dataclass
@@ -24,31 +22,29 @@ class DebitResult:
     error_message: str | None = None
 
 
-@transaction.atomic
-def debit_coins(user: CustomUser, amount: int, idempotency_key: str) -> DebitResult:
+def debit_coins(user: CustomUser, amount: int, idempotency_key: str,
+                link_model: str | None = None, link_id: str | None = None) -> DebitResult:
     """
-    Stub wallet debit using user.coin_count. Replace with premiumDesk WalletLedger.
-    Idempotency behavior (stub): no-op; upstream should prevent duplicate charges by access check.
+    Debit through the premiumDesk wallet: one conditional UPDATE plus a WalletLedger row.
+    Replaying the same idempotency_key succeeds without charging again.
     """
     current = getattr(user, "coin_count", 0) or 0
     if amount <= 0:
         return DebitResult(success=True, new_balance=current)
 
-    if current < amount:
+    result = wallet.debit(
+        user,
+        amount=amount,
+        idempotency_key=idempotency_key,
+        reason='unlock_episode',
+        link_model=link_model,
+        link_id=link_id,
+    )
+    if not result.success:
         return DebitResult(
             success=False,
-            new_balance=current,
-            error_code="insufficient_balance",
-            error_message="Insufficient coins",
+            new_balance=result.balance,
+            error_code=result.error_code,
+            error_message="Insufficient coins" if result.error_code == wallet.INSUFFICIENT_BALANCE else "Idempotency key conflict",
         )
-
-    new_balance = current - amount
-    setattr(user, "coin_count", new_balance)
-    # Persist only if coin_count is a real DB field on CustomUser
-    try:
-        user.save(update_fields=["coin_count"])
-    except Exception:
-        # Fallback save
-        user.save()
-
-    return DebitResult(success=True, new_balance=new_balance)
\ No newline at end of file
+    return DebitResult(success=True, new_balance=result.balance)
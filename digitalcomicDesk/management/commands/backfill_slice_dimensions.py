@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from digitalcomicDesk.models import SliceModel
+from pratilipiPc.media import protected_storage
+from digitalcomicDesk.services import invalidate_episode_manifest, probe_image_size
+
+
+def _init_worker():
+    # No-op after fork; required when the platform spawns fresh interpreters
+    django.setup()
+
+
+def _probe_chunk(rows):
+    """
+    Runs in a worker process. rows: [(slice_id, file_name), ...]
+    Returns [(slice_id, width, height), ...] for the slices whose header could be read.
+    """
+    results = []
+    storage = protected_storage()
+    for slice_id, name in rows:
+        try:
+            with storage.open(name, 'rb') as fh:
+                width, height = probe_image_size(fh)
+        except Exception:
+            continue
+        if width and height:
+            results.append((slice_id, width, height))
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill SliceModel.width/height from the stored image headers. "
+        "Slices are probed in chunks spread over a process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200, help='Slices per worker task (default 200)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: CPU count)')
+        parser.add_argument('--episode', help='Only backfill slices of this episode id')
+        parser.add_argument('--all', action='store_true', help='Re-probe slices that already have a height')
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        workers = max(1, options['workers'])
+
+        qs = SliceModel.objects.all()
+        if not options['all']:
+            qs = qs.filter(height__isnull=True)
+        if options['episode']:
+            qs = qs.filter(episode_id=options['episode'])
+        rows = list(qs.order_by('episode_id', 'order').values_list('id', 'file', 'episode_id'))
+
+        if not rows:
+            self.stdout.write("Nothing to backfill.")
+            return
+
+        episode_of = {slice_id: episode_id for slice_id, _, episode_id in rows}
+        chunks = [
+            [(slice_id, name) for slice_id, name, _ in rows[i:i + chunk_size]]
+            for i in range(0, len(rows), chunk_size)
+        ]
+        self.stdout.write(f"Probing {len(rows)} slices in {len(chunks)} chunks with {workers} workers...")
+
+        # Workers only touch storage; never hand them an open DB connection
+        connections.close_all()
+
+        updated = 0
+        touched_episodes = set()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_probe_chunk, chunk) for chunk in chunks]
+            for fut in as_completed(futures):
+                results = fut.result()
+                if not results:
+                    continue
+                objs = [SliceModel(id=slice_id, width=w, height=h) for slice_id, w, h in results]
+                SliceModel.objects.bulk_update(objs, ['width', 'height'], batch_size=chunk_size)
+                updated += len(objs)
+                touched_episodes.update(episode_of[slice_id] for slice_id, _, _ in results)
+
+        # bulk_update sends no signals
+        invalidate_episode_manifest(*touched_episodes)
+
+        skipped = len(rows) - updated
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {updated} slices across {len(touched_episodes)} episodes ({skipped} unreadable)."
+        ))
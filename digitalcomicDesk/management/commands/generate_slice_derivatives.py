@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from digitalcomicDesk.models import SliceModel, SliceDerivativeModel
+from digitalcomicDesk.services import (
+    DERIVATIVE_WORKERS,
+    invalidate_episode_manifest,
+    render_slice_derivatives,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate 480/720/1080 progressive JPEG + WebP renditions for existing slices "
+        "(slices imported before derivatives existed, or all with --force)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--episode', help='Only process slices of this episode id')
+        parser.add_argument('--workers', type=int, default=DERIVATIVE_WORKERS, help='Encoder processes (default: CPU count)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Slices per batch (default 200)')
+        parser.add_argument('--force', action='store_true', help='Regenerate slices that already have renditions')
+
+    def handle(self, *args, **options):
+        qs = SliceModel.objects.all()
+        if options['episode']:
+            qs = qs.filter(episode_id=options['episode'])
+        if not options['force']:
+            qs = qs.filter(derivatives__isnull=True)
+        slices = list(qs.order_by('episode_id', 'order'))
+        if not slices:
+            self.stdout.write("Nothing to do.")
+            return
+
+        batch_size = max(1, options['batch_size'])
+        created = 0
+        for i in range(0, len(slices), batch_size):
+            batch = slices[i:i + batch_size]
+            derivatives, errors = render_slice_derivatives(batch, workers=options['workers'])
+            for err in errors:
+                self.stderr.write(err)
+
+            done = {d.slice_id for d in derivatives}
+            with transaction.atomic():
+                old = SliceDerivativeModel.objects.filter(slice_id__in=done)
+                old_files = list(old.values_list('file', flat=True))
+                old.delete()
+                SliceDerivativeModel.objects.bulk_create(derivatives)
+                invalidate_episode_manifest(*{s.episode_id for s in batch})
+
+            new_files = {d.file.name for d in derivatives}
+            for name in old_files:
+                # Regenerated files normally get fresh names; never delete one just written
+                if name not in new_files:
+                    try:
+                        SliceDerivativeModel.file.field.storage.delete(name)
+                    except Exception:
+                        pass
+
+            created += len(derivatives)
+            self.stdout.write(f"Processed {min(i + batch_size, len(slices))}/{len(slices)} slices")
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} renditions."))
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from counterDesk.services import flush
+from digitalcomicDesk.models import CommentModel, EpisodeModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute EpisodeModel.comments_count from CommentModel in batches of episodes. "
+        "likes_count/shares_count have no source table; their buffered deltas are flushed first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Episodes per batch (default 500)')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches')
+        parser.add_argument('--comic', help='Only reconcile episodes of this comic id')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+        parser.add_argument('--skip-flush', action='store_true', help='Do not flush buffered like/share counters')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+
+        if not options['skip_flush'] and not dry_run:
+            self.stdout.write(f"Flushed {flush()} buffered counters (likes/shares/views).")
+
+        episodes = EpisodeModel.objects.order_by('id')
+        if options['comic']:
+            episodes = episodes.filter(comic_id=options['comic'])
+
+        scanned = drifted = fixed = 0
+        last_id = None
+        while True:
+            # Keyset walk over the pk: every batch is an index range, never an OFFSET scan
+            batch = episodes if last_id is None else episodes.filter(id__gt=last_id)
+            stored = dict(batch.values_list('id', 'comments_count')[:batch_size])
+            if not stored:
+                break
+            last_id = max(stored)
+            scanned += len(stored)
+
+            actual = dict(
+                CommentModel.objects
+                .filter(episode_id__in=stored.keys(), parent__isnull=True)
+                .values_list('episode_id')
+                .annotate(n=Count('id'))
+                .order_by()
+            )
+            for episode_id, count in stored.items():
+                expected = actual.get(episode_id, 0)
+                if count == expected:
+                    continue
+                drifted += 1
+                self.stdout.write(f"Episode {episode_id}: comments_count {count} -> {expected}")
+                if dry_run:
+                    continue
+                # Compare-and-set on the value just read: a comment landing in between wins,
+                # and the next run picks the row up again. Single-row autocommit updates only.
+                fixed += EpisodeModel.objects.filter(id=episode_id, comments_count=count).update(comments_count=expected)
+
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} episodes: {drifted} drifted, {fixed} fixed{' (dry run)' if dry_run else ''}."
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 03:53
+
+import digitalcomicDesk.models
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('digitalcomicDesk', '0007_episodeaccess_slicemodel_alter_comicmodel_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SliceDerivativeModel',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('width', models.PositiveIntegerField(help_text='Pixel width of this rendition')),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('format', models.CharField(choices=[('jpeg', 'Progressive JPEG'), ('webp', 'WebP')], max_length=8)),
+                ('file', models.ImageField(upload_to=digitalcomicDesk.models.derivative_upload_path)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('slice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='digitalcomicDesk.slicemodel')),
+            ],
+            options={
+                'verbose_name': 'Slice Derivative',
+                'verbose_name_plural': 'Slice Derivatives',
+                'ordering': ['slice', 'width', 'format'],
+                'indexes': [models.Index(fields=['slice', 'width'], name='digitalcomi_slice_i_003e99_idx')],
+                'unique_together': {('slice', 'width', 'format')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('digitalcomicDesk', '0008_slicederivativemodel'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='commentmodel',
+            index=models.Index(fields=['episode', 'parent', 'timestamp', 'id'], name='digitalcomi_episode_62e7e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentmodel',
+            index=models.Index(fields=['parent', 'timestamp', 'id'], name='digitalcomi_parent__82eb63_idx'),
+        ),
+    ]
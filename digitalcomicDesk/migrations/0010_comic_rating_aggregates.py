@@ -0,0 +1,72 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rating_sum(apps, schema_editor):
+    # Legacy ratings were anonymous averages: keep them by seeding rating_sum so that
+    # rating_sum / rating_count reproduces the stored average. The histogram only
+    # covers ratings recorded from now on.
+    ComicModel = apps.get_model('digitalcomicDesk', 'ComicModel')
+    for comic in ComicModel.objects.filter(rating_count__gt=0).only('id', 'rating', 'rating_count').iterator():
+        ComicModel.objects.filter(pk=comic.pk).update(rating_sum=round(comic.rating * comic.rating_count))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('digitalcomicDesk', '0009_commentmodel_thread_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comicmodel',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comicmodel',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comicmodel',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comicmodel',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comicmodel',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comicmodel',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ComicRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stars', models.PositiveSmallIntegerField(choices=[(1, 1), (2, 2), (3, 3), (4, 4), (5, 5)])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('comic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='digitalcomicDesk.comicmodel')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digital_comic_ratings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Comic Rating',
+                'verbose_name_plural': 'Comic Ratings',
+                'unique_together': {('user', 'comic')},
+            },
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+    ]
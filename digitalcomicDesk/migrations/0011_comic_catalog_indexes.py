@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('digitalcomicDesk', '0010_comic_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comicmodel',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['-view_count', '-id'], name='digitalcomi_view_co_9b2e1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['-rating', '-id'], name='digitalcomi_rating_9ac848_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['-created_at', '-id'], name='digitalcomi_created_17d4e8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['genre', '-view_count', '-id'], name='digitalcomi_genre_3692d9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['genre', '-rating', '-id'], name='digitalcomi_genre_2ddc73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['genre', '-created_at', '-id'], name='digitalcomi_genre_0d9bd1_idx'),
+        ),
+    ]
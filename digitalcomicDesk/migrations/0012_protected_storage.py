@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:42
+
+import digitalcomicDesk.models
+import pratilipiPc.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('digitalcomicDesk', '0011_comic_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='episodemodel',
+            name='content_file',
+            field=models.FileField(blank=True, help_text='Upload PDF file for this episode (optional)', null=True, storage=pratilipiPc.media.protected_storage, upload_to='digitalcomics/episodes/'),
+        ),
+        migrations.AlterField(
+            model_name='slicederivativemodel',
+            name='file',
+            field=models.ImageField(storage=pratilipiPc.media.protected_storage, upload_to=digitalcomicDesk.models.derivative_upload_path),
+        ),
+        migrations.AlterField(
+            model_name='slicemodel',
+            name='file',
+            field=models.ImageField(storage=pratilipiPc.media.protected_storage, upload_to=digitalcomicDesk.models.slice_upload_path),
+        ),
+    ]
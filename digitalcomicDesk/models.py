@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.utils import timezone
+from pratilipiPc.media import protected_storage
 from profileDesk.models import CustomUser
 
 
@@ -10,6 +11,11 @@ def slice_upload_path(instance, filename):
     return f"digitalcomics/episodes/{instance.episode_id}/slices/{filename}"
 
 
+def derivative_upload_path(instance, filename):
+    # Store next to the source slices: digitalcomics/episodes/<episode_id>/slices/derived/<filename>
+    return f"digitalcomics/episodes/{instance.slice.episode_id}/slices/derived/{filename}"
+
+
 class ComicModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=200)
@@ -20,13 +26,29 @@ class ComicModel(models.Model):
     view_count = models.IntegerField(default=0)
     favourite_count = models.IntegerField(default=0)
     rating_count = models.PositiveIntegerField(default=0)
+    # Rating aggregates (counterDesk.ratings): average = rating_sum / rating_count,
+    # rating_1..rating_5 = star histogram. `rating` is a derived copy kept for sorting.
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
     is_creator_comic = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = "Digital Comic"
         verbose_name_plural = "Digital Comics"
         indexes = [
             models.Index(fields=["genre"]),
+            # Catalog sorts (digitalcomicDesk.pagination.ComicCatalogPagination), with and without genre
+            models.Index(fields=["-view_count", "-id"]),
+            models.Index(fields=["-rating", "-id"]),
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["genre", "-view_count", "-id"]),
+            models.Index(fields=["genre", "-rating", "-id"]),
+            models.Index(fields=["genre", "-created_at", "-id"]),
         ]
 
     def __str__(self):
@@ -41,7 +63,7 @@ class EpisodeModel(models.Model):
     # Optional PDF or external URL; image-slice pipeline uses SliceModel
     content_url = models.URLField(blank=True, null=True)
     content_file = models.FileField(
-        upload_to='digitalcomics/episodes/', blank=True, null=True,
+        upload_to='digitalcomics/episodes/', storage=protected_storage, blank=True, null=True,
         help_text="Upload PDF file for this episode (optional)"
     )
 
@@ -91,7 +113,7 @@ class SliceModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     episode = models.ForeignKey(EpisodeModel, on_delete=models.CASCADE, related_name='slices')
     order = models.PositiveIntegerField(help_text="1-based sequential order within the episode")
-    file = models.ImageField(upload_to=slice_upload_path)
+    file = models.ImageField(upload_to=slice_upload_path, storage=protected_storage)
     width = models.PositiveIntegerField(default=1080, help_text="Pixel width, e.g., 1080")
     height = models.PositiveIntegerField(null=True, blank=True, help_text="Pixel height if known")
 
@@ -108,6 +130,39 @@ class SliceModel(models.Model):
         return f"{self.episode} - Slice {self.order}"
 
 
+class SliceDerivativeModel(models.Model):
+    """
+    Downscaled/re-encoded rendition of a slice (e.g., 480px WebP) generated at import time.
+    The reader endpoint picks the smallest rendition that still covers the client's width hint.
+    """
+    FORMAT_JPEG = 'jpeg'
+    FORMAT_WEBP = 'webp'
+    FORMAT_CHOICES = [
+        (FORMAT_JPEG, 'Progressive JPEG'),
+        (FORMAT_WEBP, 'WebP'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    slice = models.ForeignKey(SliceModel, on_delete=models.CASCADE, related_name='derivatives')
+    width = models.PositiveIntegerField(help_text="Pixel width of this rendition")
+    height = models.PositiveIntegerField(null=True, blank=True)
+    format = models.CharField(max_length=8, choices=FORMAT_CHOICES)
+    file = models.ImageField(upload_to=derivative_upload_path, storage=protected_storage)
+    size_bytes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('slice', 'width', 'format')
+        ordering = ['slice', 'width', 'format']
+        indexes = [
+            models.Index(fields=['slice', 'width']),
+        ]
+        verbose_name = "Slice Derivative"
+        verbose_name_plural = "Slice Derivatives"
+
+    def __str__(self):
+        return f"{self.slice} - {self.width}px {self.format}"
+
+
 class EpisodeAccess(models.Model):
     """
     Per-user access record for an episode (unlocked via coins or premium).
@@ -168,9 +223,31 @@ class CommentModel(models.Model):
             models.Index(fields=['episode']),
             models.Index(fields=['user']),
             models.Index(fields=['parent']),
+            # Keyset pages of top-level threads and windowed reply prefetch
+            models.Index(fields=['episode', 'parent', 'timestamp', 'id']),
+            models.Index(fields=['parent', 'timestamp', 'id']),
         ]
         verbose_name = "Comment"
         verbose_name_plural = "Comments"
 
     def __str__(self):
-        return f"{self.user.username} - {self.comment_text}"
\ No newline at end of file
+        return f"{self.user.username} - {self.comment_text}"
+
+class ComicRating(models.Model):
+    """
+    One star rating per user and comic. Aggregates on ComicModel are folded in
+    incrementally by counterDesk.ratings.apply_rating.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='digital_comic_ratings')
+    comic = models.ForeignKey(ComicModel, on_delete=models.CASCADE, related_name='ratings')
+    stars = models.PositiveSmallIntegerField(choices=[(i, i) for i in range(1, 6)])
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'comic')
+        verbose_name = "Comic Rating"
+        verbose_name_plural = "Comic Ratings"
+
+    def __str__(self):
+        return f"{self.user.username} rated {self.comic} {self.stars}"
@@ -0,0 +1,32 @@
+from pratilipiPc.catalog import CatalogPagination
+from pratilipiPc.pagination import KeysetPagination
+
+
+class EpisodeCursorPagination(KeysetPagination):
+    ordering = ('episode_number', 'id')
+    page_size = 50
+    max_page_size = 200
+
+
+class CommentCursorPagination(KeysetPagination):
+    # Newest threads first; served by the (episode, parent, timestamp, id) index
+    ordering = ('-timestamp', '-id')
+    page_size = 20
+    max_page_size = 100
+
+
+class ReplyCursorPagination(KeysetPagination):
+    # Oldest replies first within a thread; served by the (parent, timestamp, id) index
+    ordering = ('timestamp', 'id')
+    page_size = 20
+    max_page_size = 100
+
+
+class ComicCatalogPagination(CatalogPagination):
+    # Each ordering has a matching (ordering) and (genre, ordering) index on ComicModel
+    sorts = {
+        'popular': ('-view_count', '-id'),
+        'rating': ('-rating', '-id'),
+        'newest': ('-created_at', '-id'),
+    }
+    default_sort = 'newest'
@@ -1,16 +1,34 @@
+import math
+
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
+
+from counterDesk import ratings
+from counterDesk.serializers import (
+    BufferedCountersListSerializer,
+    BufferedCountersMixin,
+    buffered_fields,
+    overlay_once,
+)
+from pratilipiPc import media
+from pratilipiPc.catalog import SparseFieldsMixin
 from .models import (
     ComicModel,
     EpisodeModel,
     CommentModel,
     SliceModel,
+    SliceDerivativeModel,
     EpisodeAccess,
 )
+from .integrations import is_user_premium, episode_entitlements
+from .pagination import ReplyCursorPagination
+from .services import pick_slice_variant
 
 
-class ComicSerializer(serializers.ModelSerializer):
-    # Keep decimal numeric in JSON
-    rating = serializers.DecimalField(max_digits=3, decimal_places=1, coerce_to_string=False)
+class ComicSerializer(BufferedCountersMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    # Derived from the integer aggregates (rating_sum / rating_count), numeric in JSON
+    rating = serializers.SerializerMethodField()
+    rating_breakdown = serializers.SerializerMethodField()
 
     class Meta:
         model = ComicModel
@@ -21,14 +39,61 @@ class ComicSerializer(serializers.ModelSerializer):
             'cover_image',
             'description',
             'rating',
+            'rating_breakdown',
             'view_count',
             'favourite_count',
             # rating_count intentionally not exposed (unchanged from previous API)
         ]
+        buffered_counters = ['view_count', 'favourite_count']
+        list_serializer_class = BufferedCountersListSerializer
+
+    def get_rating(self, obj):
+        return ratings.average(obj)
+
+    def get_rating_breakdown(self, obj):
+        return ratings.breakdown(obj)
+
+
+def parse_rendition_hint(request):
+    """
+    Read the client's slice size hint: ?w=<css px>&dpr=<ratio>&fmt=webp (or Accept: image/webp).
+    Returns (target_width_px | None, accept_webp).
+    """
+    if request is None:
+        return None, False
+    params = getattr(request, 'query_params', request.GET)
+    target_width = None
+    try:
+        w = int(params.get('w') or 0)
+        dpr = float(params.get('dpr') or 1)
+        if w > 0:
+            target_width = min(int(math.ceil(w * min(max(dpr, 1.0), 4.0))), 4096)
+    except (TypeError, ValueError):
+        target_width = None
+    accept_webp = (
+        (params.get('fmt') or '').lower() == 'webp'
+        or 'image/webp' in request.META.get('HTTP_ACCEPT', '')
+    )
+    return target_width, accept_webp
+
+
+class SliceDerivativeSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SliceDerivativeModel
+        fields = ['width', 'height', 'format', 'url']
+
+    def get_url(self, obj):
+        return media.signed_url(self.context.get('request'), obj.file.name) if obj.file else None
 
 
 class SliceSerializer(serializers.ModelSerializer):
-    # Expose resolved URL (supports S3 or local storage)
+    """
+    Slice with its best rendition for the request's ?w=/dpr hint (see parse_rendition_hint).
+    Prefetch 'derivatives' when serializing many slices.
+    """
+    # Signed media link (pratilipiPc.media); works for S3 or local storage
     url = serializers.SerializerMethodField()
 
     class Meta:
@@ -36,19 +101,26 @@ class SliceSerializer(serializers.ModelSerializer):
         fields = ['order', 'url', 'width', 'height']
 
     def get_url(self, obj):
-        try:
-            return obj.file.url if obj.file else None
-        except Exception:
-            return None
+        return media.signed_url(self.context.get('request'), obj.file.name) if obj.file else None
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        target_width, accept_webp = parse_rendition_hint(self.context.get('request'))
+        if not target_width:
+            return data
+        data['variants'] = SliceDerivativeSerializer(instance.derivatives.all(), many=True, context=self.context).data
+        return pick_slice_variant(data, target_width, accept_webp)
 
 
-class EpisodeSerializer(serializers.ModelSerializer):
+class EpisodeSerializer(BufferedCountersMixin, serializers.ModelSerializer):
     # Engagement counters (read-only)
     likes_count = serializers.IntegerField(read_only=True)
     shares_count = serializers.IntegerField(read_only=True)
     comments_count = serializers.IntegerField(read_only=True)
     # Helpful for chaining in UI
     next_episode_id = serializers.SerializerMethodField()
+    prev_episode_id = serializers.SerializerMethodField()
+    is_locked_for_user = serializers.SerializerMethodField()
 
     class Meta:
         model = EpisodeModel
@@ -66,14 +138,62 @@ class EpisodeSerializer(serializers.ModelSerializer):
             'shares_count',
             'comments_count',
             'next_episode_id',
+            'prev_episode_id',
+            'is_locked_for_user',
         ]
+        buffered_counters = ['likes_count', 'shares_count']
+        list_serializer_class = BufferedCountersListSerializer
+
+    # List views pass precomputed maps in context (see DigitalComicViewSet.details):
+    #   episode_links:         {episode_id: (prev_id, next_id)}
+    #   unlocked_episode_ids:  set of episode ids the caller holds EpisodeAccess for (entitlement index)
+    #   is_premium:            caller's premium state
+    # Without them each field falls back to its own query.
 
     def get_next_episode_id(self, obj):
+        links = self.context.get('episode_links')
+        if links is not None:
+            nxt = links.get(obj.id, (None, None))[1]
+            return str(nxt) if nxt else None
         nxt = obj.get_next_episode()
         return str(nxt.id) if nxt else None
 
+    def get_prev_episode_id(self, obj):
+        links = self.context.get('episode_links')
+        if links is not None:
+            prev = links.get(obj.id, (None, None))[0]
+            return str(prev) if prev else None
+        prev = EpisodeModel.objects.filter(
+            comic_id=obj.comic_id, episode_number=obj.episode_number - 1
+        ).values_list('id', flat=True).first()
+        return str(prev) if prev else None
+
+    def get_is_locked_for_user(self, obj):
+        if not obj.is_locked or obj.is_free:
+            return False
+        unlocked = self.context.get('unlocked_episode_ids')
+        is_premium = self.context.get('is_premium')
+        if unlocked is None or is_premium is None:
+            request = self.context.get('request')
+            user = getattr(request, 'user', None)
+            if not user or not user.is_authenticated:
+                return True
+            if episode_entitlements.has_access(user, obj.comic_id, obj.id):
+                return False
+            return not is_user_premium(user)
+        return not (is_premium or obj.id in unlocked)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Paid PDF: signed media link for readers who may open it, nothing for the rest
+        if instance.content_file:
+            data['content_file'] = None if data['is_locked_for_user'] else media.signed_url(
+                self.context.get('request'), instance.content_file.name
+            )
+        return data
+
 
-class CommentChildSerializer(serializers.ModelSerializer):
+class CommentChildSerializer(BufferedCountersMixin, serializers.ModelSerializer):
     """
     Serializer for a reply (child comment).
     """
@@ -87,13 +207,31 @@ class CommentChildSerializer(serializers.ModelSerializer):
             'likes_count',
             'timestamp',
         ]
+        buffered_counters = ['likes_count']
+        list_serializer_class = BufferedCountersListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentListSerializer(BufferedCountersListSerializer):
+    """Overlays a thread page together with its prefetched first replies (one HMGET)."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        replies = [reply for comment in items for reply in getattr(comment, 'first_replies', None) or ()]
+        overlay_once(items + replies, buffered_fields(self.child))
+        return super().to_representation(items)
+
+
+class CommentSerializer(BufferedCountersMixin, serializers.ModelSerializer):
     """
     Top-level comment with immediate replies (threaded, shallow).
+
+    Thread listings prefetch the first K replies into `first_replies` (see
+    DigitalComicViewSet.episode_comments, K+1 rows fetched to detect more) and pass
+    `reply_limit` in context; `replies_next_cursor` then continues the thread via
+    the replies endpoint.
     """
     replies = serializers.SerializerMethodField()
+    replies_next_cursor = serializers.SerializerMethodField()
 
     class Meta:
         model = CommentModel
@@ -106,12 +244,31 @@ class CommentSerializer(serializers.ModelSerializer):
             'likes_count',
             'timestamp',
             'replies',
+            'replies_next_cursor',
         ]
+        buffered_counters = ['likes_count']
+        list_serializer_class = CommentListSerializer
+
+    def _reply_window(self, obj):
+        limit = self.context.get('reply_limit')
+        prefetched = getattr(obj, 'first_replies', None)
+        if prefetched is None or limit is None:
+            return None, None
+        return prefetched[:limit], len(prefetched) > limit
 
     def get_replies(self, obj):
-        # Only direct replies to avoid deep recursion
-        qs = obj.replies.all().order_by('timestamp')
-        return CommentChildSerializer(qs, many=True).data
+        replies, _ = self._reply_window(obj)
+        if replies is None:
+            # Only direct replies to avoid deep recursion
+            replies = obj.replies.all().order_by('timestamp')
+        return CommentChildSerializer(replies, many=True).data
+
+    def get_replies_next_cursor(self, obj):
+        replies, has_more = self._reply_window(obj)
+        if not has_more:
+            return None
+        paginator = ReplyCursorPagination()
+        return paginator.encode_cursor(replies[-1], paginator.ordering)
 
 
 class EpisodeSlicesResponseSerializer(serializers.Serializer):
@@ -1,17 +1,36 @@
 import io
 import os
 import re
+import threading
+import time
 import zipfile
-from dataclasses import dataclass
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
-from django.db import transaction
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.db import connection, transaction
+from PIL import Image
 
-from .models import EpisodeModel, SliceModel
+from pratilipiPc.media import protected_storage
+
+from .models import EpisodeModel, SliceModel, SliceDerivativeModel
 
 ZERO_PAD = 4  # 0001, 0002, ...
+IMPORT_UPLOAD_WORKERS = 8  # concurrent storage uploads per import (S3 round-trips dominate)
+
+# Derivative renditions generated for every slice (never upscaled past the source width)
+DERIVATIVE_WIDTHS = (480, 720, 1080)
+DERIVATIVE_WORKERS = os.cpu_count() or 1  # encoding is CPU bound; one process per core
+DERIVATIVE_JPEG_QUALITY = 82
+DERIVATIVE_WEBP_QUALITY = 80
+
+# Reader manifest cache. Bump MANIFEST_VERSION whenever the manifest shape changes
+# so old entries are ignored instead of being served with a stale layout.
+MANIFEST_VERSION = 3
+MANIFEST_TTL = 60 * 60 * 24  # seconds; entries are also invalidated on every slice/episode change
 
 
 @dataclass
@@ -21,6 +40,11 @@ class ImportReport:
     created_slices: int
     replaced_existing: int
     errors: List[str]
+    created_derivatives: int = 0
+    # Non-fatal problems (e.g., a rendition that failed to encode; the original is still served)
+    warnings: List[str] = field(default_factory=list)
+    # Seconds per phase: scan, upload, derivatives, db, cleanup, total
+    timings: Dict[str, float] = field(default_factory=dict)
 
 
 def _is_image_member(name: str) -> bool:
@@ -40,16 +64,171 @@ def _numeric_key(name: str) -> Tuple[int, str]:
     return (primary, base.lower())
 
 
-@transaction.atomic
+def _open_zip(zip_file) -> zipfile.ZipFile:
+    """
+    Open the uploaded archive in place: large uploads live in a temp file on disk
+    (TemporaryUploadedFile), small ones are already a file object. Never copy into memory.
+    """
+    temp_path = getattr(zip_file, 'temporary_file_path', None)
+    if callable(temp_path):
+        return zipfile.ZipFile(temp_path())
+    zip_file.seek(0)
+    return zipfile.ZipFile(zip_file)
+
+
+def probe_image_size(fh) -> Tuple[int | None, int | None]:
+    """
+    Read (width, height) from the image header only. Pillow's open() is lazy: for JPEG it
+    walks the markers up to the SOF segment and stops, no pixel data is decoded.
+    Returns (None, None) if the header cannot be parsed.
+    """
+    try:
+        with Image.open(fh) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _upload_member(zf: zipfile.ZipFile, member: zipfile.ZipInfo, slice_obj: SliceModel, fname: str) -> None:
+    # ZipFile serialises member reads on the shared handle, so workers can stream concurrently
+    with zf.open(member) as fh:
+        width, height = probe_image_size(fh)
+        if width and height:
+            slice_obj.width, slice_obj.height = width, height
+        fh.seek(0)
+        target = slice_obj.file.field.generate_filename(slice_obj, fname)
+        slice_obj.file.name = slice_obj.file.storage.save(target, File(fh, name=fname))
+
+
+def _delete_files(names: List[str]) -> None:
+    storage = protected_storage()
+    for name in names:
+        try:
+            if name and storage.exists(name):
+                storage.delete(name)
+        except Exception:
+            # Ignore storage delete failures; DB is already consistent
+            pass
+
+
+def _render_derivatives(job):
+    """
+    Runs in a worker process. job: (slice_id, source_name, target_dir, stem)
+    Encodes progressive JPEG + WebP renditions for DERIVATIVE_WIDTHS, saves them to storage
+    and returns (slice_id, [{'width', 'height', 'format', 'name', 'size'}, ...]).
+    """
+    slice_id, source_name, target_dir, stem = job
+    with protected_storage().open(source_name, 'rb') as fh:
+        with Image.open(fh) as src:
+            src = src.convert('RGB')
+
+    src_w, src_h = src.size
+    widths = [w for w in DERIVATIVE_WIDTHS if w < src_w] + [min(src_w, max(DERIVATIVE_WIDTHS))]
+    renditions = []
+    for width in sorted(set(widths)):
+        img = src if width == src_w else src.resize((width, max(1, round(src_h * width / src_w))), Image.LANCZOS)
+        encodings = [(SliceDerivativeModel.FORMAT_WEBP, 'webp', {'quality': DERIVATIVE_WEBP_QUALITY, 'method': 4})]
+        if width < src_w:
+            # Same-width JPEG would just duplicate the original
+            encodings.append((SliceDerivativeModel.FORMAT_JPEG, 'jpg', {
+                'quality': DERIVATIVE_JPEG_QUALITY, 'optimize': True, 'progressive': True,
+            }))
+        for fmt, ext, params in encodings:
+            buf = io.BytesIO()
+            img.save(buf, format='WEBP' if fmt == SliceDerivativeModel.FORMAT_WEBP else 'JPEG', **params)
+            name = protected_storage().save(f"{target_dir}/{stem}_{width}.{ext}", ContentFile(buf.getvalue()))
+            renditions.append({
+                'width': width, 'height': img.size[1], 'format': fmt, 'name': name, 'size': buf.tell(),
+            })
+    return slice_id, renditions
+
+
+def render_slice_derivatives(slices: List[SliceModel], workers: int | None = None):
+    """
+    Generate renditions for the given (saved or about-to-be-saved) slices in a process pool.
+    Returns (unsaved SliceDerivativeModel list, list of error strings).
+    """
+    if not slices:
+        return [], []
+    by_id = {s.id: s for s in slices}
+    jobs = [
+        (
+            s.id,
+            s.file.name,
+            f"{os.path.dirname(s.file.name)}/derived",
+            os.path.splitext(os.path.basename(s.file.name))[0],
+        )
+        for s in slices
+    ]
+
+    # Forked workers must not share a live DB socket; safe to drop outside a transaction
+    if not connection.in_atomic_block:
+        connection.close()
+
+    derivatives, errors = [], []
+    workers = max(1, min(workers or DERIVATIVE_WORKERS, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_render_derivatives, job): job[0] for job in jobs}
+        for fut in as_completed(futures):
+            slice_obj = by_id[futures[fut]]
+            try:
+                _, renditions = fut.result()
+            except Exception as e:
+                errors.append(f"Derivatives failed for slice {slice_obj.order}: {e}")
+                continue
+            for r in renditions:
+                d = SliceDerivativeModel(
+                    slice=slice_obj,
+                    width=r['width'],
+                    height=r['height'],
+                    format=r['format'],
+                    size_bytes=r['size'],
+                )
+                d.file.name = r['name']
+                derivatives.append(d)
+    return derivatives, errors
+
+
+def pick_slice_variant(slice_data: dict, target_width: int | None, accept_webp: bool, url_key: str = 'url') -> dict:
+    """
+    Choose the rendition to serve for one manifest slice entry.
+    - No width hint: the original upload (previous behaviour)
+    - Otherwise the narrowest rendition that still covers target_width (or the widest available),
+      preferring WebP when the client accepts it
+    Returns {order, <url_key>, width, height}; url_key is 'file' for manifest entries.
+    """
+    chosen = slice_data
+    if target_width:
+        candidates = [{'width': slice_data['width'], 'height': slice_data['height'], url_key: slice_data[url_key],
+                       'format': SliceDerivativeModel.FORMAT_JPEG}]
+        candidates += slice_data.get('variants') or []
+        if accept_webp and any(c['format'] == SliceDerivativeModel.FORMAT_WEBP for c in candidates):
+            candidates = [c for c in candidates if c['format'] == SliceDerivativeModel.FORMAT_WEBP]
+        else:
+            candidates = [c for c in candidates if c['format'] == SliceDerivativeModel.FORMAT_JPEG]
+        covering = [c for c in candidates if (c['width'] or 0) >= target_width]
+        chosen = min(covering, key=lambda c: c['width']) if covering else max(candidates, key=lambda c: c['width'] or 0)
+    return {
+        'order': slice_data['order'],
+        url_key: chosen[url_key],
+        'width': chosen['width'],
+        'height': chosen['height'],
+    }
+
+
 def import_episode_slices_zip(episode: EpisodeModel, zip_file) -> ImportReport:
     """
     Import slices from a ZIP file for a given episode.
     - Filters JPG/JPEG
     - Ignores nested folders; only root files are considered
     - Sorts by numeric filename (natural sort)
-    - Atomic Replace All (deletes previous SliceModel entries and their files)
-    - Saves via Django storage (S3/local), path digitalcomics/episodes/<episode_id>/slices/0001.jpg
-    Returns ImportReport.
+    - Reads true width/height from each image header (no decode)
+    - Generates 480/720/1080 progressive JPEG + WebP renditions in a process pool
+    - Streams members straight from the uploaded file to Django storage (S3/local) through a
+      bounded thread pool; path digitalcomics/episodes/<episode_id>/slices/0001.jpg
+    - Replace All in one short transaction (delete old rows + bulk_create new rows);
+      old files are removed only after commit, new files are removed if any upload fails
+    Returns ImportReport (with per-phase timings in seconds).
     """
     report = ImportReport(
         total_in_zip=0,
@@ -58,61 +237,206 @@ def import_episode_slices_zip(episode: EpisodeModel, zip_file) -> ImportReport:
         replaced_existing=0,
         errors=[],
     )
+    started = time.perf_counter()
 
-    # Read zip into memory
     try:
-        zip_bytes = zip_file.read()
-        zf = zipfile.ZipFile(io.BytesIO(zip_bytes))
+        zf = _open_zip(zip_file)
     except Exception as e:
         report.errors.append(f"Invalid ZIP: {e}")
         return report
 
-    # Collect files
-    members = [m for m in zf.infolist() if not m.is_dir()]
-    report.total_in_zip = len(members)
+    with zf:
+        # Collect files
+        members = [m for m in zf.infolist() if not m.is_dir()]
+        report.total_in_zip = len(members)
 
-    # Only root-level files; filter and sort
-    def is_root_level(m: zipfile.ZipInfo) -> bool:
-        # Accept files without '/' or with exactly one path segment (basename)
-        return '/' not in m.filename.strip('/')
+        # Only root-level files; filter and sort
+        def is_root_level(m: zipfile.ZipInfo) -> bool:
+            # Accept files without '/' or with exactly one path segment (basename)
+            return '/' not in m.filename.strip('/')
 
-    image_members = [m for m in members if is_root_level(m) and _is_image_member(os.path.basename(m.filename))]
-    image_members.sort(key=lambda m: _numeric_key(m.filename))
-    report.accepted_images = len(image_members)
+        image_members = [m for m in members if is_root_level(m) and _is_image_member(os.path.basename(m.filename))]
+        image_members.sort(key=lambda m: _numeric_key(m.filename))
+        report.accepted_images = len(image_members)
+        report.timings['scan'] = time.perf_counter() - started
 
-    if report.accepted_images == 0:
-        report.errors.append("No JPG/JPEG files found in ZIP root. Use 0001.jpg, 0002.jpg, ...")
+        if report.accepted_images == 0:
+            report.errors.append("No JPG/JPEG files found in ZIP root. Use 0001.jpg, 0002.jpg, ...")
+            return report
+
+        # Upload phase: rows are built in memory, files pushed to storage in parallel
+        phase = time.perf_counter()
+        new_slices = [
+            SliceModel(
+                episode=episode,
+                order=order,
+                width=1080,   # default; replaced by the real header size during upload
+                height=None,
+            )
+            for order in range(1, len(image_members) + 1)
+        ]
+        workers = max(1, min(IMPORT_UPLOAD_WORKERS, len(image_members)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='slice-upload') as pool:
+            futures = {
+                pool.submit(_upload_member, zf, m, s, f"{str(s.order).zfill(ZERO_PAD)}.jpg"): (m, s)
+                for m, s in zip(image_members, new_slices)
+            }
+            for fut in as_completed(futures):
+                m, s = futures[fut]
+                try:
+                    fut.result()
+                except Exception as e:
+                    report.errors.append(f"Upload failed for {m.filename} (slice {s.order}): {e}")
+        report.timings['upload'] = time.perf_counter() - phase
+
+    if report.errors:
+        # Keep the previous slices; drop whatever did get uploaded
+        _delete_files([s.file.name for s in new_slices if s.file.name])
+        report.timings['total'] = time.perf_counter() - started
         return report
 
-    # Replace All: delete existing slices and their files
-    existing = list(SliceModel.objects.filter(episode=episode).order_by("order"))
-    report.replaced_existing = len(existing)
-    for s in existing:
-        try:
-            if s.file and s.file.name and default_storage.exists(s.file.name):
-                default_storage.delete(s.file.name)
-        except Exception:
-            # Ignore storage delete failures; DB cleanup still happens
-            pass
-    SliceModel.objects.filter(episode=episode).delete()
-
-    # Create new slices with zero-padded order
-    order = 1
-    for m in image_members:
-        fname = f"{str(order).zfill(ZERO_PAD)}.jpg"
-        data = zf.read(m.filename)  # read by filename for compatibility
-        cf = ContentFile(data)
-
-        slice_obj = SliceModel(
-            episode=episode,
-            order=order,
-            width=1080,   # default; client can compute real from image if needed
-            height=None,
+    # Derivatives phase: CPU-bound encoding spread across processes; failures are non-fatal
+    phase = time.perf_counter()
+    derivatives, derivative_errors = render_slice_derivatives(new_slices)
+    report.warnings.extend(derivative_errors)
+    report.timings['derivatives'] = time.perf_counter() - phase
+
+    # DB phase: swap rows in a single short transaction
+    phase = time.perf_counter()
+    with transaction.atomic():
+        old_files = list(SliceModel.objects.filter(episode=episode).values_list('file', flat=True))
+        report.replaced_existing = len(old_files)
+        old_files += list(
+            SliceDerivativeModel.objects.filter(slice__episode=episode).values_list('file', flat=True)
         )
-        # Saving via ImageField ensures upload_to path and URL generation
-        slice_obj.file.save(fname, cf, save=False)
-        slice_obj.save()
-        report.created_slices += 1
-        order += 1
+        # One invalidation for the episode instead of one per deleted slice and rendition
+        with suspend_manifest_signals():
+            SliceModel.objects.filter(episode=episode).delete()
+        invalidate_episode_manifest(episode.id)
+        SliceModel.objects.bulk_create(new_slices)
+        SliceDerivativeModel.objects.bulk_create(derivatives)
+        report.created_slices = len(new_slices)
+        report.created_derivatives = len(derivatives)
+
+        def after_commit():
+            # bulk_create sends no signals; readers get the new slice list right away
+            rebuild_episode_manifest(episode)
+            cleanup = time.perf_counter()
+            _delete_files(old_files)
+            report.timings['cleanup'] = time.perf_counter() - cleanup
+
+        transaction.on_commit(after_commit)
+        report.timings['db'] = time.perf_counter() - phase
+
+    report.timings['total'] = time.perf_counter() - started
+    return report
+
+
+# -----------------------------
+# Reader manifest (cached)
+# -----------------------------
+
+def _manifest_cache_key(episode_id) -> str:
+    return f"digitalcomic:episode:{episode_id}:manifest"
+
+
+def build_episode_manifest(episode: EpisodeModel) -> dict:
+    """
+    Build the user-independent part of the reader payload for an episode:
+    ordered slices (storage name/width/height plus derivative variants), next_episode_id,
+    comic_id and the admin lock flags. Per-user entitlement, rendition choice and the signed
+    delivery URL (pratilipiPc.media) are applied on top of this by the view.
+    """
+    next_id = (
+        EpisodeModel.objects
+        .filter(comic_id=episode.comic_id, episode_number=episode.episode_number + 1)
+        .values_list('id', flat=True)
+        .first()
+    )
+
+    variants = {}
+    derivative_rows = (
+        SliceDerivativeModel.objects
+        .filter(slice__episode=episode)
+        .order_by('width')
+        .values_list('slice_id', 'width', 'height', 'format', 'file')
+    )
+    for slice_id, width, height, fmt, name in derivative_rows:
+        variants.setdefault(slice_id, []).append(
+            {'width': width, 'height': height, 'format': fmt, 'file': name or None}
+        )
+
+    slices = []
+    rows = (
+        SliceModel.objects.filter(episode=episode).order_by('order')
+        .values_list('id', 'order', 'file', 'width', 'height')
+    )
+    for slice_id, order, name, width, height in rows:
+        slices.append({
+            'order': order,
+            'file': name or None,
+            'width': width,
+            'height': height,
+            'variants': variants.get(slice_id, []),
+        })
+
+    return {
+        'episode_id': str(episode.id),
+        'comic_id': str(episode.comic_id),
+        'next_episode_id': str(next_id) if next_id else None,
+        'is_free': episode.is_free,
+        'is_locked': episode.is_locked,
+        'slices': slices,
+    }
 
-    return report
\ No newline at end of file
+
+def get_episode_manifest(episode_id) -> dict | None:
+    """
+    Return the cached manifest for an episode, building and caching it on a miss.
+    Returns None if the episode does not exist.
+    """
+    key = _manifest_cache_key(episode_id)
+    manifest = cache.get(key, version=MANIFEST_VERSION)
+    if manifest is not None:
+        return manifest
+
+    episode = EpisodeModel.objects.filter(id=episode_id).first()
+    if episode is None:
+        return None
+    return rebuild_episode_manifest(episode)
+
+
+def rebuild_episode_manifest(episode: EpisodeModel) -> dict:
+    manifest = build_episode_manifest(episode)
+    cache.set(_manifest_cache_key(episode.id), manifest, timeout=MANIFEST_TTL, version=MANIFEST_VERSION)
+    return manifest
+
+
+_manifest_signals = threading.local()
+
+
+@contextmanager
+def suspend_manifest_signals():
+    """
+    Slice and derivative signal receivers skip manifest invalidation inside this block
+    (bulk swaps); the caller invalidates or rebuilds the episode's manifest itself, once.
+    """
+    _manifest_signals.depth = getattr(_manifest_signals, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _manifest_signals.depth -= 1
+
+
+def manifest_signals_suspended() -> bool:
+    return getattr(_manifest_signals, 'depth', 0) > 0
+
+
+def invalidate_episode_manifest(*episode_ids) -> None:
+    """
+    Drop cached manifests once the surrounding transaction commits, so a concurrent
+    reader cannot re-cache rows that are about to change.
+    """
+    keys = [_manifest_cache_key(eid) for eid in episode_ids if eid]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys, version=MANIFEST_VERSION))
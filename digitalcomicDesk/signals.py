@@ -1,21 +1,79 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import CommentModel, EpisodeModel
+from pratilipiPc.catalog import connect_catalog_signals
 
+from .models import ComicModel, CommentModel, EpisodeModel, SliceModel, SliceDerivativeModel
+from .integrations import episode_entitlements
+from .services import invalidate_episode_manifest, manifest_signals_suspended
 
+# Episode fields that feed the cached reader manifest (see services.build_episode_manifest)
+MANIFEST_EPISODE_FIELDS = {'comic', 'episode_number', 'is_free', 'is_locked'}
+
+# EpisodeAccess create/delete -> per-user entitlement index
+episode_entitlements.connect_signals()
+
+# ComicModel save/delete -> retire cached catalog pages
+connect_catalog_signals(ComicModel, 'digital')
+
+
+# The only writer of EpisodeModel.comments_count (besides reconcile_episode_counters).
+# Deltas are applied in SQL, so concurrent comments never overwrite each other.
 @receiver(post_save, sender=CommentModel)
 def incr_episode_comments_count_on_create(sender, instance: CommentModel, created, **kwargs):
     # Only top-level comments affect the denormalized count
-    if created and instance.parent is None:
+    if created and instance.parent_id is None:
         EpisodeModel.objects.filter(id=instance.episode_id).update(
-            comments_count=(instance.episode.comments_count or 0) + 1
+            comments_count=F('comments_count') + 1
         )
 
 
 @receiver(post_delete, sender=CommentModel)
 def decr_episode_comments_count_on_delete(sender, instance: CommentModel, **kwargs):
-    if instance.parent is None:
-        ep = instance.episode
-        new_val = max((ep.comments_count or 0) - 1, 0)
-        EpisodeModel.objects.filter(id=ep.id).update(comments_count=new_val)
\ No newline at end of file
+    if instance.parent_id is None:
+        EpisodeModel.objects.filter(id=instance.episode_id).update(
+            comments_count=Greatest(F('comments_count') - 1, 0)
+        )
+
+
+def _cascaded_from(origin, *models) -> bool:
+    """True when a post_delete was cascaded from a delete of one of `models` (instance or queryset)."""
+    return isinstance(origin, models) or getattr(origin, 'model', None) in models
+
+
+@receiver([post_save, post_delete], sender=SliceModel)
+def invalidate_manifest_on_slice_change(sender, instance: SliceModel, origin=None, **kwargs):
+    # Episode deletes invalidate the whole series themselves
+    if manifest_signals_suspended() or _cascaded_from(origin, EpisodeModel):
+        return
+    invalidate_episode_manifest(instance.episode_id)
+
+
+@receiver([post_save, post_delete], sender=SliceDerivativeModel)
+def invalidate_manifest_on_derivative_change(sender, instance: SliceDerivativeModel, origin=None, **kwargs):
+    # Cascades: the deleted slice's (or episode's) own receiver covers the episode
+    if manifest_signals_suspended() or _cascaded_from(origin, SliceModel, EpisodeModel):
+        return
+    if SliceDerivativeModel.slice.is_cached(instance):
+        episode_id = instance.slice.episode_id
+    else:
+        episode_id = SliceModel.objects.filter(id=instance.slice_id).values_list('episode_id', flat=True).first()
+    invalidate_episode_manifest(episode_id)
+
+
+@receiver(post_save, sender=EpisodeModel)
+def invalidate_manifests_on_episode_save(sender, instance: EpisodeModel, update_fields=None, **kwargs):
+    # Counter-only saves (likes/shares/comments) do not touch the manifest
+    if update_fields is not None and not MANIFEST_EPISODE_FIELDS.intersection(update_fields):
+        return
+    # next_episode_id of neighbours may change, so drop every manifest of the series
+    ids = EpisodeModel.objects.filter(comic_id=instance.comic_id).values_list('id', flat=True)
+    invalidate_episode_manifest(instance.id, *ids)
+
+
+@receiver(post_delete, sender=EpisodeModel)
+def invalidate_manifests_on_episode_delete(sender, instance: EpisodeModel, **kwargs):
+    ids = EpisodeModel.objects.filter(comic_id=instance.comic_id).values_list('id', flat=True)
+    invalidate_episode_manifest(instance.id, *ids)
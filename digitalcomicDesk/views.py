@@ -1,36 +1,56 @@
 # digitalcomicDesk/views.py
 
+from django.core.exceptions import ValidationError
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
+from counterDesk import ratings, services as counters
+from premiumDesk import unlocks
+from pratilipiPc import media
+from pratilipiPc.catalog import CatalogListMixin
+
 from .models import (
     ComicModel,
     EpisodeModel,
     CommentModel,
-    SliceModel,
     EpisodeAccess,
+    ComicRating,
 )
 from .serializers import (
     ComicSerializer,
     EpisodeSerializer,
     CommentSerializer,
-    SliceSerializer,
+    CommentChildSerializer,
+    parse_rendition_hint,
 )
-from .integrations import is_user_premium, debit_coins
+from .integrations import is_user_premium, debit_coins, episode_entitlements
+from .pagination import ComicCatalogPagination, EpisodeCursorPagination, CommentCursorPagination, ReplyCursorPagination
+from .services import get_episode_manifest, pick_slice_variant
+
+
+# Wallet idempotency keys of episode unlocks: "dc:unlock:<user_id>:<episode_id>"
+UNLOCK_KEY_PREFIX = 'dc'
 
 
-class DigitalComicViewSet(viewsets.ModelViewSet):
+class DigitalComicViewSet(CatalogListMixin, viewsets.ModelViewSet):
     """
     Base path:
       /api/digitalcomic/digitalcomic/
 
+    Listing:
+    - GET    /api/digitalcomic/digitalcomic/?genre=&sort=&fields=
+             catalog pages with ?page_size= / ?cursor= (pratilipiPc.catalog)
+
     Extra routes:
     - GET    /api/digitalcomic/digitalcomic/<comic_id>/details/
     - POST   /api/digitalcomic/digitalcomic/<comic_id>/unlock/
+    - POST   /api/digitalcomic/digitalcomic/<comic_id>/unlock-batch/
     - POST   /api/digitalcomic/digitalcomic/<comic_id>/rate/
     - POST   /api/digitalcomic/digitalcomic/<comic_id>/view/
     - POST   /api/digitalcomic/digitalcomic/<comic_id>/favourite/
@@ -40,26 +60,65 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
     - POST   /api/digitalcomic/digitalcomic/<comic_id>/episode_share/
     - POST   /api/digitalcomic/digitalcomic/<comic_id>/episodes/
     - GET    /api/digitalcomic/digitalcomic/episode/<episode_id>/slices/
+    - GET    /api/digitalcomic/digitalcomic/episode/<episode_id>/comments/
+    - GET    /api/digitalcomic/digitalcomic/comment/<comment_id>/replies/
     """
     queryset = ComicModel.objects.all()
     serializer_class = ComicSerializer
     permission_classes = [IsAuthenticated]
-
-    def list(self, request):
-        genre = request.query_params.get('genre', '')
-        queryset = self.queryset
-        if genre:
-            queryset = queryset.filter(genre=genre)
-        return Response(self.get_serializer(queryset, many=True).data)
+    catalog_namespace = 'digital'
+    catalog_pagination_class = ComicCatalogPagination
 
     @action(detail=True, methods=['get'])
     def details(self, request, pk=None):
+        """
+        Whole series by default. Long series can be paged with ?page_size=<n> and the
+        returned cursor (?cursor=<next_cursor>); the response then also carries
+        "next" and "next_cursor".
+        """
         comic = self.get_object()
-        episodes = EpisodeModel.objects.filter(comic=comic).order_by('episode_number')
-        return Response({
+        episodes = EpisodeModel.objects.filter(comic=comic)
+        paginator = EpisodeCursorPagination()
+        paginated = paginator.is_requested(request)
+
+        if paginated:
+            page = paginator.paginate_queryset(episodes, request, view=self)
+            # Links must span page boundaries, so number the whole series (ids only)
+            numbered = episodes.values_list('episode_number', 'id')
+        else:
+            page = list(episodes.order_by('episode_number'))
+            numbered = [(ep.episode_number, ep.id) for ep in page]
+
+        # next/prev follow the model's episode_number +/- 1 rule
+        by_number = dict(numbered)
+        links = {
+            ep.id: (by_number.get(ep.episode_number - 1), by_number.get(ep.episode_number + 1))
+            for ep in page
+        }
+
+        context = self.get_serializer_context()
+        context['episode_links'] = links
+        context.update(self._episode_access_context(request.user, comic, page))
+
+        data = {
             'comic': self.get_serializer(comic).data,
-            'episodes': EpisodeSerializer(episodes, many=True).data
-        })
+            'episodes': EpisodeSerializer(page, many=True, context=context).data,
+        }
+        if paginated:
+            data['next'] = paginator.get_next_link()
+            data['next_cursor'] = paginator.next_cursor
+        return Response(data)
+
+    @staticmethod
+    def _episode_access_context(user, comic, episodes):
+        """Caller's lock state for a batch of episodes: one premium check, one index lookup."""
+        if not user.is_authenticated:
+            return {'unlocked_episode_ids': set(), 'is_premium': False}
+        if not any(ep.is_locked and not ep.is_free for ep in episodes):
+            return {'unlocked_episode_ids': set(), 'is_premium': False}
+        if is_user_premium(user):
+            return {'unlocked_episode_ids': set(), 'is_premium': True}
+        return {'unlocked_episode_ids': episode_entitlements.unlocked_episode_ids(user, comic.id), 'is_premium': False}
 
     @transaction.atomic
     @action(detail=True, methods=['post'])
@@ -84,7 +143,7 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
         episode = get_object_or_404(EpisodeModel, id=episode_id, comic=comic)
 
         # Already unlocked?
-        if EpisodeAccess.objects.filter(user=user, episode=episode).exists():
+        if episode_entitlements.has_access(user, comic.id, episode.id):
             return Response({"unlocked": True, "source": "ALREADY"}, status=status.HTTP_200_OK)
 
         # Free episode short-circuit (treat as entitlement-like)
@@ -110,9 +169,11 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
             return Response({"unlocked": True, "source": "ALREADY"}, status=status.HTTP_200_OK)
 
         # Coins path via integration
-        coin_cost = episode.coin_cost or 50
-        idem_key = f"unlock:user:{user.id}:episode:{episode.id}"
-        debit = debit_coins(user=user, amount=coin_cost, idempotency_key=idem_key)
+        debit = debit_coins(
+            user=user, amount=unlocks.coin_cost(episode),
+            idempotency_key=unlocks.unlock_key(UNLOCK_KEY_PREFIX, user.id, episode.id),
+            link_model='digitalcomic.episode', link_id=str(episode.id),
+        )
         if not debit.success:
             return Response(
                 {"error": debit.error_message or "Insufficient balance", "code": debit.error_code or "insufficient_balance"},
@@ -127,35 +188,67 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @action(detail=True, methods=['post'], url_path='unlock-batch')
+    def unlock_batch(self, request, pk=None):
+        """
+        Unlock several episodes of this comic in one request (premiumDesk.unlocks).
+        - Body: { "episode_ids": ["<uuid>", ...] } or { "from_episode": <n>, "to_episode": <m> } (inclusive)
+        - 200: nothing charged (already unlocked / free / premium)
+        - 201: coins charged once for the whole batch (one ledger row per episode)
+          { "unlocked": [ids...], "already": [ids...], "source": "COINS"|"PREMIUM"|"ALREADY",
+            "coins_spent": <int>, "balance": <int> }
+        - 400: { "error": "<msg>", "code": "bad_request|insufficient_balance", ... }
+        """
+        comic = self.get_object()
+        episodes = unlocks.episodes_for_batch(EpisodeModel.objects.filter(comic=comic), request.data)
+        if episodes is None:
+            return Response(
+                {"error": unlocks.BAD_BATCH_MESSAGE, "code": "bad_request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = unlocks.unlock_batch(
+            request.user, comic.id, episodes, episode_entitlements,
+            key_prefix=UNLOCK_KEY_PREFIX, link_model='digitalcomic.episode',
+        )
+        if not result.success:
+            return Response(
+                {"error": "Insufficient coins", "code": result.error_code, "required": result.required, "balance": result.balance},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result.payload(), status=status.HTTP_201_CREATED if result.coins_spent else status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'])
     def rate(self, request, pk=None):
+        """
+        Body: { "rating": 1..5 } (halves round up). One rating per user: rating again replaces it.
+        200: { "rating": <avg>, "rating_count": <int>, "rating_breakdown": {"1": n, ...}, "your_rating": <int> }
+        """
         comic = self.get_object()
-        try:
-            rating = float(request.data.get('rating', 0))
-        except (TypeError, ValueError):
+        stars = ratings.to_stars(request.data.get('rating'))
+        if stars is None:
             return Response({"error": "Invalid rating"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if 1.0 <= rating <= 5.0:
-            new_total = (float(comic.rating) * comic.rating_count) + rating
-            comic.rating_count += 1
-            comic.rating = round(new_total / comic.rating_count, 1)
-            comic.save(update_fields=['rating', 'rating_count'])
-            return Response({"rating": comic.rating}, status=status.HTTP_200_OK)
-        return Response({"error": "Invalid rating"}, status=status.HTTP_400_BAD_REQUEST)
+        ratings.record(ComicRating, comic, request.user, stars)
+        comic.refresh_from_db(fields=ratings.AGGREGATE_FIELDS)
+        return Response({
+            "rating": ratings.average(comic),
+            "rating_count": comic.rating_count,
+            "rating_breakdown": ratings.breakdown(comic),
+            "your_rating": stars,
+        }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def view(self, request, pk=None):
         comic = self.get_object()
-        comic.view_count += 1
-        comic.save(update_fields=['view_count'])
-        return Response({"view_count": comic.view_count}, status=status.HTTP_200_OK)
+        view_count = counters.increment(comic, 'view_count')
+        return Response({"view_count": view_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def favourite(self, request, pk=None):
         comic = self.get_object()
-        comic.favourite_count += 1
-        comic.save(update_fields=['favourite_count'])
-        return Response({"favourite_count": comic.favourite_count}, status=status.HTTP_200_OK)
+        favourite_count = counters.increment(comic, 'favourite_count')
+        return Response({"favourite_count": favourite_count}, status=status.HTTP_200_OK)
 
     @transaction.atomic
     @action(detail=True, methods=['post'])
@@ -181,11 +274,7 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
             comment_text=comment_text
         )
 
-        # Denormalized counter for top-level only
-        if parent is None:
-            episode.comments_count = (episode.comments_count or 0) + 1
-            episode.save(update_fields=['comments_count'])
-
+        # episode.comments_count is maintained by the CommentModel post_save signal
         return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
@@ -196,9 +285,8 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
             return Response({"error": "comment_id required"}, status=status.HTTP_400_BAD_REQUEST)
 
         comment = get_object_or_404(CommentModel, id=comment_id, episode__comic=comic)
-        comment.likes_count += 1
-        comment.save(update_fields=['likes_count'])
-        return Response({"likes_count": comment.likes_count}, status=status.HTTP_200_OK)
+        likes_count = counters.increment(comment, 'likes_count')
+        return Response({"likes_count": likes_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def episode_like(self, request, pk=None):
@@ -207,9 +295,8 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
         if not episode_id:
             return Response({"error": "episode_id required"}, status=status.HTTP_400_BAD_REQUEST)
         episode = get_object_or_404(EpisodeModel, id=episode_id, comic=comic)
-        episode.likes_count = (episode.likes_count or 0) + 1
-        episode.save(update_fields=['likes_count'])
-        return Response({"likes_count": episode.likes_count}, status=status.HTTP_200_OK)
+        likes_count = counters.increment(episode, 'likes_count')
+        return Response({"likes_count": likes_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def episode_share(self, request, pk=None):
@@ -218,9 +305,8 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
         if not episode_id:
             return Response({"error": "episode_id required"}, status=status.HTTP_400_BAD_REQUEST)
         episode = get_object_or_404(EpisodeModel, id=episode_id, comic=comic)
-        episode.shares_count = (episode.shares_count or 0) + 1
-        episode.save(update_fields=['shares_count'])
-        return Response({"shares_count": episode.shares_count}, status=status.HTTP_200_OK)
+        shares_count = counters.increment(episode, 'shares_count')
+        return Response({"shares_count": shares_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], url_path='episodes')
     def create_episode(self, request, pk=None):
@@ -243,26 +329,83 @@ class DigitalComicViewSet(viewsets.ModelViewSet):
           "comic_id": "<uuid>",
           "slices": [{ order, url, width, height }]
         }
+        Optional rendition hint: ?w=<css px width>&dpr=<device pixel ratio>[&fmt=webp]
+        (WebP is also chosen when the Accept header lists image/webp). Without ?w the
+        original uploads are returned. Slice URLs are signed media links valid for at least
+        MEDIA_URL_TTL seconds.
         """
         user = request.user
-        episode = get_object_or_404(EpisodeModel, id=episode_id)
-
-        is_premium_user = is_user_premium(user)
-        has_access = EpisodeAccess.objects.filter(user=user, episode=episode).exists()
+        # User-independent part is cached per episode; only the entitlement overlay is per request
+        manifest = get_episode_manifest(episode_id)
+        if manifest is None:
+            raise Http404
 
         locked = False
-        if episode.is_locked and not episode.is_free and not is_premium_user and not has_access:
-            locked = True
+        if manifest['is_locked'] and not manifest['is_free']:
+            has_access = episode_entitlements.has_access(user, manifest['comic_id'], manifest['episode_id'])
+            locked = not has_access and not is_user_premium(user)
 
-        slices_qs = SliceModel.objects.filter(episode=episode).order_by('order') if not locked else SliceModel.objects.none()
-        slices_data = SliceSerializer(slices_qs, many=True, context={'request': request}).data
-
-        next_ep = episode.get_next_episode()
         payload = {
-            "episode_id": str(episode.id),
-            "next_episode_id": str(next_ep.id) if next_ep else None,
+            "episode_id": manifest['episode_id'],
+            "next_episode_id": manifest['next_episode_id'],
             "locked": locked,
-            "comic_id": str(episode.comic.id),
-            "slices": slices_data,
+            "comic_id": manifest['comic_id'],
+            "slices": [],
         }
-        return Response(payload, status=status.HTTP_200_OK)
\ No newline at end of file
+        if not locked:
+            target_width, accept_webp = parse_rendition_hint(request)
+            for entry in manifest['slices']:
+                picked = pick_slice_variant(entry, target_width, accept_webp, url_key='file')
+                # Short-lived signed link; the raw storage path is never handed out
+                picked['url'] = media.signed_url(request, picked.pop('file'))
+                payload["slices"].append(picked)
+        return Response(payload, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path=r'episode/(?P<episode_id>[^/.]+)/comments')
+    def episode_comments(self, request, episode_id=None):
+        """
+        Top-level comments of an episode, newest first, each with its first K replies.
+        Query: ?cursor=<next_cursor>&page_size=<n, default 20>&replies=<K, default 3, 1-20>
+        Response:
+        {
+          "next": "<url>|null",
+          "next_cursor": "<cursor>|null",
+          "results": [{ ...comment, "replies": [...first K], "replies_next_cursor": "<cursor>|null" }]
+        }
+        Two queries per page: the comment page, then every thread's first K+1 replies in one
+        windowed (ROW_NUMBER per parent) prefetch. Continue a thread with
+        GET comment/<comment_id>/replies/?cursor=<replies_next_cursor>.
+        """
+        try:
+            # At least one reply: replies_next_cursor continues after the last one shown
+            reply_limit = min(max(int(request.query_params.get('replies', 3)), 1), 20)
+        except ValueError:
+            reply_limit = 3
+
+        first_replies = CommentModel.objects.order_by('timestamp', 'id')[:reply_limit + 1]
+        paginator = CommentCursorPagination()
+        try:
+            comments = (
+                CommentModel.objects
+                .filter(episode_id=episode_id, parent__isnull=True)
+                .prefetch_related(Prefetch('replies', queryset=first_replies, to_attr='first_replies'))
+            )
+            page = paginator.paginate_queryset(comments, request, view=self)
+        except (ValueError, ValidationError):
+            # Malformed episode id
+            raise Http404
+
+        context = self.get_serializer_context()
+        context['reply_limit'] = reply_limit
+        return paginator.get_paginated_response(CommentSerializer(page, many=True, context=context).data)
+
+    @action(detail=False, methods=['get'], url_path=r'comment/(?P<comment_id>\d+)/replies')
+    def comment_replies(self, request, comment_id=None):
+        """
+        Replies of one comment, oldest first.
+        Query: ?cursor=<next_cursor | replies_next_cursor from the thread listing>&page_size=<n>
+        Response: { "next", "next_cursor", "results": [reply...] }
+        """
+        paginator = ReplyCursorPagination()
+        page = paginator.paginate_queryset(CommentModel.objects.filter(parent_id=comment_id), request, view=self)
+        return paginator.get_paginated_response(CommentChildSerializer(page, many=True).data)
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import ComicModel, EpisodeModel, CommentModel, EpisodeAccess
+from .services import process_episode_video
 
 
 @admin.register(ComicModel)
@@ -16,6 +17,13 @@ class EpisodeAdmin(admin.ModelAdmin):
     list_filter = ('comic', 'is_free', 'is_locked')
     search_fields = ('comic__title',)
     ordering = ('comic', 'episode_number')
+    readonly_fields = ('video_duration', 'video_bitrate', 'video_width', 'video_height', 'video_faststart')
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'video_file' in form.changed_data:
+            # Fast-start rewrite + duration/bitrate/resolution
+            process_episode_video(obj)
 
 
 @admin.register(CommentModel)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MotioncomicdeskConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'motioncomicDesk'
+
+    def ready(self):
+        # Import signals so handlers register
+        from . import signals  # noqa: F401
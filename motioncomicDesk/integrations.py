@@ -0,0 +1,28 @@
+# motioncomicDesk/integrations.py
+
+from premiumDesk.entitlements import EpisodeEntitlementIndex, is_user_premium  # noqa: F401 (re-exported)
+
+from .models import EpisodeAccess
+
+# Per-user unlocked episode ids per comic (Redis-backed); EpisodeAccess stays the source of truth
+episode_entitlements = EpisodeEntitlementIndex(EpisodeAccess, namespace='motion')
+
+
+def is_episode_locked_for(user, episode, unlocked_by_comic=None) -> bool:
+    """
+    Per-user lock state of an episode: free, admin-unlocked, premium or an EpisodeAccess row
+    opens it. `unlocked_by_comic` ({comic_id: unlocked ids}) memoises the index lookup
+    across a list of episodes.
+    """
+    # Anonymous or no user context -> treat as locked
+    if not user or not getattr(user, 'is_authenticated', False):
+        return True
+    if episode.is_free or not episode.is_locked:
+        return False
+    if is_user_premium(user):
+        return False
+    if unlocked_by_comic is None:
+        unlocked_by_comic = {}
+    if episode.comic_id not in unlocked_by_comic:
+        unlocked_by_comic[episode.comic_id] = episode_entitlements.unlocked_episode_ids(user, episode.comic_id)
+    return episode.id not in unlocked_by_comic[episode.comic_id]
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from motioncomicDesk.models import EpisodeModel
+from motioncomicDesk.services import process_episode_video
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite uploaded episode MP4s to fast-start layout (moov before mdat) and fill "
+        "video_duration/bitrate/width/height. Files are streamed, one episode at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--episode', type=int, help='Only process this episode id')
+        parser.add_argument('--all', action='store_true', help='Re-process episodes that were already processed')
+
+    def handle(self, *args, **options):
+        qs = EpisodeModel.objects.exclude(video_file='').exclude(video_file__isnull=True)
+        if not options['all']:
+            qs = qs.filter(video_duration__isnull=True)
+        if options['episode']:
+            qs = qs.filter(pk=options['episode'])
+
+        processed = skipped = rewritten = 0
+        for episode in qs.order_by('pk').iterator():
+            was_faststart = episode.video_faststart
+            info = process_episode_video(episode)
+            if info is None:
+                skipped += 1
+                self.stdout.write(f"Episode {episode.pk}: not a readable MP4, skipped")
+                continue
+            processed += 1
+            if info.faststart and not was_faststart:
+                rewritten += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} episodes ({rewritten} marked fast-start, {skipped} unreadable)."
+        ))
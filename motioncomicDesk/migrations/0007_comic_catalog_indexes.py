@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motioncomicDesk', '0006_comic_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['-view_count', '-id'], name='motioncomic_view_co_f51872_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['-rating', '-id'], name='motioncomic_rating_7d1a04_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['genre', '-view_count', '-id'], name='motioncomic_genre_8c34eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['genre', '-rating', '-id'], name='motioncomic_genre_5e8bea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comicmodel',
+            index=models.Index(fields=['genre', '-id'], name='motioncomic_genre_e25dc2_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motioncomicDesk', '0007_comic_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='episodemodel',
+            name='video_bitrate',
+            field=models.PositiveIntegerField(blank=True, help_text='Bits per second', null=True),
+        ),
+        migrations.AddField(
+            model_name='episodemodel',
+            name='video_duration',
+            field=models.FloatField(blank=True, help_text='Seconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='episodemodel',
+            name='video_faststart',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='episodemodel',
+            name='video_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='episodemodel',
+            name='video_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
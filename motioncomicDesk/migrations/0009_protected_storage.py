@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:45
+
+import pratilipiPc.media
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('motioncomicDesk', '0008_episodemodel_video_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='episodemodel',
+            name='video_file',
+            field=models.FileField(blank=True, help_text='Upload MP4 video for this episode (optional)', null=True, storage=pratilipiPc.media.protected_storage, upload_to='motioncomics/episodes/'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from pratilipiPc.media import protected_storage
 from profileDesk.models import CustomUser
 
 
@@ -11,6 +12,24 @@ class ComicModel(models.Model):
     view_count = models.IntegerField(default=0)
     favourite_count = models.IntegerField(default=0)
     rating_count = models.PositiveIntegerField(default=0)
+    # Rating aggregates (counterDesk.ratings): average = rating_sum / rating_count,
+    # rating_1..rating_5 = star histogram. `rating` is a derived copy kept for sorting.
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Catalog sorts (motioncomicDesk.pagination.ComicCatalogPagination), with and without genre
+            models.Index(fields=["-view_count", "-id"]),
+            models.Index(fields=["-rating", "-id"]),
+            models.Index(fields=["genre", "-view_count", "-id"]),
+            models.Index(fields=["genre", "-rating", "-id"]),
+            models.Index(fields=["genre", "-id"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -24,7 +43,7 @@ class EpisodeModel(models.Model):
     # Playback sources
     video_url = models.URLField(blank=True, null=True)  # Optional direct URL
     video_file = models.FileField(
-        upload_to='motioncomics/episodes/', blank=True, null=True,
+        upload_to='motioncomics/episodes/', storage=protected_storage, blank=True, null=True,
         help_text="Upload MP4 video for this episode (optional)"
     )
 
@@ -37,6 +56,14 @@ class EpisodeModel(models.Model):
 
     short_description = models.TextField(max_length=200)
 
+    # Read from video_file at upload (services.process_episode_video); empty until processed
+    video_duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+    video_bitrate = models.PositiveIntegerField(null=True, blank=True, help_text="Bits per second")
+    video_width = models.PositiveIntegerField(null=True, blank=True)
+    video_height = models.PositiveIntegerField(null=True, blank=True)
+    # moov box ahead of mdat, so playback can start before the whole file is fetched
+    video_faststart = models.BooleanField(default=False)
+
     class Meta:
         unique_together = ('comic', 'episode_number')
         indexes = [
@@ -81,4 +108,18 @@ class EpisodeAccess(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user.username} unlocked {self.episode} via {self.source}"
\ No newline at end of file
+        return f"{self.user.username} unlocked {self.episode} via {self.source}"
+
+class ComicRating(models.Model):
+    # One star rating per user and comic; ComicModel aggregates via counterDesk.ratings
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='motion_comic_ratings')
+    comic = models.ForeignKey(ComicModel, on_delete=models.CASCADE, related_name='ratings')
+    stars = models.PositiveSmallIntegerField(choices=[(i, i) for i in range(1, 6)])
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'comic')
+
+    def __str__(self):
+        return f"{self.user.username} rated {self.comic} {self.stars}"
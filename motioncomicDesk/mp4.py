@@ -0,0 +1,215 @@
+# motioncomicDesk/mp4.py
+"""
+Minimal ISO-BMFF (MP4) box reader: playback metadata and fast-start rewrite.
+
+Only box headers and the moov box are read into memory; media data (mdat) is copied
+between file objects in chunks, so memory stays flat for any file size.
+
+Fast start: players need moov (sample tables) before they can play. Encoders that write
+moov after mdat force a full download first. make_faststart() moves moov in front of the
+first mdat and shifts every stco/co64 chunk offset that pointed past the insertion point
+by the size of moov.
+"""
+import io
+import struct
+from dataclasses import dataclass
+from typing import List, Optional
+
+COPY_CHUNK_SIZE = 1024 * 1024
+MAX_MOOV_SIZE = 64 * 1024 * 1024  # a sane moov is KBs to a few MBs
+
+# Containers walked to reach mvhd/tkhd/hdlr/stco/co64
+_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+class Mp4Error(ValueError):
+    pass
+
+
+@dataclass
+class Box:
+    kind: bytes
+    start: int
+    header_size: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        return self.start + self.size
+
+    @property
+    def payload_start(self) -> int:
+        return self.start + self.header_size
+
+
+@dataclass
+class Mp4Info:
+    faststart: bool
+    duration: Optional[float] = None  # seconds
+    bitrate: Optional[int] = None  # bits per second, whole file
+    width: Optional[int] = None  # largest video track
+    height: Optional[int] = None
+
+
+def iter_boxes(fh, start: int, end: int):
+    """Yield the boxes laid out back to back in fh[start:end]."""
+    pos = start
+    while pos + 8 <= end:
+        fh.seek(pos)
+        size, kind = struct.unpack('>I4s', fh.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', fh.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - pos  # extends to the end of the enclosing space
+        if size < header_size or pos + size > end:
+            raise Mp4Error(f"Corrupt box {kind!r} at offset {pos}")
+        yield Box(kind, pos, header_size, size)
+        pos += size
+
+
+def top_level_boxes(fh, size: int) -> List[Box]:
+    boxes = list(iter_boxes(fh, 0, size))
+    if not boxes or boxes[0].kind not in (b'ftyp', b'styp', b'free', b'skip', b'wide'):
+        raise Mp4Error("Not an ISO-BMFF file")
+    return boxes
+
+
+def _first(boxes, kind) -> Optional[Box]:
+    return next((b for b in boxes if b.kind == kind), None)
+
+
+def _read_moov(fh, moov: Box) -> bytearray:
+    if moov.size > MAX_MOOV_SIZE:
+        raise Mp4Error(f"moov box too large ({moov.size} bytes)")
+    fh.seek(moov.start)
+    return bytearray(fh.read(moov.size))
+
+
+def _walk(buf, start: int, end: int):
+    """Depth-first boxes of an in-memory moov, descending into _CONTAINERS."""
+    view = io.BytesIO(buf)
+    for box in iter_boxes(view, start, end):
+        yield box
+        if box.kind in _CONTAINERS:
+            yield from _walk(buf, box.payload_start, box.end)
+
+
+# -----------------------------
+# Metadata
+# -----------------------------
+
+def _mvhd_duration(buf, box: Box) -> Optional[float]:
+    p = box.payload_start
+    if buf[p] == 1:
+        timescale, duration = struct.unpack_from('>IQ', buf, p + 4 + 16)
+    else:
+        timescale, duration = struct.unpack_from('>II', buf, p + 4 + 8)
+    return duration / timescale if timescale else None
+
+
+def _tkhd_dimensions(buf, box: Box):
+    p = box.payload_start
+    # version/flags, times, track_ID, reserved, duration, reserved, layer..volume, matrix
+    offset = p + (88 if buf[p] == 1 else 76)
+    width, height = struct.unpack_from('>II', buf, offset)
+    return width >> 16, height >> 16  # 16.16 fixed point
+
+
+def _video_dimensions(buf, moov: Box):
+    """(width, height) of the largest track whose handler is 'vide'."""
+    best = (None, None)
+    view = io.BytesIO(buf)
+    for trak in iter_boxes(view, moov.payload_start, moov.end):
+        if trak.kind != b'trak':
+            continue
+        dims, handler = None, None
+        for box in _walk(buf, trak.payload_start, trak.end):
+            if box.kind == b'tkhd':
+                dims = _tkhd_dimensions(buf, box)
+            elif box.kind == b'hdlr':
+                handler = bytes(buf[box.payload_start + 8:box.payload_start + 12])
+        if handler == b'vide' and dims and (best[0] or 0) * (best[1] or 0) < dims[0] * dims[1]:
+            best = dims
+    return best
+
+
+def probe(fh, size: int) -> Mp4Info:
+    """Read playback metadata and moov placement from an open binary file of `size` bytes."""
+    boxes = top_level_boxes(fh, size)
+    moov, mdat = _first(boxes, b'moov'), _first(boxes, b'mdat')
+    if moov is None:
+        raise Mp4Error("No moov box")
+
+    buf = _read_moov(fh, moov)
+    local = Box(moov.kind, 0, moov.header_size, moov.size)
+    info = Mp4Info(faststart=mdat is None or moov.start < mdat.start)
+    mvhd = _first(_walk(buf, local.payload_start, local.end), b'mvhd')
+    if mvhd is not None:
+        info.duration = _mvhd_duration(buf, mvhd)
+    if info.duration:
+        info.bitrate = int(size * 8 / info.duration)
+    info.width, info.height = _video_dimensions(buf, local)
+    return info
+
+
+# -----------------------------
+# Fast-start rewrite
+# -----------------------------
+
+def _shift_chunk_offsets(buf, insert_at: int, moov_start: int, delta: int) -> None:
+    """
+    Patch stco/co64 entries in place for moov moving from moov_start to insert_at:
+    offsets in [insert_at, moov_start) move up by delta, the rest stay put.
+    """
+    for box in _walk(buf, 0, len(buf)):
+        if box.kind not in (b'stco', b'co64'):
+            continue
+        fmt, width = ('>I', 4) if box.kind == b'stco' else ('>Q', 8)
+        count = struct.unpack_from('>I', buf, box.payload_start + 4)[0]
+        pos = box.payload_start + 8
+        if pos + count * width > box.end:
+            raise Mp4Error(f"Truncated {box.kind!r} table")
+        for _ in range(count):
+            offset = struct.unpack_from(fmt, buf, pos)[0]
+            if insert_at <= offset < moov_start:
+                offset += delta
+                if box.kind == b'stco' and offset > 0xFFFFFFFF:
+                    # Would need an stco -> co64 upgrade (changes moov size); leave the file alone
+                    raise Mp4Error("Chunk offset overflows stco")
+                struct.pack_into(fmt, buf, pos, offset)
+            pos += width
+
+
+def _copy(src, dst, start: int, length: int) -> None:
+    src.seek(start)
+    while length > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, length))
+        if not chunk:
+            raise Mp4Error("Unexpected end of file")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def make_faststart(src, dst, size: int) -> bool:
+    """
+    Write a fast-start copy of `src` to `dst`. Returns False (dst untouched) when the file is
+    already fast-start, has no mdat, or is fragmented (moof offsets are relative).
+    """
+    boxes = top_level_boxes(src, size)
+    moov, mdat = _first(boxes, b'moov'), _first(boxes, b'mdat')
+    if moov is None:
+        raise Mp4Error("No moov box")
+    if mdat is None or moov.start < mdat.start or _first(boxes, b'moof') is not None:
+        return False
+
+    buf = _read_moov(src, moov)
+    _shift_chunk_offsets(buf, insert_at=mdat.start, moov_start=moov.start, delta=moov.size)
+
+    _copy(src, dst, 0, mdat.start)
+    dst.write(buf)
+    for box in boxes:
+        if box.start >= mdat.start and box is not moov:
+            _copy(src, dst, box.start, box.size)
+    return True
@@ -0,0 +1,12 @@
+from pratilipiPc.catalog import CatalogPagination
+
+
+class ComicCatalogPagination(CatalogPagination):
+    # Each ordering has a matching (ordering) and (genre, ordering) index on ComicModel.
+    # Ids are auto-increment, so -id is creation order.
+    sorts = {
+        'popular': ('-view_count', '-id'),
+        'rating': ('-rating', '-id'),
+        'newest': ('-id',),
+    }
+    default_sort = 'newest'
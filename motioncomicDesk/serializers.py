@@ -1,14 +1,32 @@
 from rest_framework import serializers
-from .models import ComicModel, EpisodeModel, CommentModel, EpisodeAccess
 
+from counterDesk import ratings
+from counterDesk.serializers import BufferedCountersListSerializer, BufferedCountersMixin
+from pratilipiPc import media
+from pratilipiPc.catalog import SparseFieldsMixin
+from .models import ComicModel, EpisodeModel, CommentModel
+from .integrations import is_episode_locked_for
 
-class ComicSerializer(serializers.ModelSerializer):
-    # Keep coerce_to_string=False to return Decimal as number
-    rating = serializers.DecimalField(max_digits=3, decimal_places=1, coerce_to_string=False)
+
+class ComicSerializer(BufferedCountersMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    # Derived from the integer aggregates (rating_sum / rating_count), numeric in JSON
+    rating = serializers.SerializerMethodField()
+    rating_breakdown = serializers.SerializerMethodField()
 
     class Meta:
         model = ComicModel
-        fields = ['id', 'title', 'genre', 'cover_image', 'description', 'rating', 'view_count', 'favourite_count']
+        fields = [
+            'id', 'title', 'genre', 'cover_image', 'description', 'rating', 'rating_breakdown',
+            'view_count', 'favourite_count',
+        ]
+        buffered_counters = ['view_count', 'favourite_count']
+        list_serializer_class = BufferedCountersListSerializer
+
+    def get_rating(self, obj):
+        return ratings.average(obj)
+
+    def get_rating_breakdown(self, obj):
+        return ratings.breakdown(obj)
 
 
 class EpisodeSerializer(serializers.ModelSerializer):
@@ -27,70 +45,66 @@ class EpisodeSerializer(serializers.ModelSerializer):
             'short_description',
             # Computed fields for app
             'is_locked_for_user', 'prev_episode_id', 'next_episode_id', 'playback_url',
+            # Video metadata for quality choice before fetching bytes
+            'video_duration', 'video_bitrate', 'video_width', 'video_height',
         ]
+        read_only_fields = ['video_duration', 'video_bitrate', 'video_width', 'video_height']
 
-    def _is_user_premium(self, user) -> bool:
-        # Fallback heuristic:
-        # 1) user.is_premium boolean if present
-        # 2) subscriptionmodel_set exists and is non-empty
-        # Replace with premiumDesk integration if available.
-        if not user or not getattr(user, 'is_authenticated', False):
-            return False
-        if getattr(user, 'is_premium', False):
-            return True
-        if hasattr(user, 'subscriptionmodel_set'):
-            try:
-                return user.subscriptionmodel_set.exists()
-            except Exception:
-                return False
-        return False
+    # List views pass precomputed state in context (see MotionComicViewSet.details):
+    #   episode_links:         {episode_id: (prev_id, next_id)}
+    #   unlocked_episode_ids:  set of episode ids the caller holds EpisodeAccess for (entitlement index)
+    #   is_premium:            caller's premium state
+    # Without them each field falls back to its own lookup.
 
     def get_is_locked_for_user(self, obj: EpisodeModel) -> bool:
-        request = self.context.get('request', None)
-        user = getattr(request, 'user', None)
-
-        # Anonymous or no user context -> treat as locked
-        if not user or not getattr(user, 'is_authenticated', False):
-            return True
-
-        # If episode marked free -> unlocked
-        if obj.is_free:
-            return False
-
-        # If admin has globally unlocked -> unlocked
-        if not obj.is_locked:
-            return False
-
-        # Premium users unlock all
-        if self._is_user_premium(user):
-            return False
+        unlocked = self.context.get('unlocked_episode_ids')
+        is_premium = self.context.get('is_premium')
+        if unlocked is not None and is_premium is not None:
+            if obj.is_free or not obj.is_locked:
+                return False
+            return not (is_premium or obj.id in unlocked)
 
-        # Per-user access
-        return not EpisodeAccess.objects.filter(user=user, episode=obj).exists()
+        request = self.context.get('request', None)
+        # Per-user access: one index lookup per comic, shared by every episode in a list
+        memo = self.context.setdefault('_unlocked_by_comic', {})
+        return is_episode_locked_for(getattr(request, 'user', None), obj, memo)
 
     def get_prev_episode_id(self, obj: EpisodeModel):
-        prev = EpisodeModel.objects.filter(comic=obj.comic, episode_number=obj.episode_number - 1).only('id').first()
+        links = self.context.get('episode_links')
+        if links is not None:
+            return links.get(obj.id, (None, None))[0]
+        prev = EpisodeModel.objects.filter(comic_id=obj.comic_id, episode_number=obj.episode_number - 1).only('id').first()
         return prev.id if prev else None
 
     def get_next_episode_id(self, obj: EpisodeModel):
-        nxt = EpisodeModel.objects.filter(comic=obj.comic, episode_number=obj.episode_number + 1).only('id').first()
+        links = self.context.get('episode_links')
+        if links is not None:
+            return links.get(obj.id, (None, None))[1]
+        nxt = EpisodeModel.objects.filter(comic_id=obj.comic_id, episode_number=obj.episode_number + 1).only('id').first()
         return nxt.id if nxt else None
 
     def get_playback_url(self, obj: EpisodeModel):
-        # Prefer explicit video_url, else video_file.url if present
+        # Prefer explicit video_url, else a signed media link to video_file (pratilipiPc.media)
         if obj.video_url:
             return obj.video_url
         if obj.video_file:
-            try:
-                request = self.context.get('request', None)
-                url = obj.video_file.url
-                return request.build_absolute_uri(url) if request else url
-            except Exception:
-                return None
+            return media.signed_url(self.context.get('request', None), obj.video_file.name)
         return None
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if data['is_locked_for_user']:
+            # Locked for this user: no playable source at all
+            data.update(video_url=None, video_file=None, playback_url=None)
+        elif instance.video_file:
+            # Never the raw upload path
+            data['video_file'] = media.signed_url(self.context.get('request', None), instance.video_file.name)
+        return data
+
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(BufferedCountersMixin, serializers.ModelSerializer):
     class Meta:
         model = CommentModel
-        fields = ['id', 'episode', 'user', 'comment_text', 'likes_count', 'timestamp']
\ No newline at end of file
+        fields = ['id', 'episode', 'user', 'comment_text', 'likes_count', 'timestamp']
+        buffered_counters = ['likes_count']
+        list_serializer_class = BufferedCountersListSerializer
\ No newline at end of file
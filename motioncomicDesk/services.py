@@ -0,0 +1,62 @@
+import logging
+import os
+import struct
+import tempfile
+
+from django.core.files import File
+
+from . import mp4
+from .models import EpisodeModel
+
+logger = logging.getLogger(__name__)
+
+# Metadata written by process_episode_video (all read-only in the API)
+VIDEO_METADATA_FIELDS = ['video_duration', 'video_bitrate', 'video_width', 'video_height', 'video_faststart']
+
+
+def _file_size(fh) -> int:
+    fh.seek(0, os.SEEK_END)
+    return fh.tell()
+
+
+def process_episode_video(episode: EpisodeModel) -> mp4.Mp4Info | None:
+    """
+    Probe the episode's uploaded MP4, rewrite it to fast-start layout when moov sits after
+    mdat, and store duration/bitrate/resolution on the episode.
+    Returns the probed info, or None when there is no file or it is not a readable MP4
+    (the upload is kept as is and the metadata stays empty).
+    """
+    if not episode.video_file:
+        return None
+    name = episode.video_file.name
+    storage = episode.video_file.storage
+
+    try:
+        with storage.open(name, 'rb') as src:
+            size = _file_size(src)
+            info = mp4.probe(src, size)
+            if not info.faststart:
+                with tempfile.TemporaryFile() as tmp:
+                    if mp4.make_faststart(src, tmp, size):
+                        tmp.seek(0)
+                        # Saved next to the original first, so a failed upload loses nothing
+                        new_name = storage.save(name, File(tmp, name=os.path.basename(name)))
+                        src.close()
+                        storage.delete(name)
+                        name = new_name
+                        info.faststart = True
+    except (mp4.Mp4Error, struct.error) as exc:  # struct.error: truncated box
+        logger.warning("Skipping video processing for motion episode %s: %s", episode.pk, exc)
+        return None
+
+    episode.video_file.name = name
+    episode.video_duration = info.duration
+    episode.video_bitrate = info.bitrate
+    episode.video_width = info.width
+    episode.video_height = info.height
+    episode.video_faststart = info.faststart
+    # update(): no post_save, no second round of upload hooks
+    EpisodeModel.objects.filter(pk=episode.pk).update(
+        video_file=name, **{f: getattr(episode, f) for f in VIDEO_METADATA_FIELDS}
+    )
+    return info
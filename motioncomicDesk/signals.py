@@ -0,0 +1,10 @@
+from pratilipiPc.catalog import connect_catalog_signals
+
+from .models import ComicModel
+from .integrations import episode_entitlements
+
+# EpisodeAccess create/delete -> per-user entitlement index
+episode_entitlements.connect_signals()
+
+# ComicModel save/delete -> retire cached catalog pages
+connect_catalog_signals(ComicModel, 'motion')
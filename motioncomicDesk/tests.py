@@ -1,3 +1,184 @@
-from django.test import TestCase
+import io
+import struct
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from profileDesk.models import CustomUser
+from . import mp4
+from .models import ComicModel, EpisodeModel, EpisodeAccess
+
+# Plain in-process cache: no Redis entitlement index, so every lookup is a visible query
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ComicDetailsQueryCountTests(TestCase):
+    # comic, episodes, premium (subscription), EpisodeAccess for the comic
+    DETAILS_QUERIES = 4
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            'reader', 'reader@example.com', 'pass', full_name='Reader', mobile_number='9000000001'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _series(self, title, count):
+        comic = ComicModel.objects.create(title=title, genre='action', description='d')
+        EpisodeModel.objects.bulk_create([
+            EpisodeModel(comic=comic, episode_number=n, is_locked=True, is_free=(n == 1), short_description='s')
+            for n in range(1, count + 1)
+        ])
+        return comic
+
+    def _details(self, comic):
+        return self.client.get(f'/api/motioncomic/motioncomic/{comic.id}/details/')
+
+    def _cold_start(self):
+        # Fresh user instance (no per-request premium memo) and empty caches
+        cache.clear()
+        self.client.force_authenticate(CustomUser.objects.get(pk=self.user.pk))
+
+    def test_query_count_does_not_grow_with_series_length(self):
+        short, long = self._series('short', 3), self._series('long', 100)
+        for comic in (short, long):
+            self._cold_start()
+            with self.assertNumQueries(self.DETAILS_QUERIES):
+                response = self._details(comic)
+            self.assertEqual(response.status_code, 200)
+
+    def test_links_and_lock_state(self):
+        comic = self._series('series', 5)
+        episodes = list(EpisodeModel.objects.filter(comic=comic).order_by('episode_number'))
+        EpisodeAccess.objects.create(user=self.user, episode=episodes[2], source='COINS')
+
+        data = self._details(comic).json()['episodes']
+
+        self.assertIsNone(data[0]['prev_episode_id'])
+        self.assertEqual(data[0]['next_episode_id'], episodes[1].id)
+        self.assertEqual(data[4]['prev_episode_id'], episodes[3].id)
+        self.assertIsNone(data[4]['next_episode_id'])
+        self.assertEqual(
+            [ep['is_locked_for_user'] for ep in data],
+            [False, True, False, True, True],
+        )
+
+
+# -----------------------------
+# mp4: probe and fast-start rewrite on hand-built files
+# -----------------------------
+
+def _box(kind: bytes, *payload: bytes) -> bytes:
+    body = b''.join(payload)
+    return struct.pack('>I4s', 8 + len(body), kind) + body
+
+
+def _mvhd(timescale, duration) -> bytes:
+    # version/flags, creation, modification, timescale, duration, then rate..next_track_ID
+    return _box(b'mvhd', struct.pack('>IIIII', 0, 0, 0, timescale, duration), bytes(80))
+
+
+def _trak(handler: bytes, width, height, chunk_table: bytes) -> bytes:
+    # version/flags .. matrix is 76 bytes, then 16.16 width and height
+    tkhd = _box(b'tkhd', bytes(76), struct.pack('>II', width << 16, height << 16))
+    hdlr = _box(b'hdlr', bytes(8), handler, bytes(12), b'\0')
+    stbl = _box(b'stbl', chunk_table)
+    return _box(b'trak', tkhd, _box(b'mdia', hdlr, _box(b'minf', stbl)))
+
+
+def _chunk_table(kind: bytes, offsets) -> bytes:
+    fmt = '>I' if kind == b'stco' else '>Q'
+    return _box(kind, struct.pack('>II', 0, len(offsets)), b''.join(struct.pack(fmt, o) for o in offsets))
+
+
+def _chunk_offsets(data: bytes) -> list:
+    """Every stco/co64 entry of the moov box in `data`."""
+    moov = next(b for b in mp4.top_level_boxes(io.BytesIO(data), len(data)) if b.kind == b'moov')
+    buf = bytearray(data[moov.start:moov.end])
+    offsets = []
+    for box in mp4._walk(buf, 0, len(buf)):
+        if box.kind in (b'stco', b'co64'):
+            fmt, width = ('>I', 4) if box.kind == b'stco' else ('>Q', 8)
+            count = struct.unpack_from('>I', buf, box.payload_start + 4)[0]
+            offsets += [struct.unpack_from(fmt, buf, box.payload_start + 8 + i * width)[0] for i in range(count)]
+    return offsets
+
+
+CHUNKS = [b'A' * 100, b'B' * 60, b'C' * 40]
+FTYP = _box(b'ftyp', b'isom', struct.pack('>I', 512), b'isomiso2mp41')
+
+
+def _slow_start_mp4(table_kind=b'stco', extra=b'') -> bytes:
+    """ftyp, mdat (three chunks), [extra], moov with a 1280x720 video and an audio track."""
+    mdat_payload_at = len(FTYP) + 8
+    offsets, pos = [], mdat_payload_at
+    for chunk in CHUNKS:
+        offsets.append(pos)
+        pos += len(chunk)
+    moov = _box(
+        b'moov',
+        _mvhd(timescale=1000, duration=12500),
+        _trak(b'soun', 0, 0, _chunk_table(table_kind, offsets[2:])),
+        _trak(b'vide', 1280, 720, _chunk_table(table_kind, offsets[:2])),
+    )
+    return FTYP + _box(b'mdat', *CHUNKS) + extra + moov
+
+
+class Mp4Tests(SimpleTestCase):
+    def _faststart(self, data):
+        dst = io.BytesIO()
+        changed = mp4.make_faststart(io.BytesIO(data), dst, len(data))
+        return changed, dst.getvalue()
+
+    def _assert_rewritten(self, table_kind):
+        data = _slow_start_mp4(table_kind)
+        before = [data[o:o + 4] for o in _chunk_offsets(data)]
+
+        changed, out = self._faststart(data)
+        self.assertTrue(changed)
+        self.assertEqual(len(out), len(data))
+        self.assertEqual([b.kind for b in mp4.top_level_boxes(io.BytesIO(out), len(out))], [b'ftyp', b'moov', b'mdat'])
+        # Every chunk offset still points at the same media bytes
+        self.assertEqual([out[o:o + 4] for o in _chunk_offsets(out)], before)
+        self.assertEqual(sorted(_chunk_offsets(out)), sorted(o + len(data) - data.index(b'moov') + 4 for o in _chunk_offsets(data)))
+
+        info = mp4.probe(io.BytesIO(out), len(out))
+        self.assertTrue(info.faststart)
+        # Already fast-start now: a second pass leaves it alone
+        self.assertEqual(self._faststart(out), (False, b''))
+
+    def test_probe_reads_metadata(self):
+        data = _slow_start_mp4()
+        info = mp4.probe(io.BytesIO(data), len(data))
+        self.assertFalse(info.faststart)
+        self.assertEqual(info.duration, 12.5)
+        self.assertEqual(info.bitrate, int(len(data) * 8 / 12.5))
+        # The video track's size, not the (larger-indexed) audio track's zeros
+        self.assertEqual((info.width, info.height), (1280, 720))
+
+    def test_faststart_shifts_stco_offsets(self):
+        self._assert_rewritten(b'stco')
+
+    def test_faststart_shifts_co64_offsets(self):
+        self._assert_rewritten(b'co64')
+
+    def test_fragmented_file_is_left_alone(self):
+        data = _slow_start_mp4(extra=_box(b'moof', bytes(16)))
+        self.assertEqual(self._faststart(data), (False, b''))
+
+    def test_file_without_moov_is_rejected(self):
+        data = FTYP + _box(b'mdat', *CHUNKS)
+        with self.assertRaises(mp4.Mp4Error):
+            mp4.probe(io.BytesIO(data), len(data))
+
+    def test_stco_overflow_raises(self):
+        data = _slow_start_mp4()
+        moov = bytearray(data[data.index(b'moov') - 4:])
+        # An stco entry just below 4 GiB, as if mdat were that large, cannot move up by len(moov)
+        stco = moov.index(b'stco') - 4
+        struct.pack_into('>I', moov, stco + 16, 0xFFFFFFF0)
+        with self.assertRaises(mp4.Mp4Error):
+            mp4._shift_chunk_offsets(moov, insert_at=0, moov_start=0x100000000, delta=len(moov))
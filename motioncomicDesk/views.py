@@ -5,55 +5,71 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import ComicModel, EpisodeModel, CommentModel, EpisodeAccess
+from counterDesk import ratings, services as counters
+from premiumDesk import unlocks, wallet
+from pratilipiPc import media
+from pratilipiPc.catalog import CatalogListMixin
+
+from .models import ComicModel, EpisodeModel, CommentModel, EpisodeAccess, ComicRating
 from .serializers import ComicSerializer, EpisodeSerializer, CommentSerializer
+from .integrations import episode_entitlements, is_episode_locked_for, is_user_premium
+from .pagination import ComicCatalogPagination
+from .services import process_episode_video
+
 
+# Wallet idempotency keys of episode unlocks: "mc:unlock:<user_id>:<episode_id>"
+UNLOCK_KEY_PREFIX = 'mc'
 
-class MotionComicViewSet(viewsets.ModelViewSet):
+
+class MotionComicViewSet(CatalogListMixin, viewsets.ModelViewSet):
     """
     Routes:
-    - GET /api/motioncomic/motioncomic/?genre=
+    - GET /api/motioncomic/motioncomic/?genre=&sort=&fields=
+      Catalog pages with ?page_size= / ?cursor= (pratilipiPc.catalog)
     - GET /api/motioncomic/motioncomic/{comic_id}/details/
     - POST /api/motioncomic/motioncomic/{comic_id}/unlock/   body: { episode_id }
       Response:
         200 -> { unlocked: true, source: "PREMIUM" | "ALREADY", balance? }
         201 -> { unlocked: true, source: "COINS", balance }
         400 -> { error, code?: "insufficient_balance" }
+    - POST /api/motioncomic/motioncomic/{comic_id}/unlock-batch/   body: { episode_ids } | { from_episode, to_episode }
     - Additional actions: rate, view, like, comment, commentlike, share, favourite, create_episode
     """
     queryset = ComicModel.objects.all()
     serializer_class = ComicSerializer
     permission_classes = [IsAuthenticated]
-
-    def list(self, request):
-        genre = request.query_params.get('genre', '')
-        queryset = self.queryset
-        if genre:
-            queryset = queryset.filter(genre=genre)
-        return Response(self.get_serializer(queryset, many=True).data)
+    catalog_namespace = 'motion'
+    catalog_pagination_class = ComicCatalogPagination
 
     @action(detail=True, methods=['get'])
     def details(self, request, pk=None):
         comic = self.get_object()
         # Return episodes sorted by episode_number
-        episodes = EpisodeModel.objects.filter(comic=comic).order_by('episode_number')
+        episodes = list(EpisodeModel.objects.filter(comic=comic).order_by('episode_number'))
+
+        # next/prev follow the episode_number +/- 1 rule, resolved from the list itself
+        by_number = {ep.episode_number: ep.id for ep in episodes}
+        context = self.get_serializer_context()
+        context['episode_links'] = {
+            ep.id: (by_number.get(ep.episode_number - 1), by_number.get(ep.episode_number + 1))
+            for ep in episodes
+        }
+        context.update(self._episode_access_context(request.user, comic, episodes))
         return Response({
             'comic': self.get_serializer(comic).data,
-            'episodes': EpisodeSerializer(episodes, many=True, context={'request': request}).data
+            'episodes': EpisodeSerializer(episodes, many=True, context=context).data
         })
 
-    def _is_user_premium(self, user) -> bool:
-        # Replace with premiumDesk integration if available
-        if not user or not getattr(user, 'is_authenticated', False):
-            return False
-        if getattr(user, 'is_premium', False):
-            return True
-        if hasattr(user, 'subscriptionmodel_set'):
-            try:
-                return user.subscriptionmodel_set.exists()
-            except Exception:
-                return False
-        return False
+    @staticmethod
+    def _episode_access_context(user, comic, episodes):
+        """Caller's lock state for a batch of episodes: one premium check, one index lookup."""
+        if not user.is_authenticated:
+            return {}
+        if not any(ep.is_locked and not ep.is_free for ep in episodes):
+            return {'unlocked_episode_ids': set(), 'is_premium': False}
+        if is_user_premium(user):
+            return {'unlocked_episode_ids': set(), 'is_premium': True}
+        return {'unlocked_episode_ids': episode_entitlements.unlocked_episode_ids(user, comic.id), 'is_premium': False}
 
     @action(detail=True, methods=['post'])
     def unlock(self, request, pk=None):
@@ -78,7 +94,7 @@ class MotionComicViewSet(viewsets.ModelViewSet):
             return Response({"error": "Valid episode_id required for this comic"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Idempotency: already unlocked for this user
-        if EpisodeAccess.objects.filter(user=user, episode=episode).exists():
+        if episode_entitlements.has_access(user, comic.id, episode.id):
             return Response({"unlocked": True, "source": "ALREADY", "episode_id": episode.id}, status=status.HTTP_200_OK)
 
         # Safety guard: admin globally unlocked -> do not charge, mark as ALREADY
@@ -87,68 +103,94 @@ class MotionComicViewSet(viewsets.ModelViewSet):
             return Response({"unlocked": True, "source": "ALREADY", "episode_id": episode.id}, status=status.HTTP_200_OK)
 
         # Premium or Free episode -> grant without coins
-        if episode.is_free or self._is_user_premium(user):
+        if episode.is_free or is_user_premium(user):
             EpisodeAccess.objects.get_or_create(
                 user=user, episode=episode,
                 defaults={'source': EpisodeAccess.SOURCE_PREMIUM}
             )
             return Response({"unlocked": True, "source": "PREMIUM", "episode_id": episode.id}, status=status.HTTP_200_OK)
 
-        # Coins path
-        cost = episode.coin_cost or 50
-        balance = getattr(user, 'coin_count', 0)
-        if balance < cost:
-            return Response(
-                {"error": "Insufficient coins", "code": "insufficient_balance", "required": cost, "balance": balance},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Deduct and grant atomically
+        # Coins path: conditional debit + ledger row; the idempotency key makes retries free
+        cost = unlocks.coin_cost(episode)
         with transaction.atomic():
-            # Re-check idempotency inside tx
-            if EpisodeAccess.objects.select_for_update().filter(user=user, episode=episode).exists():
-                return Response({"unlocked": True, "source": "ALREADY", "episode_id": episode.id}, status=status.HTTP_200_OK)
-
-            # Deduct simple balance (replace with WalletLedger when available)
-            user.coin_count = balance - cost
-            user.save(update_fields=['coin_count'])
-
-            EpisodeAccess.objects.create(user=user, episode=episode, source=EpisodeAccess.SOURCE_COINS)
+            debit = wallet.debit(
+                user,
+                amount=cost,
+                idempotency_key=unlocks.unlock_key(UNLOCK_KEY_PREFIX, user.id, episode.id),
+                reason='unlock_episode',
+                link_model='motioncomic.episode',
+                link_id=str(episode.id),
+            )
+            if not debit.success:
+                return Response(
+                    {"error": "Insufficient coins", "code": "insufficient_balance", "required": cost, "balance": debit.balance},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            EpisodeAccess.objects.get_or_create(user=user, episode=episode, defaults={'source': EpisodeAccess.SOURCE_COINS})
 
         return Response(
             {"unlocked": True, "source": "COINS", "episode_id": episode.id, "balance": user.coin_count},
             status=status.HTTP_201_CREATED
         )
 
+    @action(detail=True, methods=['post'], url_path='unlock-batch')
+    def unlock_batch(self, request, pk=None):
+        """
+        Batch unlock (parity with digital, premiumDesk.unlocks):
+        - Body: { episode_ids: [..] } or { from_episode: n, to_episode: m } (inclusive, by episode_number)
+        - Already-unlocked episodes are skipped; free/admin-unlocked/premium ones are granted without coins
+        - The rest are priced together: one conditional debit, one ledger row per episode,
+          one bulk insert of EpisodeAccess, all in one transaction
+        Response:
+          200/201 -> { unlocked: [ids], already: [ids], source: "COINS"|"PREMIUM"|"ALREADY", coins_spent, balance }
+          400 -> { error, code: "bad_request"|"insufficient_balance", required?, balance? }
+        """
+        comic = self.get_object()
+        episodes = unlocks.episodes_for_batch(EpisodeModel.objects.filter(comic=comic), request.data)
+        if episodes is None:
+            return Response(
+                {"error": unlocks.BAD_BATCH_MESSAGE, "code": "bad_request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = unlocks.unlock_batch(
+            request.user, comic.id, episodes, episode_entitlements,
+            key_prefix=UNLOCK_KEY_PREFIX, link_model='motioncomic.episode',
+        )
+        if not result.success:
+            return Response(
+                {"error": "Insufficient coins", "code": result.error_code, "required": result.required, "balance": result.balance},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result.payload(), status=status.HTTP_201_CREATED if result.coins_spent else status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'])
     def rate(self, request, pk=None):
+        # One rating per user (re-rating replaces it); aggregates move by F() deltas
         comic = self.get_object()
-        rating = request.data.get('rating', 0)
-        try:
-            rating = float(rating)
-        except (TypeError, ValueError):
+        stars = ratings.to_stars(request.data.get('rating'))
+        if stars is None:
             return Response({"error": "Invalid rating"}, status=status.HTTP_400_BAD_REQUEST)
-        if 1 <= rating <= 5:
-            # Weighted average
-            comic.rating = ((comic.rating * comic.rating_count) + rating) / (comic.rating_count + 1)
-            comic.rating_count += 1
-            comic.save(update_fields=['rating', 'rating_count'])
-            return Response({"rating": float(comic.rating)}, status=status.HTTP_200_OK)
-        return Response({"error": "Invalid rating"}, status=status.HTTP_400_BAD_REQUEST)
+        ratings.record(ComicRating, comic, request.user, stars)
+        comic.refresh_from_db(fields=ratings.AGGREGATE_FIELDS)
+        return Response({
+            "rating": ratings.average(comic),
+            "rating_count": comic.rating_count,
+            "rating_breakdown": ratings.breakdown(comic),
+            "your_rating": stars,
+        }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def view(self, request, pk=None):
         comic = self.get_object()
-        comic.view_count += 1
-        comic.save(update_fields=['view_count'])
-        return Response({"view_count": comic.view_count}, status=status.HTTP_200_OK)
+        view_count = counters.increment(comic, 'view_count')
+        return Response({"view_count": view_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
         comic = self.get_object()
-        comic.favourite_count += 1
-        comic.save(update_fields=['favourite_count'])
-        return Response({"favourite_count": comic.favourite_count}, status=status.HTTP_200_OK)
+        favourite_count = counters.increment(comic, 'favourite_count')
+        return Response({"favourite_count": favourite_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def comment(self, request, pk=None):
@@ -167,17 +209,15 @@ class MotionComicViewSet(viewsets.ModelViewSet):
         comment_id = request.data.get('comment_id')
         if comment_id:
             comment = get_object_or_404(CommentModel, id=comment_id, episode__comic=comic)
-            comment.likes_count += 1
-            comment.save(update_fields=['likes_count'])
-            return Response({"likes_count": comment.likes_count}, status=status.HTTP_200_OK)
+            likes_count = counters.increment(comment, 'likes_count')
+            return Response({"likes_count": likes_count}, status=status.HTTP_200_OK)
         return Response({"error": "Comment ID required"}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'])
     def share(self, request, pk=None):
         comic = self.get_object()
-        comic.favourite_count += 1  # simple placeholder metric
-        comic.save(update_fields=['favourite_count'])
-        return Response({"favourite_count": comic.favourite_count}, status=status.HTTP_200_OK)
+        favourite_count = counters.increment(comic, 'favourite_count')  # simple placeholder metric
+        return Response({"favourite_count": favourite_count}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'])
     def favourite(self, request, pk=None):
@@ -189,7 +229,9 @@ class MotionComicViewSet(viewsets.ModelViewSet):
         comic = self.get_object()
         serializer = EpisodeSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(comic=comic)
+            episode = serializer.save(comic=comic)
+            # Fast-start rewrite + duration/bitrate/resolution
+            process_episode_video(episode)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -198,6 +240,12 @@ class EpisodeViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     """
     GET /api/motioncomic/motioncomic/episode/{id}/
     Returns single episode with per-user lock, prev/next, playback_url.
+
+    GET /api/motioncomic/motioncomic/episode/{id}/stream/
+    The uploaded video_file for players that send the Bearer token: Range (single and
+    multi-range 206), ETag / If-None-Match and If-Range, via pratilipiPc.media.serve.
+      403 -> { error } when the episode is locked for the caller
+      404 -> no video_file (external video_url episodes play that URL directly)
     """
     queryset = EpisodeModel.objects.all()
     serializer_class = EpisodeSerializer
@@ -206,4 +254,13 @@ class EpisodeViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance, context={'request': request})
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def stream(self, request, pk=None):
+        episode = self.get_object()
+        if not episode.video_file:
+            return Response({"error": "This episode has no uploaded video."}, status=status.HTTP_404_NOT_FOUND)
+        if is_episode_locked_for(request.user, episode):
+            return Response({"error": "Episode is locked."}, status=status.HTTP_403_FORBIDDEN)
+        return media.serve(request, episode.video_file.name)
\ No newline at end of file
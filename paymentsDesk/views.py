@@ -14,6 +14,7 @@ from rest_framework.views import APIView
 
 from profileDesk.models import CustomUser
 from .models import Payment
+from premiumDesk.entitlements import is_user_premium
 from premiumDesk.models import SubscriptionModel, WalletLedger
 from premiumDesk.serializers import SubscriptionSerializer, PLAN_PRICING
 
@@ -55,7 +56,7 @@ class CreateOrderView(APIView):
 
         # Enforce one active subscription at a time
         now = timezone.now()
-        if SubscriptionModel.objects.filter(user=user, end_date__gt=now).exists():
+        if is_user_premium(user):
             return Response({"detail": "Active subscription exists"}, status=status.HTTP_409_CONFLICT)
 
         # Server-authoritative amount
@@ -0,0 +1,159 @@
+# pratilipiPc/catalog.py
+"""
+Catalog listing shared by the digital and motion comic apps.
+
+GET <list>/ keeps its original shape (every comic, optional ?genre=) unless the client asks
+for a page with ?page_size=<n> or ?cursor=<next_cursor>. Catalog mode then serves keyset
+pages in one of the app's sort orders (?sort=popular|rating|newest) and caches each page,
+keyed by (genre, sort, page size, cursor, fields), for every user.
+
+Cached pages carry the app's catalog version as cache version. A ComicModel save or delete
+replaces the version (see connect_catalog_signals), so the next request rebuilds. Counter
+and rating columns are written with UPDATE (no signals) and age out with CATALOG_PAGE_TTL.
+
+?fields=id,title,cover_image trims the payload in both modes (SparseFieldsMixin); columns
+named in `catalog_deferred_fields` are not even loaded unless requested.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .pagination import KeysetPagination
+
+CATALOG_PAGE_TTL = 60  # seconds; bounds staleness of view/favourite/rating columns
+
+
+def _version_key(namespace) -> str:
+    return f"catalog:{namespace}:version"
+
+
+def catalog_version(namespace) -> int:
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_catalog(namespace) -> None:
+    """Retire every cached page of `namespace` once the surrounding transaction commits."""
+    # A fresh timestamp instead of INCR: a version can never come back after eviction
+    transaction.on_commit(lambda: cache.set(_version_key(namespace), time.time_ns(), None))
+
+
+def connect_catalog_signals(model, namespace) -> None:
+    def _invalidate(sender, **kwargs):
+        invalidate_catalog(namespace)
+
+    uid = f"catalog:{namespace}"
+    post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+
+
+def parse_fields(request, serializer_class):
+    """
+    Names from ?fields=a,b,c that the serializer declares, always including 'id'.
+    None when the parameter is absent or names nothing known (full payload).
+    """
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    declared = serializer_class.Meta.fields
+    wanted = {name.strip() for name in raw.split(',')}
+    fields = [name for name in declared if name in wanted]
+    if not fields:
+        return None
+    if 'id' in declared and 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+class SparseFieldsMixin:
+    """Serializer mixin: keep only the fields listed in context['fields'], if given."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = self.context.get('fields')
+        if wanted:
+            for name in set(self.fields) - set(wanted):
+                self.fields.pop(name)
+
+
+class CatalogPagination(KeysetPagination):
+    """
+    KeysetPagination over one of several named orderings, picked with ?sort=.
+    Every ordering must end in a unique field and be backed by an index.
+    """
+    sorts = {}
+    default_sort = None
+    sort_query_param = 'sort'
+    page_size = 20
+    max_page_size = 100
+
+    def get_sort(self, request):
+        """The requested sort name, the default when absent, ValidationError when unknown."""
+        sort = request.query_params.get(self.sort_query_param) or self.default_sort
+        if sort not in self.sorts:
+            raise ValidationError({"error": f"sort must be one of: {', '.join(self.sorts)}."})
+        return sort
+
+
+class CatalogListMixin:
+    """
+    ViewSet mixin providing the catalog `list` described in the module docstring.
+    Set `catalog_namespace` and `catalog_pagination_class` (a CatalogPagination).
+    """
+    catalog_namespace = None
+    catalog_pagination_class = None
+    catalog_deferred_fields = ('description',)
+
+    def list(self, request):
+        paginator = self.catalog_pagination_class()
+        genre = request.query_params.get('genre', '')
+        fields = parse_fields(request, self.get_serializer_class())
+
+        queryset = self.get_queryset()
+        if genre:
+            queryset = queryset.filter(genre=genre)
+        if fields is not None:
+            deferred = [name for name in self.catalog_deferred_fields if name not in fields]
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        context = {**self.get_serializer_context(), 'fields': fields}
+
+        if not paginator.is_requested(request):
+            # Original unpaginated listing; ordered only when ?sort= is given
+            if request.query_params.get(paginator.sort_query_param):
+                queryset = queryset.order_by(*paginator.sorts[paginator.get_sort(request)])
+            return Response(self.get_serializer(queryset, many=True, context=context).data)
+
+        sort = paginator.get_sort(request)
+        paginator.ordering = paginator.sorts[sort]
+        key = self._catalog_page_key(
+            genre, sort, paginator.get_page_size(request),
+            request.query_params.get(paginator.cursor_query_param, ''), fields,
+        )
+        version = catalog_version(self.catalog_namespace)
+        cached = cache.get(key, version=version)
+        if cached is None:
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            cached = {
+                'results': self.get_serializer(page, many=True, context=context).data,
+                'next_cursor': paginator.next_cursor,
+            }
+            cache.set(key, cached, timeout=CATALOG_PAGE_TTL, version=version)
+        else:
+            paginator.request = request
+            paginator.next_cursor = cached['next_cursor']
+        return paginator.get_paginated_response(cached['results'])
+
+    def _catalog_page_key(self, genre, sort, page_size, cursor, fields) -> str:
+        # Genre and cursor are client text; hash so the key stays short and cache-safe
+        raw = '|'.join([genre, sort, str(page_size), cursor, ','.join(fields or ())])
+        return f"catalog:{self.catalog_namespace}:page:{hashlib.md5(raw.encode()).hexdigest()}"
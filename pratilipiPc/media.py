@@ -0,0 +1,301 @@
+# pratilipiPc/media.py
+"""
+Protected media delivery for paid episode assets (slices, PDFs, videos).
+
+Entitlement is checked by the API view that hands out the asset URL; the URL it returns is
+a short-lived signed link to the media gateway instead of the public storage URL:
+
+    /api/media/<storage name>?e=<expires>&s=<hmac>
+
+The gateway only verifies the HMAC (no DB, no session: <img>/<video> tags cannot send a
+Bearer token) and hands the transfer off, so Python never copies the bytes itself:
+
+  MEDIA_DELIVERY = 'x-accel'     nginx serves MEDIA_ACCEL_PREFIX + name from an internal location
+                   'x-sendfile'  Apache/lighttpd (mod_xsendfile) serves the absolute file path
+                   'redirect'    302 to a presigned storage URL (S3) that expires after MEDIA_URL_TTL
+                   'file'        FileResponse; the WSGI server's file_wrapper uses os.sendfile.
+                                 Byte ranges come from a memory map (default, for local runs)
+
+nginx, for 'x-accel':
+    location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+
+Expiry is rounded up to a MEDIA_URL_TTL window, so the same asset keeps the same URL for a
+while and stays cacheable on the client. A link is valid for at least one window.
+
+The assets themselves must never be reachable at their plain /media/ path:
+
+  - paid files are saved through protected_storage(): the 'protected' STORAGES alias (private
+    S3 objects, presigned URLs) when configured, else the default storage;
+  - the DEBUG /media/ mount (public_media) 404s every is_protected() name; a front server
+    serving MEDIA_ROOT must deny those paths too, e.g. for nginx:
+
+    location ~ ^/media/(digitalcomics|motioncomics)/episodes/ { return 404; }
+
+    (that also hides the episode thumbnails stored next to them; serve those from the
+    internal MEDIA_ROOT alias or move them out of the prefix).
+"""
+import mimetypes
+import mmap
+import os
+import posixpath
+import secrets
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import InvalidStorageError, default_storage, storages
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date, parse_http_date_safe, urlencode
+from django.views.decorators.http import require_GET
+from django.views.static import serve as static_serve
+
+_SALT = 'pratilipiPc.media'
+
+# Upload prefixes of paid episode assets (PDFs, slices and their renditions, videos).
+# Episode thumbnails share them but sit flat in the prefix; see is_protected().
+PROTECTED_PREFIXES = ('digitalcomics/episodes/', 'motioncomics/episodes/')
+
+
+def _ttl() -> int:
+    return getattr(settings, 'MEDIA_URL_TTL', 300)
+
+
+def _signature(name: str, expires: int) -> str:
+    return salted_hmac(_SALT, f"{name}:{expires}", algorithm='sha256').hexdigest()
+
+
+def signed_url(request, name) -> str | None:
+    """Signed gateway URL for a storage name (absolute when a request is given)."""
+    if not name:
+        return None
+    name = str(name)
+    ttl = _ttl()
+    expires = (int(time.time()) // ttl + 2) * ttl
+    url = reverse('protected-media', kwargs={'name': name})
+    url = f"{url}?{urlencode({'e': expires, 's': _signature(name, expires)})}"
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def is_valid_signature(name: str, expires, signature) -> bool:
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < time.time():
+        return False
+    return constant_time_compare(_signature(name, expires), signature or '')
+
+
+def protected_storage():
+    """
+    Storage for paid episode assets (used as the FileField storage callable): the 'protected'
+    STORAGES alias when configured (private objects, presigned URLs), else the default storage.
+    """
+    try:
+        return storages['protected']
+    except InvalidStorageError:
+        return default_storage
+
+
+def is_protected(name: str) -> bool:
+    """
+    True for storage names of paid episode assets: anything under PROTECTED_PREFIXES except
+    the images stored directly in the prefix (episode thumbnails, shown on locked episodes).
+    """
+    name = posixpath.normpath(str(name)).lstrip('/').lower()
+    for prefix in PROTECTED_PREFIXES:
+        if name.startswith(prefix):
+            is_image = (mimetypes.guess_type(name)[0] or '').startswith('image/')
+            return '/' in name[len(prefix):] or not is_image
+    return False
+
+
+def public_media(request, path):
+    """DEBUG /media/ mount: MEDIA_ROOT minus the paid assets, which only the gateway serves."""
+    if is_protected(path):
+        raise Http404
+    return static_serve(request, path, document_root=settings.MEDIA_ROOT)
+
+
+def _local_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        # Remote storage (S3): nothing on local disk to hand off
+        return None
+
+
+def serve(request, name):
+    """
+    Hand the transfer of storage file `name` off per MEDIA_DELIVERY. Callers check access.
+    Front servers (and S3) answer Range / If-None-Match themselves; in 'file' mode
+    ranged_file_response does it.
+    """
+    mode = getattr(settings, 'MEDIA_DELIVERY', 'file')
+    storage = protected_storage()
+    path = _local_path(storage, name)
+    if mode == 'redirect' or path is None:
+        # Private bucket: url() is presigned and expires after MEDIA_URL_TTL
+        return HttpResponseRedirect(storage.url(name))
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if mode == 'x-accel':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + quote(name)
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        try:
+            response = ranged_file_response(request, path, content_type)
+        except FileNotFoundError:
+            raise Http404
+    response['Cache-Control'] = f"private, max-age={_ttl()}"
+    return response
+
+
+@require_GET
+def protected_media(request, name):
+    if not is_valid_signature(name, request.GET.get('e'), request.GET.get('s')):
+        return HttpResponseForbidden()
+    return serve(request, name)
+
+
+# -----------------------------
+# Byte ranges (local 'file' delivery)
+# -----------------------------
+
+MAX_RANGES = 16  # more (after merging) is served as the whole file
+RANGE_CHUNK_SIZE = 256 * 1024
+
+
+def file_etag(st) -> str:
+    """Strong validator: changes whenever the file's size or mtime does."""
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def parse_byte_ranges(header: str, size: int):
+    """
+    Parse a Range header into sorted, merged, inclusive (start, end) pairs within `size`.
+    None when the header is absent or not a bytes range (serve the whole file);
+    [] when no range is satisfiable (416).
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    ranges = []
+    for spec in header[len('bytes='):].split(','):
+        first, sep, last = spec.strip().partition('-')
+        if not sep:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+            else:
+                suffix = int(last)  # "-n": the last n bytes
+                if suffix <= 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+        except ValueError:
+            return None
+        if start < 0 or start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _if_range_passes(request, etag, last_modified) -> bool:
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith('"'):
+        return value == etag  # strong comparison
+    return parse_http_date_safe(value) == last_modified
+
+
+def _mapped_parts(path, parts):
+    """
+    Yield the byte ranges of `path` from a read-only memory map (pages come straight from the
+    page cache, no read() buffers). `parts` mixes bytes (multipart framing) and (start, end).
+    """
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for part in parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            start, end = part
+            for offset in range(start, end + 1, RANGE_CHUNK_SIZE):
+                yield mapped[offset:min(offset + RANGE_CHUNK_SIZE, end + 1)]
+
+
+def ranged_file_response(request, path, content_type):
+    """
+    Serve a local file with ETag / Last-Modified, conditional GET (304/412) and single or
+    multi-range (multipart/byteranges) 206 responses. Full-file responses go through
+    FileResponse, which the WSGI server turns into sendfile().
+    """
+    st = os.stat(path)
+    etag = file_etag(st)
+    last_modified = int(st.st_mtime)
+    validators = {'ETag': etag, 'Last-Modified': http_date(last_modified), 'Accept-Ranges': 'bytes'}
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        for header, value in validators.items():
+            conditional[header] = value
+        return conditional
+
+    ranges = None
+    if _if_range_passes(request, etag, last_modified):
+        ranges = parse_byte_ranges(request.META.get('HTTP_RANGE', ''), st.st_size)
+
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{st.st_size}"
+    elif ranges is None or len(ranges) > MAX_RANGES:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(_mapped_parts(path, ranges), status=206, content_type=content_type)
+        response['Content-Range'] = f"bytes {start}-{end}/{st.st_size}"
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        boundary = secrets.token_hex(16)
+        parts, length = [], 0
+        for start, end in ranges:
+            head = (
+                f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{st.st_size}\r\n\r\n"
+            ).encode()
+            parts += [head, (start, end), b"\r\n"]
+            length += len(head) + (end - start + 1) + 2
+        tail = f"--{boundary}--\r\n".encode()
+        parts.append(tail)
+        response = StreamingHttpResponse(
+            _mapped_parts(path, parts), status=206,
+            content_type=f"multipart/byteranges; boundary={boundary}",
+        )
+        response['Content-Length'] = str(length + len(tail))
+
+    for header, value in validators.items():
+        response[header] = value
+    return response
@@ -0,0 +1,132 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder trims datetimes to milliseconds; a cursor needs the exact stored value
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique ordering such as ('-created_at', '-id').
+
+    The opaque cursor carries the ordering values of the last row served, and the next
+    page is fetched with a lexicographic WHERE on those values. Each page is an indexed
+    range scan of page_size + 1 rows: no COUNT(*), no OFFSET, constant cost at any depth.
+    The last field of `ordering` must make the ordering unique (usually the pk).
+
+    Response: { "next": "<url>|null", "next_cursor": "<cursor>|null", "results": [...] }
+    """
+    ordering = ('-id',)
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = tuple(self.ordering)
+
+        position = self.decode_cursor(request, queryset.model, ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(self.page[-1], ordering) if self.has_next else None
+        return self.page
+
+    def is_requested(self, request) -> bool:
+        """True if the client asked for a page (cursor or page size given)."""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('next_cursor', self.next_cursor),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    # -- cursor encoding -------------------------------------------------
+
+    @staticmethod
+    def _field_names(ordering):
+        return [f.lstrip('-') for f in ordering]
+
+    def encode_cursor(self, obj, ordering) -> str:
+        values = [getattr(obj, name) for name in self._field_names(ordering)]
+        raw = json.dumps(values, cls=_CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model, ordering):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode()
+            values = json.loads(raw)
+            names = self._field_names(ordering)
+            if not isinstance(values, list) or len(values) != len(names):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value) if value is not None else None
+                for name, value in zip(names, values)
+            ]
+        except (TypeError, ValueError, ValidationError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _after(ordering, position) -> Q:
+        """(a, b, c) > (x, y, z) in ordering direction, spelled out for index-friendly SQL."""
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f"{name}__{lookup}": value})
+            equal_so_far &= Q(**{name: value})
+        return condition
@@ -61,6 +61,7 @@ INSTALLED_APPS = [
     'carouselDesk',
     'creatorDesk',
     'paymentsDesk',
+    'counterDesk',
 ]
 
 
@@ -152,6 +153,17 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Paid episode assets are served through signed gateway links (pratilipiPc.media).
+# MEDIA_DELIVERY: 'file' (local runs), 'x-accel' (nginx), 'x-sendfile' or 'redirect' (S3)
+MEDIA_DELIVERY = config('MEDIA_DELIVERY', default='file')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+MEDIA_URL_TTL = config('MEDIA_URL_TTL', default=300, cast=int)  # seconds
+
+# Community home timeline (communityDesk.timeline): post ids kept per reader, and the
+# follower count from which an author's posts are merged at read time instead of fanned out
+TIMELINE_MAX_ENTRIES = config('TIMELINE_MAX_ENTRIES', default=800, cast=int)
+TIMELINE_CELEBRITY_FOLLOWERS = config('TIMELINE_CELEBRITY_FOLLOWERS', default=10000, cast=int)
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'profileDesk.CustomUser'
@@ -256,4 +268,22 @@ if STORAGES_AVAILABLE:
 
     # Only enable if all essentials are present
     if all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_STORAGE_BUCKET_NAME]):
-        DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
\ No newline at end of file
+        DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+
+        # Paid episode assets (pratilipiPc.media.protected_storage) on S3: private objects, only
+        # reachable through presigned URLs that expire with the gateway links. Opt-in: files
+        # already stored on local disk must be uploaded to the bucket (same names) first.
+        # Every other upload stays on the default (local) storage.
+        if config('PROTECTED_MEDIA_S3', default=False, cast=bool):
+            STORAGES = {
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+                'protected': {
+                    'BACKEND': DEFAULT_FILE_STORAGE,
+                    'OPTIONS': {
+                        'default_acl': 'private',
+                        'querystring_auth': True,
+                        'querystring_expire': MEDIA_URL_TTL,
+                    },
+                },
+            }
\ No newline at end of file
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .media import protected_media, public_media
 
 urlpatterns = [
     path('', TemplateView.as_view(template_name='welcome.html'), name='welcome'),
@@ -23,6 +24,9 @@ urlpatterns = [
     path('api/favourite/', include('favouriteDesk.urls')),
     path('api/creator/', include('creatorDesk.urls')),
 
+    # Signed links to paid episode assets (pratilipiPc.media)
+    path('api/media/<path:name>', protected_media, name='protected-media'),
+
     # Payments
     path('api/payments/razorpay/', include('paymentsDesk.urls')),
     path('api/payments/play/', include('paymentsDesk.play_urls')),  # Google Play verify endpoint
@@ -31,4 +35,5 @@ urlpatterns = [
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns = [path('__debug__/', include(debug_toolbar.urls))] + urlpatterns
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # Not static(): paid episode assets must only be reachable through the signed gateway
+    urlpatterns += [path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", public_media)]
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PremiumdeskConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'premiumDesk'
+
+    def ready(self):
+        # Import signals so handlers register
+        from . import signals  # noqa: F401
@@ -0,0 +1,228 @@
+# premiumDesk/entitlements.py
+"""
+Entitlement lookups shared by the comic apps: premium status and per-episode unlocks.
+
+Premium status is the end of the user's current subscription, read once per request
+(memoised on the user instance) and cached with a TTL equal to the subscription's remaining
+lifetime, so the cached answer can never outlive the plan. Non-premium answers are cached
+briefly. SubscriptionModel writes drop the cached value (see premiumDesk.signals).
+
+Per-user episode entitlement index:
+
+Each app keeps its own EpisodeAccess table as the source of truth. The index mirrors a
+user's unlocked episode ids per comic in one Redis set, so "which of these N episodes can
+this user read" is a single SMEMBERS instead of N existence queries.
+
+Key layout:
+  entitlements:<namespace>:<user_id>:<comic_id>   set of episode ids, plus WARM_MARKER
+
+A set is only trusted once it carries WARM_MARKER, i.e. after it was loaded from the DB.
+Unlocks are added with SADD after commit, revocations drop the set. Without a Redis cache
+backend every lookup is one EpisodeAccess query per (user, comic).
+"""
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import SubscriptionModel
+
+logger = logging.getLogger(__name__)
+
+NON_PREMIUM_TTL = 300  # seconds
+_NOT_PREMIUM = 'none'  # cached marker; None means cache miss
+_MEMO_ATTR = '_premium_until'
+
+WARM_MARKER = '*'
+ENTITLEMENT_TTL = 60 * 60 * 24  # seconds; bounds drift from writes that bypass signals
+
+
+def _redis():
+    """Raw redis-py client behind the default cache, or None if the cache is not Redis."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except Exception:
+        return None
+
+
+def _premium_cache_key(user_id) -> str:
+    return f"premium:user:{user_id}:until"
+
+
+def premium_until(user):
+    """End date of the user's current subscription, or None if not premium."""
+    if not user or not getattr(user, 'is_authenticated', False):
+        return None
+    if hasattr(user, _MEMO_ATTR):
+        return getattr(user, _MEMO_ATTR)
+
+    key = _premium_cache_key(user.pk)
+    cached = cache.get(key)
+    now = timezone.now()
+    if cached is None:
+        # Served by the (user, end_date) index
+        until = (
+            SubscriptionModel.objects
+            .filter(user_id=user.pk, end_date__gt=now)
+            .order_by('-end_date')
+            .values_list('end_date', flat=True)
+            .first()
+        )
+        if until:
+            cache.set(key, until, max(1, int((until - now).total_seconds())))
+        else:
+            cache.set(key, _NOT_PREMIUM, NON_PREMIUM_TTL)
+    else:
+        until = None if cached == _NOT_PREMIUM else cached
+
+    if until is not None and until <= now:
+        until = None
+    setattr(user, _MEMO_ATTR, until)
+    return until
+
+
+def is_user_premium(user) -> bool:
+    return premium_until(user) is not None
+
+
+def invalidate_premium(user):
+    """
+    Forget the cached premium state once the surrounding transaction commits.
+    Accepts a user (also drops its per-request memo) or a user id.
+    """
+    if hasattr(user, 'pk'):
+        user.__dict__.pop(_MEMO_ATTR, None)
+        user = user.pk
+    key = _premium_cache_key(user)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class EpisodeEntitlementIndex:
+    """
+    access_model: an EpisodeAccess-style model with `user` and `episode` FKs, where the
+    episode model has a `comic` FK.
+    """
+
+    def __init__(self, access_model, namespace: str, ttl: int = ENTITLEMENT_TTL):
+        self.access_model = access_model
+        self.namespace = namespace
+        self.ttl = ttl
+        self._episode_pk = access_model._meta.get_field('episode').related_model._meta.pk
+
+    def _key(self, user_id, comic_id) -> str:
+        return f"entitlements:{self.namespace}:{user_id}:{comic_id}"
+
+    def _load(self, user_id, comic_id) -> set:
+        return set(
+            self.access_model.objects
+            .filter(user_id=user_id, episode__comic_id=comic_id)
+            .values_list('episode_id', flat=True)
+        )
+
+    # -- reads ------------------------------------------------------------
+
+    def unlocked_episode_ids(self, user, comic_id) -> set:
+        """Ids of every episode of `comic_id` the user holds an access record for."""
+        user_id = getattr(user, 'pk', user)
+        r = _redis()
+        if r is None:
+            return self._load(user_id, comic_id)
+
+        key = self._key(user_id, comic_id)
+        try:
+            members = {_decode(m) for m in r.smembers(key)}
+        except Exception:
+            logger.warning("Entitlement index read failed for %s", key, exc_info=True)
+            return self._load(user_id, comic_id)
+
+        if WARM_MARKER in members:
+            members.discard(WARM_MARKER)
+            return {self._episode_pk.to_python(m) for m in members}
+
+        ids = self._load(user_id, comic_id)
+        try:
+            pipe = r.pipeline()
+            pipe.sadd(key, WARM_MARKER, *[str(i) for i in ids])
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        except Exception:
+            logger.warning("Entitlement index warm failed for %s", key, exc_info=True)
+        return ids
+
+    def has_access(self, user, comic_id, episode_id) -> bool:
+        return self._episode_pk.to_python(episode_id) in self.unlocked_episode_ids(user, comic_id)
+
+    # -- writes -----------------------------------------------------------
+
+    def add(self, user_id, comic_id, *episode_ids):
+        """Record new unlocks once the surrounding transaction commits."""
+        if not episode_ids:
+            return
+        key = self._key(user_id, comic_id)
+
+        def _sadd():
+            r = _redis()
+            if r is None:
+                return
+            try:
+                pipe = r.pipeline()
+                # A cold set stays cold (no marker); the next read loads it in full
+                pipe.sadd(key, *[str(i) for i in episode_ids])
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+            except Exception:
+                logger.warning("Entitlement index update failed for %s", key, exc_info=True)
+
+        transaction.on_commit(_sadd)
+
+    def grant_many(self, user, comic_id, episode_ids, source):
+        """Create access rows for episodes of one comic in one INSERT (existing rows are kept)."""
+        if not episode_ids:
+            return
+        self.access_model.objects.bulk_create(
+            [self.access_model(user=user, episode_id=eid, source=source) for eid in episode_ids],
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no post_save
+        self.add(user.pk, comic_id, *episode_ids)
+
+    def invalidate(self, user_id, comic_id):
+        key = self._key(user_id, comic_id)
+
+        def _delete():
+            r = _redis()
+            if r is None:
+                return
+            try:
+                r.delete(key)
+            except Exception:
+                logger.warning("Entitlement index invalidation failed for %s", key, exc_info=True)
+
+        transaction.on_commit(_delete)
+
+    # -- signal wiring ----------------------------------------------------
+
+    def _on_access_saved(self, sender, instance, created, **kwargs):
+        if created:
+            self.add(instance.user_id, instance.episode.comic_id, instance.episode_id)
+
+    def _on_access_deleted(self, sender, instance, **kwargs):
+        try:
+            comic_id = instance.episode.comic_id
+        except Exception:
+            # Episode already gone (cascade); its sets expire on their own
+            return
+        self.invalidate(instance.user_id, comic_id)
+
+    def connect_signals(self):
+        """Keep the index in step with access rows written through the ORM (bulk_create excluded)."""
+        uid = f"entitlements:{self.namespace}"
+        post_save.connect(self._on_access_saved, sender=self.access_model, weak=False, dispatch_uid=f"{uid}:save")
+        post_delete.connect(self._on_access_deleted, sender=self.access_model, weak=False, dispatch_uid=f"{uid}:delete")
@@ -3,6 +3,7 @@ from datetime import timedelta
 from django.utils import timezone
 from rest_framework import serializers
 
+from .entitlements import invalidate_premium
 from .models import SubscriptionModel, WalletLedger
 
 
@@ -39,7 +40,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         # naive month-add: 30 days per month
         end = start + timedelta(days=30 * conf['months'])
 
-        return SubscriptionModel.objects.create(
+        subscription = SubscriptionModel.objects.create(
             user=user,
             plan=plan,
             price=conf['price'],
@@ -47,6 +48,9 @@ class SubscriptionSerializer(serializers.ModelSerializer):
             start_date=start,
             end_date=end,
         )
+        # Grant takes effect immediately: drop the cached/memoised premium state
+        invalidate_premium(user)
+        return subscription
 
 
 class WalletLedgerSerializer(serializers.ModelSerializer):
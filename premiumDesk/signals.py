@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .entitlements import invalidate_premium
+from .models import SubscriptionModel
+
+
+@receiver([post_save, post_delete], sender=SubscriptionModel)
+def invalidate_premium_on_subscription_change(sender, instance: SubscriptionModel, **kwargs):
+    # Covers admin edits too; SubscriptionSerializer.create also clears the caller's memo
+    invalidate_premium(instance.user_id)
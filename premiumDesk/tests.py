@@ -1,3 +1,56 @@
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from django.test import TestCase
 
-# Create your tests here.
+from profileDesk.models import CustomUser
+from . import wallet
+from .models import WalletLedger
+
+
+class DebitReplayTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            'payer', 'payer@example.com', 'pass', full_name='Payer', mobile_number='9000000002'
+        )
+        CustomUser.objects.filter(pk=self.user.pk).update(coin_count=70)
+        # A concurrent request with the same key already debited 30 of 100 coins and committed
+        self.winner = WalletLedger.objects.create(
+            user=self.user, delta=-30, balance_after=70, reason='unlock_episode', idempotency_key='unlock:k1',
+        )
+
+    def _lost_race(self):
+        # The up-front lookup ran on a snapshot older than the winner's commit
+        return mock.patch.object(WalletLedger.objects, 'filter', return_value=WalletLedger.objects.none())
+
+    def test_duplicate_key_inside_outer_transaction_replays(self):
+        locking = mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update)
+        with transaction.atomic():
+            with self._lost_race(), locking as select_for_update:
+                result = wallet.debit(self.user, 30, 'unlock:k1', reason='unlock_episode')
+            # REPEATABLE READ: only locking reads see the winner's rows (no-ops on SQLite)
+            self.assertEqual(
+                {call.args[0].model for call in select_for_update.call_args_list}, {WalletLedger, CustomUser}
+            )
+            # The failed insert only rolled back its savepoint; the outer transaction goes on
+            self.assertEqual(CustomUser.objects.get(pk=self.user.pk).coin_count, 70)
+
+        self.assertTrue(result.success)
+        self.assertTrue(result.idempotent)
+        self.assertEqual(result.charged, 0)
+        self.assertEqual(result.balance, 70)
+        self.assertEqual(self.user.coin_count, 70)
+        self.assertEqual([row.pk for row in result.ledger], [self.winner.pk])
+        self.assertEqual(WalletLedger.objects.count(), 1)
+
+    def test_duplicate_key_with_unapplied_entries_raises(self):
+        entries = [
+            wallet.LedgerEntry(30, 'unlock:k1', 'unlock_episode'),
+            wallet.LedgerEntry(20, 'unlock:k2', 'unlock_episode'),
+        ]
+        with transaction.atomic():
+            with self._lost_race(), self.assertRaises(IntegrityError):
+                wallet.debit_many(self.user, entries)
+            self.assertEqual(CustomUser.objects.get(pk=self.user.pk).coin_count, 70)
+        self.assertEqual(WalletLedger.objects.count(), 1)
@@ -0,0 +1,128 @@
+# premiumDesk/unlocks.py
+"""
+Batch episode unlock shared by the comic apps (POST .../<comic_id>/unlock-batch/).
+
+The caller resolves the request body against its own episode model (episodes_for_batch)
+and passes the episodes with its EpisodeEntitlementIndex. unlock_batch then:
+  - skips episodes the user already holds,
+  - grants free, admin-unlocked or (for premium users) every episode without coins,
+  - prices the rest together: one conditional debit through the wallet, one ledger row per
+    episode, one bulk insert of access rows, all in one transaction.
+
+Idempotency keys are "<key_prefix>:unlock:<user_id>:<episode_id>", the same key the single
+unlock uses, so a retried request (or a single unlock followed by a batch) never charges twice.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import wallet
+from .entitlements import is_user_premium
+
+MAX_BATCH_UNLOCK = 50
+DEFAULT_COIN_COST = 50
+BAD_BATCH_MESSAGE = f"episode_ids or from_episode/to_episode required (max {MAX_BATCH_UNLOCK})"
+
+
+def unlock_key(key_prefix: str, user_id, episode_id) -> str:
+    """Wallet idempotency key of one episode unlock (<= 64 chars, WalletLedger.idempotency_key)."""
+    return f"{key_prefix}:unlock:{user_id}:{episode_id}"
+
+
+def coin_cost(episode) -> int:
+    return episode.coin_cost or DEFAULT_COIN_COST
+
+
+def episodes_for_batch(episodes, data):
+    """
+    Resolve an unlock-batch body against a comic's episode queryset, ordered by number:
+    { "episode_ids": [...] } or { "from_episode": n, "to_episode": m } (inclusive).
+    Returns None when the body names neither ids nor a valid range, or asks for too many.
+    """
+    ids = data.get('episode_ids')
+    if ids:
+        if not isinstance(ids, list) or len(ids) > MAX_BATCH_UNLOCK:
+            return None
+        try:
+            return list(episodes.filter(id__in=ids).order_by('episode_number'))
+        except (TypeError, ValueError, ValidationError):
+            # Malformed id (e.g., not a UUID)
+            return None
+    try:
+        first, last = int(data.get('from_episode')), int(data.get('to_episode'))
+    except (TypeError, ValueError):
+        return None
+    if last < first or last - first + 1 > MAX_BATCH_UNLOCK:
+        return None
+    return list(episodes.filter(episode_number__gte=first, episode_number__lte=last).order_by('episode_number'))
+
+
+@dataclass
+class BatchUnlock:
+    # Episodes opened by this call, and the ones the user already held
+    unlocked: List = field(default_factory=list)
+    already: List = field(default_factory=list)
+    source: str = 'ALREADY'  # COINS | PREMIUM | ALREADY
+    coins_spent: int = 0
+    balance: int = 0
+    # Set when the debit failed (nothing was granted)
+    error_code: Optional[str] = None
+    required: int = 0
+
+    @property
+    def success(self) -> bool:
+        return self.error_code is None
+
+    def payload(self) -> dict:
+        return {
+            "unlocked": [str(ep.id) for ep in self.unlocked],
+            "already": [str(ep.id) for ep in self.already],
+            "source": self.source,
+            "coins_spent": self.coins_spent,
+            "balance": self.balance,
+        }
+
+
+def unlock_batch(user, comic_id, episodes, index, key_prefix: str, link_model: str) -> BatchUnlock:
+    """
+    Unlock `episodes` (of comic `comic_id`) for `user`. `index` is the app's
+    EpisodeEntitlementIndex; its access model provides SOURCE_COINS / SOURCE_PREMIUM.
+    """
+    access_model = index.access_model
+    held = index.unlocked_episode_ids(user, comic_id)
+    already = [ep for ep in episodes if ep.id in held]
+    todo = [ep for ep in episodes if ep.id not in held]
+
+    premium = is_user_premium(user)
+    free, paid = [], []
+    for ep in todo:
+        (free if premium or ep.is_free or not ep.is_locked else paid).append(ep)
+
+    result = BatchUnlock(unlocked=todo, already=already, balance=user.coin_count)
+    with transaction.atomic():
+        if paid:
+            entries = [
+                wallet.LedgerEntry(
+                    amount=coin_cost(ep),
+                    idempotency_key=unlock_key(key_prefix, user.id, ep.id),
+                    reason='unlock_episode',
+                    link_model=link_model,
+                    link_id=str(ep.id),
+                )
+                for ep in paid
+            ]
+            debit = wallet.debit_many(user, entries)
+            if not debit.success:
+                return BatchUnlock(
+                    balance=debit.balance,
+                    error_code=debit.error_code,
+                    required=sum(e.amount for e in entries),
+                )
+            result.balance, result.coins_spent = debit.balance, debit.charged
+            index.grant_many(user, comic_id, [ep.id for ep in paid], access_model.SOURCE_COINS)
+        index.grant_many(user, comic_id, [ep.id for ep in free], access_model.SOURCE_PREMIUM)
+
+    result.source = "COINS" if paid else ("PREMIUM" if free else "ALREADY")
+    return result
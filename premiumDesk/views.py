@@ -1,11 +1,10 @@
 from django.utils import timezone
-from django.db import transaction
 from rest_framework import viewsets, permissions, decorators, response, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from profileDesk.models import CustomUser
+from . import wallet
 from .models import SubscriptionModel, WalletLedger
 from .serializers import (
     SubscriptionSerializer,
@@ -68,73 +67,43 @@ class CoinsConsumeView(APIView):
     - Idempotent on idempotency_key:
         - If a ledger with the same idempotency_key already exists for this user, return that result (200).
         - If the key exists for a different user, return 409.
-    - Atomic: debits coins and writes a WalletLedger row with balance snapshot.
+    - Atomic: debits coins and writes a WalletLedger row with balance snapshot
+      (premiumDesk.wallet: one conditional UPDATE, no user-row lock).
     """
     permission_classes = [IsAuthenticated]
 
-    @transaction.atomic
     def post(self, request):
         serializer = CoinsConsumeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        amount = serializer.validated_data["amount"]
-        reason = serializer.validated_data["reason"]
-        idempotency_key = serializer.validated_data["idempotency_key"]
-        link_model = serializer.validated_data.get("link_model")
-        link_id = serializer.validated_data.get("link_id")
-
-        user = request.user
+        data = serializer.validated_data
+
+        result = wallet.debit(
+            request.user,
+            amount=data["amount"],
+            idempotency_key=data["idempotency_key"],
+            reason=data["reason"],
+            link_model=data.get("link_model") or None,
+            link_id=data.get("link_id") or None,
+        )
 
-        # Idempotency check first
-        existing = WalletLedger.objects.filter(idempotency_key=idempotency_key).first()
-        if existing:
-            if existing.user_id != user.id:
-                return Response(
-                    {"detail": "Idempotency key already used by another user"},
-                    status=status.HTTP_409_CONFLICT,
-                )
-            # Return prior successful result
+        if result.error_code == wallet.IDEMPOTENCY_CONFLICT:
             return Response(
-                {
-                    "balance_after": existing.balance_after,
-                    "ledger": WalletLedgerSerializer(existing).data,
-                    "idempotent": True,
-                },
-                status=status.HTTP_200_OK,
+                {"detail": "Idempotency key already used by another user"},
+                status=status.HTTP_409_CONFLICT,
             )
-
-        # Lock user row to ensure consistent balance update
-        user_locked = CustomUser.objects.select_for_update().get(id=user.id)
-
-        if user_locked.coin_count is None:
-            user_locked.coin_count = 0
-
-        if user_locked.coin_count < amount:
+        if result.error_code == wallet.INSUFFICIENT_BALANCE:
             return Response(
-                {"detail": "Insufficient balance", "balance": user_locked.coin_count},
+                {"detail": "Insufficient balance", "balance": result.balance},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        new_balance = user_locked.coin_count - amount
-
-        # Create ledger and update balance atomically
-        ledger = WalletLedger.objects.create(
-            user=user_locked,
-            delta=-amount,
-            balance_after=new_balance,
-            reason=reason,
-            link_model=link_model or None,
-            link_id=link_id or None,
-            idempotency_key=idempotency_key,
-        )
-
-        user_locked.coin_count = new_balance
-        user_locked.save(update_fields=["coin_count"])
-
+        ledger = result.ledger[0]
         return Response(
             {
-                "balance_after": new_balance,
+                # Prior successful result on replay, fresh debit otherwise
+                "balance_after": ledger.balance_after,
                 "ledger": WalletLedgerSerializer(ledger).data,
-                "idempotent": False,
+                "idempotent": result.idempotent,
             },
-            status=status.HTTP_201_CREATED,
-        )
\ No newline at end of file
+            status=status.HTTP_200_OK if result.idempotent else status.HTTP_201_CREATED,
+        )
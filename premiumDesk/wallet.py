@@ -0,0 +1,122 @@
+# premiumDesk/wallet.py
+"""
+Coin wallet engine.
+
+A debit is one conditional UPDATE:
+    UPDATE customuser SET coin_count = coin_count - <total> WHERE id = ? AND coin_count >= <total>
+so concurrent debits never read-modify-write a stale balance and never wait on an explicit
+SELECT ... FOR UPDATE. The WalletLedger rows are written in the same transaction; the unique
+idempotency_key makes a replayed request a no-op (the losing insert rolls the debit back and
+the earlier ledger row is returned instead).
+
+Callers usually debit inside their own transaction.atomic(). Under MySQL's REPEATABLE READ a
+plain SELECT there reads the snapshot taken by the first query of the outer transaction, so
+a ledger row committed by a concurrent request is invisible to it; every read that has to see
+such rows (the replay lookup, the balance reported after a lost race) is a locking read.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from profileDesk.models import CustomUser
+from .models import WalletLedger
+
+INSUFFICIENT_BALANCE = 'insufficient_balance'
+IDEMPOTENCY_CONFLICT = 'idempotency_conflict'
+
+
+@dataclass
+class LedgerEntry:
+    amount: int  # coins to debit (> 0)
+    idempotency_key: str  # max 64 chars (WalletLedger.idempotency_key)
+    reason: str = 'other'
+    link_model: Optional[str] = None
+    link_id: Optional[str] = None
+
+
+@dataclass
+class WalletResult:
+    success: bool
+    balance: int
+    ledger: List[WalletLedger] = field(default_factory=list)
+    # Coins actually taken by this call (0 on a full replay)
+    charged: int = 0
+    # Every entry had already been applied by an earlier request with the same keys
+    idempotent: bool = False
+    error_code: Optional[str] = None
+
+
+def _balance(user_id, current: bool = False) -> int:
+    """coin_count of the user; `current` reads the latest committed row (SELECT ... FOR UPDATE)."""
+    qs = CustomUser.objects.filter(pk=user_id)
+    if current:
+        qs = qs.select_for_update()
+    return qs.values_list('coin_count', flat=True).get() or 0
+
+
+def debit(user, amount: int, idempotency_key: str, reason: str = 'other',
+          link_model: Optional[str] = None, link_id: Optional[str] = None) -> WalletResult:
+    """Debit `amount` coins once per idempotency_key."""
+    return debit_many(user, [LedgerEntry(amount, idempotency_key, reason, link_model, link_id)])
+
+
+def debit_many(user, entries: List[LedgerEntry]) -> WalletResult:
+    """
+    Debit the sum of `entries` with a single conditional UPDATE and write one ledger row per
+    entry (balance_after runs down in entry order). Entries whose key was already applied for
+    this user are skipped; a key owned by another user fails the whole call.
+    On success `user.coin_count` is refreshed in place.
+    """
+    keys = [e.idempotency_key for e in entries]
+    existing = {row.idempotency_key: row for row in WalletLedger.objects.filter(idempotency_key__in=keys)}
+    if any(row.user_id != user.pk for row in existing.values()):
+        return WalletResult(success=False, balance=_balance(user.pk), error_code=IDEMPOTENCY_CONFLICT)
+
+    pending = [e for e in entries if e.idempotency_key not in existing]
+    if not pending:
+        user.coin_count = _balance(user.pk)
+        return WalletResult(success=True, balance=user.coin_count, ledger=list(existing.values()), idempotent=True)
+
+    total = sum(e.amount for e in pending)
+    try:
+        with transaction.atomic():
+            updated = (
+                CustomUser.objects
+                .filter(pk=user.pk, coin_count__gte=total)
+                .update(coin_count=F('coin_count') - total)
+            )
+            if not updated:
+                return WalletResult(success=False, balance=_balance(user.pk, current=True), error_code=INSUFFICIENT_BALANCE)
+
+            new_balance = _balance(user.pk)
+            running = new_balance + total
+            rows = []
+            for e in pending:
+                running -= e.amount
+                rows.append(WalletLedger(
+                    user_id=user.pk,
+                    delta=-e.amount,
+                    balance_after=running,
+                    reason=e.reason,
+                    link_model=e.link_model,
+                    link_id=e.link_id,
+                    idempotency_key=e.idempotency_key,
+                ))
+            if len(rows) == 1:
+                rows[0].save()  # keeps the pk on backends without bulk RETURNING (MySQL)
+            else:
+                WalletLedger.objects.bulk_create(rows)
+    except IntegrityError:
+        # A concurrent request with the same key won the insert; our debit was rolled back.
+        # Locking reads: the winner's rows are newer than the caller's snapshot
+        with transaction.atomic():
+            replayed = list(WalletLedger.objects.select_for_update().filter(idempotency_key__in=keys, user_id=user.pk))
+            if len(replayed) != len(keys):
+                raise
+            user.coin_count = _balance(user.pk, current=True)
+        return WalletResult(success=True, balance=user.coin_count, ledger=replayed, idempotent=True)
+
+    user.coin_count = new_balance
+    return WalletResult(success=True, balance=new_balance, ledger=list(existing.values()) + rows, charged=total)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profileDesk', '0010_address_customuser_profiledesk_email_d00d48_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='follower_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
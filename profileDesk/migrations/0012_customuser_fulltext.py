@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:02
+
+from django.db import migrations
+
+FULLTEXT_INDEX = 'profileDesk_customuser_name_ft'
+
+
+def add_fulltext_index(apps, schema_editor):
+    # MySQL only; see communityDesk.search
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name(apps.get_model('profileDesk', 'CustomUser')._meta.db_table)
+    schema_editor.execute(
+        f"ALTER TABLE {table} ADD FULLTEXT INDEX {FULLTEXT_INDEX} (username, full_name) WITH PARSER ngram"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name(apps.get_model('profileDesk', 'CustomUser')._meta.db_table)
+    schema_editor.execute(f"ALTER TABLE {table} DROP INDEX {FULLTEXT_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profileDesk', '0011_customuser_follow_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
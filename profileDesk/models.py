@@ -31,6 +31,9 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
     # Note: coin_count is a denormalized balance. We will migrate to WalletLedger later and keep this in-sync.
     coin_count = models.IntegerField(default=0)
+    # Denormalized from communityDesk.Follow; written only by F() updates in communityDesk.signals
+    follower_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
 
     terms_accepted = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
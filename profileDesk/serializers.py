@@ -1,7 +1,31 @@
 from .models import CustomUser, Address
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
-from communityDesk.models import Follow
+from django.db.models.manager import BaseManager
+from communityDesk.services import FollowState
+
+
+def follow_state(context) -> FollowState:
+    """The FollowState of this serialization (created on first use from context['request'])."""
+    state = context.get('follow_state')
+    if state is None:
+        request = context.get('request')
+        state = context['follow_state'] = FollowState(getattr(request, 'user', None))
+    return state
+
+
+class FollowStateListSerializer(serializers.ListSerializer):
+    """
+    many=True serializer that resolves the caller's follow state for every user in the batch
+    with one Follow query before the rows are rendered. The child's Meta names the user id
+    attribute with `follow_state_source` ('id' for user rows, 'user_id' for posts/comments).
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        source = getattr(self.child.Meta, 'follow_state_source', 'id')
+        follow_state(self.context).resolve(getattr(item, source) for item in items)
+        return super().to_representation(items)
 
 
 class ProfileUpdateSerializer(serializers.ModelSerializer):
@@ -20,7 +44,8 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         instance.about = validated_data.get('about', instance.about)
         instance.email = validated_data.get('email', instance.email)
         instance.mobile_number = validated_data.get('mobile_number', instance.mobile_number)
-        instance.save()
+        # Only the editable columns: counters are maintained with F() updates elsewhere
+        instance.save(update_fields=['profile_image', 'about', 'email', 'mobile_number'])
         return instance
 
     def validate_profile_image(self, value):
@@ -52,7 +77,7 @@ class ProfileImageSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         instance.profile_image = validated_data.get('profile_image', instance.profile_image)
-        instance.save()
+        instance.save(update_fields=['profile_image'])
         return instance
 
 
@@ -60,10 +85,11 @@ class ProfileImageSerializer(serializers.ModelSerializer):
 class CustomUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ['id', 'username', 'full_name', 'profile_image', 'badge']
+        fields = ['id', 'username', 'full_name', 'profile_image', 'badge', 'follower_count', 'following_count']
         extra_kwargs = {
             'profile_image': {'read_only': True},
         }
+        read_only_fields = ['follower_count', 'following_count']
 
 
 # Address serializers (owner-scoped usage via context['request'])
@@ -109,14 +135,15 @@ class ShortUserSerializer(serializers.ModelSerializer):
             'profile_image': {'read_only': True},
         }
         read_only_fields = ['id', 'username', 'profile_image', 'badge']
+        list_serializer_class = FollowStateListSerializer
+        follow_state_source = 'id'
 
     def get_my_follow_id(self, obj):
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             if request.user.id == obj.id:
                 return None
-            rel = Follow.objects.filter(follower=request.user, following=obj).values('id').first()
-            return rel['id'] if rel else None
+            return follow_state(self.context).follow_id(obj.id)
         return None
 
 
@@ -126,11 +153,13 @@ class SearchUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'full_name', 'profile_image', 'badge', 'is_following']
+        list_serializer_class = FollowStateListSerializer
+        follow_state_source = 'id'
 
     def get_is_following(self, obj):
         request = self.context.get('request')
         if request and hasattr(request, 'user') and request.user.is_authenticated:
             if request.user == obj:
                 return False
-            return Follow.objects.filter(follower=request.user, following=obj).exists()
+            return follow_state(self.context).is_following(obj.id)
         return False
\ No newline at end of file
@@ -33,6 +33,8 @@ class ProfileViewSet(viewsets.ViewSet):
             "about": user.about,
             "coin_count": user.coin_count,
             "badge": user.badge,
+            "follower_count": user.follower_count,
+            "following_count": user.following_count,
         }, status=status.HTTP_200_OK)
 
     def update(self, request, pk=None):
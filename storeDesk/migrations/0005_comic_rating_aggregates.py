@@ -0,0 +1,66 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    # Reviews are the per-user source: rebuild sum, count, histogram and the derived rating
+    Comic = apps.get_model('storeDesk', 'Comic')
+    Review = apps.get_model('storeDesk', 'Review')
+    per_comic = {}
+    for comic_id, stars, n in (
+        Review.objects.values_list('comic_id', 'rating').annotate(n=models.Count('id')).order_by()
+    ):
+        per_comic.setdefault(comic_id, {})[stars] = n
+    for comic_id, hist in per_comic.items():
+        count = sum(hist.values())
+        total = sum(stars * n for stars, n in hist.items())
+        Comic.objects.filter(pk=comic_id).update(
+            rating_count=count,
+            rating_sum=total,
+            rating=round(total / count, 1),
+            **{f"rating_{s}": hist.get(s, 0) for s in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storeDesk', '0004_rename_payment_payment_id_order_gateway_payment_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comic',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comic',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comic',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comic',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comic',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comic',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:52
+
+from django.db import migrations, models
+
+
+def drop_duplicate_reviews(apps, schema_editor):
+    # Keep each user's latest review of a comic, then rebuild the aggregates of the comics touched
+    Comic = apps.get_model('storeDesk', 'Comic')
+    Review = apps.get_model('storeDesk', 'Review')
+    duplicated = (
+        Review.objects.values('comic_id', 'user_id')
+        .annotate(n=models.Count('id'), keep=models.Max('id'))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    comic_ids = set()
+    for row in duplicated:
+        Review.objects.filter(comic_id=row['comic_id'], user_id=row['user_id']).exclude(id=row['keep']).delete()
+        comic_ids.add(row['comic_id'])
+
+    for comic_id in comic_ids:
+        hist = dict(
+            Review.objects.filter(comic_id=comic_id)
+            .values_list('rating').annotate(n=models.Count('id')).order_by()
+        )
+        count = sum(hist.values())
+        total = sum(stars * n for stars, n in hist.items())
+        Comic.objects.filter(pk=comic_id).update(
+            rating_count=count,
+            rating_sum=total,
+            rating=round(total / count, 1) if count else 0,
+            **{f"rating_{s}": hist.get(s, 0) for s in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storeDesk', '0005_comic_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('comic', 'user'), name='uniq_review_comic_user'),
+        ),
+    ]
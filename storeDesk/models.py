@@ -30,6 +30,14 @@ class Comic(models.Model):
     pages = models.PositiveIntegerField()
     rating = models.DecimalField(max_digits=3, decimal_places=1, default=Decimal("0.0"))
     rating_count = models.PositiveIntegerField(default=0)
+    # Rating aggregates (counterDesk.ratings): average = rating_sum / rating_count,
+    # rating_1..rating_5 = star histogram. `rating` is a derived copy kept for sorting.
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
     buyer_count = models.PositiveIntegerField(default=0)
     stock_quantity = models.PositiveIntegerField(default=0)
     preview_file = models.FileField(upload_to="comics/previews/", null=True, blank=True)
@@ -238,6 +246,10 @@ class Review(models.Model):
             models.Index(fields=["comic", "-created_at"]),
             models.Index(fields=["-created_at"]),
         ]
+        constraints = [
+            # One review (and so one rating) per user and comic
+            models.UniqueConstraint(fields=["comic", "user"], name="uniq_review_comic_user"),
+        ]
 
     def __str__(self):
         return f"Review by {self.user.username} on {self.comic.title}"
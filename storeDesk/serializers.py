@@ -14,6 +14,7 @@ from .models import (
     Promotion,
     PromotionRedemption,
 )
+from counterDesk import ratings
 from profileDesk.models import CustomUser, Address
 
 
@@ -39,6 +40,7 @@ class GenreSerializer(serializers.ModelSerializer):
 # -------------------------
 class ComicSerializer(serializers.ModelSerializer):
     genres = GenreSerializer(many=True, read_only=True)
+    rating_breakdown = serializers.SerializerMethodField()
 
     class Meta:
         model = Comic
@@ -52,6 +54,7 @@ class ComicSerializer(serializers.ModelSerializer):
             "pages",
             "rating",
             "rating_count",
+            "rating_breakdown",
             "buyer_count",
             "stock_quantity",
             "preview_file",
@@ -60,6 +63,9 @@ class ComicSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "rating", "rating_count", "buyer_count", "created_at"]
 
+    def get_rating_breakdown(self, obj):
+        return ratings.breakdown(obj)
+
     def validate_title(self, value):
         if not value.strip():
             raise ValidationError("Title cannot be empty.")
@@ -416,7 +422,9 @@ class QuoteResponseSerializer(serializers.Serializer):
 # Review
 # -------------------------
 class ReviewSerializer(serializers.ModelSerializer):
-    user = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all(), required=False)
+    # Always the caller (set in ReviewViewSet.perform_create); uniqueness per (comic, user)
+    # is enforced by the view and uniq_review_comic_user, not by a serializer validator
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Review
@@ -1,5 +1,5 @@
 from decimal import Decimal
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.db.models import Q, F
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -10,7 +10,7 @@ from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from django.core.cache import cache
 
@@ -37,6 +37,7 @@ from .serializers import (
     QuoteRequestSerializer,
     QuoteResponseSerializer,
 )
+from counterDesk import ratings
 from profileDesk.models import CustomUser  # noqa: F401
 
 
@@ -436,6 +437,9 @@ class OrderViewSet(viewsets.ModelViewSet):
 # -------------------------
 # Review
 # -------------------------
+ALREADY_REVIEWED = "You have already reviewed this comic."
+
+
 class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
@@ -459,11 +463,37 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if not (purchased_legacy or purchased_multi):
             raise PermissionDenied("You can only review a comic you have purchased.")
 
-        review = serializer.save(user=user)
-        # Update comic rating aggregates
-        comic.rating_count = (comic.rating_count or 0) + 1
-        comic.rating = ((comic.rating or Decimal("0")) * (comic.rating_count - 1) + review.rating) / comic.rating_count
-        comic.save(update_fields=["rating", "rating_count"])
+        # One review (and so one rating) per user and comic; edit the existing one instead
+        if Review.objects.filter(user=user, comic=comic).exists():
+            raise ValidationError({"detail": ALREADY_REVIEWED})
+
+        try:
+            with transaction.atomic():
+                review = serializer.save(user=user)
+                # Fold into the comic's integer aggregates (F() deltas, histogram, derived rating)
+                ratings.apply_rating(Comic, comic.pk, review.rating)
+        except IntegrityError:
+            # A concurrent request won the insert (uniq_review_comic_user)
+            raise ValidationError({"detail": ALREADY_REVIEWED})
+
+    def perform_update(self, serializer):
+        old_comic_id, old_rating = serializer.instance.comic_id, serializer.instance.rating
+        try:
+            with transaction.atomic():
+                review = serializer.save()
+                if review.comic_id != old_comic_id:
+                    ratings.apply_rating(Comic, old_comic_id, None, old_rating)
+                    ratings.apply_rating(Comic, review.comic_id, review.rating)
+                else:
+                    ratings.apply_rating(Comic, review.comic_id, review.rating, old_rating)
+        except IntegrityError:
+            # Moved onto a comic the user has already reviewed
+            raise ValidationError({"detail": ALREADY_REVIEWED})
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            ratings.apply_rating(Comic, instance.comic_id, None, instance.rating)
+            instance.delete()
 
 
 # -------------------------